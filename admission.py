@@ -0,0 +1,221 @@
+import os
+import math
+import time
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+
+import telemetry
+
+"""
+Admission control for LLM runs.
+
+Every agent run takes a slot from a global limit (`ADMISSION_CONCURRENCY`) and
+from its intent's limit (`ADMISSION_INTENT_LIMITS`, e.g. "advice=4"; intents
+not listed only share the global limit). Cached replies never get here.
+
+Runs that find no free slot wait in one bounded queue, served by lane
+(`LANES`, cheapest first) and then earliest deadline. A request's deadline
+is its arrival plus `ADMISSION_DEADLINE`, so the later stages of a request
+that is already under way go ahead of newer requests in the same lane.
+
+Load is shed early instead of letting every request time out together:
+
+    429  the queue is full (the lowest-priority waiter is evicted, or the
+         newcomer is refused if nothing queued ranks below it)
+    503  the run cannot start before its deadline, judged from the waiters
+         ahead of it and the lanes' average run time, or the deadline passed
+         while it waited
+
+Both carry a Retry-After estimate of how long the queue takes to drain.
+"""
+
+# === CONFIG ===
+ADMISSION_CONCURRENCY = int(os.getenv("ADMISSION_CONCURRENCY", "8"))
+ADMISSION_INTENT_LIMITS = os.getenv("ADMISSION_INTENT_LIMITS", "advice=4")
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "64"))
+ADMISSION_DEADLINE = float(os.getenv("ADMISSION_DEADLINE", "15"))
+ADMISSION_SERVICE_ALPHA = float(os.getenv("ADMISSION_SERVICE_ALPHA", "0.2"))
+
+LANES = ("classify", "answer", "generate")  # highest priority first
+UNCLASSIFIED = "unclassified"  # intent of the intent-detection run itself
+
+
+class OverloadedError(RuntimeError):
+    def __init__(self, message, status_code, retry_after):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def parse_limits(spec):
+    """"advice=4,shipment_data=6" -> {"advice": 4, "shipment_data": 6}"""
+    limits = {}
+    for part in spec.split(","):
+        if part.strip():
+            name, _, value = part.partition("=")
+            limits[name.strip()] = int(value)
+    return limits
+
+
+def overload_of(error):
+    """The `OverloadedError` behind `error` (e.g. wrapped in a pipeline `StageError`), or None."""
+    while error is not None:
+        if isinstance(error, OverloadedError):
+            return error
+        error = error.__cause__
+    return None
+
+
+def request_deadline(now):
+    """Deadline of the current request: its arrival (the telemetry trace start) plus `ADMISSION_DEADLINE`."""
+    trace = telemetry.current_trace()
+    if trace is None:
+        return now + ADMISSION_DEADLINE
+    return now - (time.perf_counter() - trace.start) + ADMISSION_DEADLINE
+
+
+class Waiter:
+    def __init__(self, lane, intent, deadline, seq):
+        self.lane = lane
+        self.intent = intent
+        self.deadline = deadline
+        self.priority = (LANES.index(lane), deadline, seq)
+        self.future = asyncio.get_running_loop().create_future()
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        limit=ADMISSION_CONCURRENCY,
+        intent_limits=None,
+        queue_size=ADMISSION_QUEUE_SIZE,
+    ):
+        self.limit = limit
+        self.intent_limits = parse_limits(ADMISSION_INTENT_LIMITS) if intent_limits is None else intent_limits
+        self.queue_size = queue_size
+        self.active = 0
+        self.active_by_intent = {}
+        self.waiting = []  # Waiter, in arrival order
+        self.service = {}  # lane -> EWMA seconds a slot is held
+        self.admitted = 0
+        self.queued = 0
+        self.shed = {}  # reason -> count
+        self._seq = itertools.count()
+
+    def _has_room(self, intent):
+        return (
+            self.active < self.limit
+            and self.active_by_intent.get(intent, 0) < self.intent_limits.get(intent, self.limit)
+        )
+
+    def _take(self, intent):
+        self.active += 1
+        self.active_by_intent[intent] = self.active_by_intent.get(intent, 0) + 1
+        self.admitted += 1
+        telemetry.ADMISSION_IN_FLIGHT.labels(intent).inc()
+
+    def _release(self, lane, intent, held=None):
+        self.active -= 1
+        self.active_by_intent[intent] -= 1
+        telemetry.ADMISSION_IN_FLIGHT.labels(intent).dec()
+        if held is not None:
+            previous = self.service.get(lane)
+            self.service[lane] = held if previous is None else previous + ADMISSION_SERVICE_ALPHA * (held - previous)
+        self._grant()
+
+    def _grant(self):
+        """Hand free slots to waiters in priority order (a waiter past its deadline has already shed itself)."""
+        for waiter in sorted(self.waiting, key=lambda w: w.priority):
+            if self.active >= self.limit:
+                break
+            if self._has_room(waiter.intent):
+                self._remove(waiter)
+                self._take(waiter.intent)
+                waiter.future.set_result(None)
+
+    def _remove(self, waiter):
+        self.waiting.remove(waiter)
+        telemetry.ADMISSION_QUEUE_DEPTH.labels(waiter.lane).dec()
+
+    def _shed(self, waiter, reason, status_code):
+        self._remove(waiter)
+        self.shed[reason] = self.shed.get(reason, 0) + 1
+        telemetry.ADMISSION_SHED.labels(waiter.lane, reason).inc()
+        message = "❌ LLM queue is full" if status_code == 429 else "❌ LLM capacity exhausted until the deadline"
+        waiter.future.set_exception(OverloadedError(f"{message} ({reason})", status_code, self.retry_after()))
+
+    def _run_seconds(self, lane):
+        return self.service.get(lane, 0.0)
+
+    def expected_wait(self, waiter):
+        """Seconds until `waiter` could start, if every slot serves the waiters ahead of it at the lanes' average pace."""
+        ahead = [w for w in self.waiting if w.priority < waiter.priority]
+        return (sum(self._run_seconds(w.lane) for w in ahead) + self._run_seconds(waiter.lane)) / self.limit
+
+    def retry_after(self):
+        """Whole seconds for the current queue to drain, at least 1."""
+        backlog = sum(self._run_seconds(w.lane) for w in self.waiting) / self.limit
+        return max(1, math.ceil(backlog))
+
+    def _enqueue(self, lane, intent):
+        now = time.monotonic()
+        waiter = Waiter(lane, intent, request_deadline(now), next(self._seq))
+        self.waiting.append(waiter)
+        telemetry.ADMISSION_QUEUE_DEPTH.labels(lane).inc()
+        self._grant()
+        if waiter.future.done():
+            return waiter
+        self.queued += 1
+        if len(self.waiting) > self.queue_size:
+            self._shed(max(self.waiting, key=lambda w: w.priority), "queue_full", 429)
+        if not waiter.future.done() and now + self.expected_wait(waiter) > waiter.deadline:
+            self._shed(waiter, "expected_wait", 503)
+        return waiter
+
+    async def _wait(self, waiter):
+        try:
+            await asyncio.wait({waiter.future}, timeout=max(0.0, waiter.deadline - time.monotonic()))
+        except asyncio.CancelledError:
+            if waiter in self.waiting:
+                self._remove(waiter)
+            elif waiter.future.done() and waiter.future.exception() is None:
+                # Granted in the same tick the caller was cancelled: hand the slot on.
+                self._release(waiter.lane, waiter.intent)
+            raise
+        if not waiter.future.done():
+            self._shed(waiter, "deadline", 503)
+        waiter.future.result()
+
+    @asynccontextmanager
+    async def slot(self, lane, intent=None):
+        """Hold one LLM slot for the body; raises `OverloadedError` when the run is shed."""
+        intent = intent or UNCLASSIFIED
+        queued_at = time.perf_counter()
+        waiter = self._enqueue(lane, intent)
+        try:
+            await self._wait(waiter)
+        finally:
+            telemetry.record_admission_wait(lane, time.perf_counter() - queued_at)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._release(lane, intent, time.perf_counter() - start)
+
+    def stats(self):
+        waiting = {lane: 0 for lane in LANES}
+        for waiter in self.waiting:
+            waiting[waiter.lane] += 1
+        return {
+            "limit": self.limit,
+            "intent_limits": self.intent_limits,
+            "queue_size": self.queue_size,
+            "active": self.active,
+            "active_by_intent": {intent: n for intent, n in self.active_by_intent.items() if n},
+            "waiting": waiting,
+            "run_ms": {lane: round(seconds * 1000, 1) for lane, seconds in self.service.items()},
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "shed": dict(self.shed),
+        }
@@ -0,0 +1,99 @@
+"""
+Cold-start import profile.
+
+Imports a module (default `chatbot`) in a fresh interpreter under
+`python -X importtime` and reports the total import time and the slowest
+top-level dependencies by cumulative time, so a new heavy import shows up as a
+regression:
+
+    python -m bench.import_profile --out bench/results/import.json
+    python -m bench.import_profile --compare bench/results/import.json --budget 3
+
+`--budget` exits non-zero when the total import exceeds that many seconds.
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def profile(module, env=None):
+    """`[(name, self_us, cumulative_us, depth)]` in import order, from `-X importtime`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env={**os.environ, **(env or {})}, capture_output=True, text=True,
+    )
+    if proc.returncode:
+        raise RuntimeError(f"❌ import {module} failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def report(rows, module, top):
+    total = next(cumulative for name, _, cumulative, _ in rows if name == module)
+    # Direct imports of the profiled module (one level down) are what a lazy import can defer.
+    direct = sorted(
+        ((name, cumulative) for name, _, cumulative, depth in rows if depth == 1),
+        key=lambda row: -row[1],
+    )
+    packages = {}
+    for name, self_us, _, _ in rows:
+        root = name.split(".")[0]
+        packages[root] = packages.get(root, 0) + self_us
+    return {
+        "module": module,
+        "total_s": round(total / 1e6, 3),
+        "modules": len(rows),
+        "direct_imports": [{"name": name, "seconds": round(us / 1e6, 3)} for name, us in direct[:top]],
+        "packages": [
+            {"name": name, "seconds": round(us / 1e6, 3)}
+            for name, us in sorted(packages.items(), key=lambda row: -row[1])[:top]
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time profile of the app")
+    parser.add_argument("--module", default="chatbot")
+    parser.add_argument("--boot-mode", default=os.getenv("BOOT_MODE", "background"))
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--runs", type=int, default=3, help="report the fastest of N cold imports")
+    parser.add_argument("--out", help="write the report as JSON")
+    parser.add_argument("--compare", help="baseline JSON to diff against")
+    parser.add_argument("--budget", type=float, help="fail if the import takes longer (seconds)")
+    args = parser.parse_args()
+
+    runs = [report(profile(args.module, {"BOOT_MODE": args.boot_mode}), args.module, args.top) for _ in range(args.runs)]
+    result = min(runs, key=lambda r: r["total_s"])
+    result["boot_mode"] = args.boot_mode
+
+    print(f"import {args.module}: {result['total_s']:.3f}s ({result['modules']} modules, BOOT_MODE={args.boot_mode})")
+    for row in result["direct_imports"]:
+        print(f"  {row['seconds']:7.3f}s  {row['name']}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        delta = result["total_s"] - baseline["total_s"]
+        print(f"vs {args.compare}: {delta:+.3f}s ({100 * delta / baseline['total_s']:+.1f}%)")
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.budget is not None and result["total_s"] > args.budget:
+        print(f"❌ import took {result['total_s']:.3f}s, budget {args.budget}s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
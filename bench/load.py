@@ -0,0 +1,262 @@
+"""
+Offline load test for the /query API.
+
+Boots a `bench.stub_node` synthetic chain in a subprocess, replaces the LLM
+with `bench.stub_llm`, and drives the FastAPI app in-process over ASGI, so a
+run needs no network, no keys and no deployed contracts. Each intent branch is
+measured separately:
+
+    python -m bench.load --shipments 1000 --readings 500 --requests 100 --concurrency 10 \\
+        --out bench/results/baseline.json
+    python -m bench.load ... --compare bench/results/baseline.json
+
+Reports p50/p95/p99/mean latency, throughput, errors, JSON-RPC traffic and the
+peak Python allocation per request (measured in a separate sequential pass so
+tracemalloc does not skew the latency numbers).
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import resource
+import tempfile
+import tracemalloc
+import statistics
+import subprocess
+
+PROMPTS = {
+    "shipment_data": "Show me the temperature and humidity of my shipments",
+    "find_shipment_company": "Which shipping company is the most reliable?",
+    "advice": "How should I pack fragile goods for a long trip?",
+}
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * q / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def summarize(latencies, errors, wall):
+    ms = [x * 1000 for x in latencies]
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "p50_ms": percentile(ms, 50),
+        "p95_ms": percentile(ms, 95),
+        "p99_ms": percentile(ms, 99),
+        "mean_ms": statistics.fmean(ms) if ms else None,
+        "max_ms": max(ms) if ms else None,
+        "rps": round(len(latencies) / wall, 2) if wall else None,
+    }
+
+
+def start_node(args):
+    cmd = [
+        sys.executable, "-m", "bench.stub_node", "--port", "0",
+        "--shipments", str(args.shipments), "--readings", str(args.readings),
+        "--companies", str(args.companies), "--entries", str(args.entries),
+        "--latency", str(args.rpc_latency), "--error-rate", str(args.rpc_error_rate),
+        "--seed", str(args.seed),
+    ]
+    proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    info = json.loads(proc.stdout.readline())
+    return proc, info
+
+
+async def rpc_stats(client, url):
+    response = await client.post(url, json={"jsonrpc": "2.0", "id": 1, "method": "stub_stats", "params": []})
+    return response.json()["result"]
+
+
+async def send(client, prompt, extra):
+    response = await client.post("/query", json={"prompt": prompt, **extra})
+    body = response.json() if response.status_code == 200 else {}
+    ok = response.status_code == 200 and not body.get("reply", "").startswith("Sorry, something went wrong")
+    return ok, body
+
+
+async def load_branch(client, prompt, extra, requests, concurrency):
+    sem = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def one():
+        nonlocal errors
+        async with sem:
+            start = time.perf_counter()
+            try:
+                ok, _ = await send(client, prompt, extra)
+            except Exception:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+async def memory_branch(client, prompt, extra, requests):
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(requests):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            await send(client, prompt, extra)
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+    return max(peaks) if peaks else None
+
+
+async def run(args, info, llm):
+    import httpx
+    import chatbot
+    from contract import single_flight
+
+    extra = {}
+    if args.max_points is not None:
+        extra["max_points"] = args.max_points
+
+    results = {}
+    transport = httpx.ASGITransport(app=chatbot.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client, \
+            httpx.AsyncClient(timeout=None) as rpc:
+        await chatbot.app.router.startup()
+        try:
+            start = time.perf_counter()
+            for prompt in PROMPTS.values():
+                await send(client, prompt, extra)
+            warmup = time.perf_counter() - start
+
+            for branch in args.branches:
+                prompt = PROMPTS[branch]
+                before = await rpc_stats(rpc, info["RPC_URL"])
+                llm_before, chars_before = llm.calls, llm.prompt_chars
+                result = await load_branch(client, prompt, extra, args.requests, args.concurrency)
+                after = await rpc_stats(rpc, info["RPC_URL"])
+                result["rpc_http_requests"] = after["requests"] - before["requests"] - 1
+                result["rpc_calls"] = after["calls"] - before["calls"] - 1
+                result["llm_calls"] = llm.calls - llm_before
+                result["llm_prompt_chars"] = llm.prompt_chars - chars_before
+                if args.memory_requests:
+                    result["peak_alloc_bytes"] = await memory_branch(client, prompt, extra, args.memory_requests)
+                results[branch] = result
+                print(f"{branch:>22}: {format_row(result)}", file=sys.stderr)
+
+            cache = chatbot.response_cache.stats()
+            coalesced = single_flight.stats()
+        finally:
+            await chatbot.app.router.shutdown()
+
+    return {"warmup_s": round(warmup, 3), "branches": results, "response_cache": cache, "single_flight": coalesced}
+
+
+def format_row(r):
+    def ms(v):
+        return "-" if v is None else f"{v:8.1f}"
+    return (
+        f"p50 {ms(r['p50_ms'])}  p95 {ms(r['p95_ms'])}  p99 {ms(r['p99_ms'])} ms  "
+        f"{r['rps']} rps  {r['errors']} err  {r['rpc_http_requests']} rpc"
+    )
+
+
+def compare(current, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nvs {baseline_path}", file=sys.stderr)
+    for branch, row in current["branches"].items():
+        old = baseline.get("branches", {}).get(branch)
+        if not old:
+            continue
+        deltas = []
+        for field in ("p50_ms", "p95_ms", "p99_ms", "rps", "peak_alloc_bytes"):
+            if row.get(field) is not None and old.get(field):
+                deltas.append(f"{field} {100 * (row[field] - old[field]) / old[field]:+.1f}%")
+        print(f"{branch:>22}: {'  '.join(deltas)}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline /query load test")
+    parser.add_argument("--shipments", type=int, default=200)
+    parser.add_argument("--readings", type=int, default=200)
+    parser.add_argument("--companies", type=int, default=20)
+    parser.add_argument("--entries", type=int, default=20)
+    parser.add_argument("--rpc-latency", type=float, default=0.0, help="seconds per RPC HTTP request")
+    parser.add_argument("--rpc-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="seconds per LLM call")
+    parser.add_argument("--llm-jitter", type=float, default=0.0)
+    parser.add_argument("--requests", type=int, default=50, help="requests per branch")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--memory-requests", type=int, default=3, help="sequential requests traced for peak memory")
+    parser.add_argument("--branches", nargs="+", choices=list(PROMPTS), default=list(PROMPTS))
+    parser.add_argument("--max-points", type=int, default=None)
+    parser.add_argument("--cache", action="store_true", help="keep the LLM response cache enabled")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write results as JSON")
+    parser.add_argument("--compare", help="baseline JSON to diff against")
+    args = parser.parse_args()
+    out = os.path.abspath(args.out) if args.out else None
+    baseline = os.path.abspath(args.compare) if args.compare else None
+
+    proc, info = start_node(args)
+    workdir = tempfile.TemporaryDirectory()
+    try:
+        os.environ.update({
+            "RPC_URL": info["RPC_URL"],
+            "CONTRACT_ADDRESS": info["CONTRACT_ADDRESS"],
+            "LOGISTICS_CONTRACT_ADDRESS": info["LOGISTICS_CONTRACT_ADDRESS"],
+            "INDEXER_DB": os.path.join(workdir.name, "indexer.db"),
+            "DATA_TIER_DB": os.path.join(workdir.name, "data_tier.db"),
+            "INDEXER_CONFIRMATIONS": "0",
+            "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "sk-bench"),
+        })
+        if not args.cache:
+            os.environ["RESPONSE_CACHE_SIZE"] = "0"
+        os.environ.pop("RESPONSE_CACHE_PATH", None)
+
+        sys.path.insert(0, ROOT)
+        from bench import stub_llm
+        llm = stub_llm.install(args.llm_latency, args.llm_jitter, args.seed)
+
+        measured = asyncio.run(run(args, info, llm))
+    finally:
+        proc.terminate()
+        proc.wait()
+        workdir.cleanup()
+
+    report = {
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+        "env": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        **measured,
+    }
+    if out:
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+        with open(out, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    if baseline:
+        compare(report, baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+LLM admission control under a traffic spike.
+
+Fires a burst of concurrent /query requests (a mix of every intent) at the
+app with `bench.stub_llm` limited to `--capacity` concurrent runs, so extra
+runs slow every run down the way a provider rate limit does. The burst is
+sent once with admission control effectively off and once with
+`admission.AdmissionController` at `--limit`:
+
+    python -m bench.overload --burst 200 --capacity 8 --limit 8 --queue 32 --deadline 5
+
+Reports status codes, latency of answered requests, how fast shed requests
+were refused, the peak number of concurrent LLM runs and what was shed, per
+intent.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROMPTS = {
+    "shipment_data": "Show me the temperature and humidity of my shipments",
+    "find_shipment_company": "Which shipping company is the most reliable?",
+    "advice": "How should I pack fragile goods for a long trip?",
+}
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))] * 1000, 1)
+
+
+async def burst(client, args):
+    intents = list(PROMPTS)
+    results = []
+
+    async def one(i):
+        intent = intents[i % len(intents)]
+        start = time.perf_counter()
+        # A distinct prompt per request, so the response cache cannot answer it.
+        response = await client.post("/query", json={"prompt": f"{PROMPTS[intent]} #{i}"})
+        results.append((intent, response.status_code, time.perf_counter() - start))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.burst)))
+    return results, time.perf_counter() - start
+
+
+def report(label, results, wall, llm, controller):
+    print(f"\n{label}: {len(results)} requests in {wall:.2f}s, peak concurrent LLM runs {llm.peak_in_flight}")
+    for intent in PROMPTS:
+        rows = [r for r in results if r[0] == intent]
+        codes = {}
+        for _, code, _ in rows:
+            codes[code] = codes.get(code, 0) + 1
+        ok = [t for _, code, t in rows if code == 200]
+        shed = [t for _, code, t in rows if code in (429, 503)]
+        print(
+            f"  {intent:22} codes {codes}  ok p50 {percentile(ok, 50)} ms p99 {percentile(ok, 99)} ms"
+            f"  shed p50 {percentile(shed, 50)} ms"
+        )
+    print(f"  admission {controller.stats()}")
+
+
+async def main(args, llm):
+    import httpx
+    import admission
+    import chatbot
+
+    transport = httpx.ASGITransport(app=chatbot.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        await chatbot.app.router.startup()
+        try:
+            # Warm up agents, chain reads and the leaderboard outside the measured bursts.
+            for prompt in PROMPTS.values():
+                await client.post("/query", json={"prompt": prompt})
+            for label, controller in (
+                ("no admission control", admission.AdmissionController(args.burst * 10, {}, args.burst * 10)),
+                (f"admission limit={args.limit} queue={args.queue} deadline={args.deadline}s",
+                 admission.AdmissionController(args.limit, admission.parse_limits(args.intent_limits), args.queue)),
+            ):
+                chatbot.llm_admission = controller
+                llm.peak_in_flight = 0
+                results, wall = await burst(client, args)
+                report(label, results, wall, llm, controller)
+        finally:
+            await chatbot.app.router.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--burst", type=int, default=200)
+    parser.add_argument("--capacity", type=int, default=8, help="concurrent LLM runs before every run slows down")
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    parser.add_argument("--limit", type=int, default=8)
+    parser.add_argument("--intent-limits", default="advice=4")
+    parser.add_argument("--queue", type=int, default=32)
+    parser.add_argument("--deadline", type=float, default=5.0)
+    parser.add_argument("--shipments", type=int, default=50)
+    parser.add_argument("--readings", type=int, default=200)
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    from bench.stub_node import SyntheticChain, StubNode, TRACKER_ADDRESS, LOGISTICS_ADDRESS
+
+    node = StubNode(SyntheticChain(args.shipments, args.readings)).start()
+    workdir = tempfile.mkdtemp(prefix="bench-overload-")
+    os.environ.update(
+        RPC_URL=node.url,
+        CONTRACT_ADDRESS=TRACKER_ADDRESS,
+        LOGISTICS_CONTRACT_ADDRESS=LOGISTICS_ADDRESS,
+        INDEXER_DB=os.path.join(workdir, "index.db"),
+        DATA_TIER_DB=os.path.join(workdir, "data_tier.db"),
+        INGEST_RAW_PATH=os.path.join(workdir, "raw.jsonl"),
+        INDEXER_CONFIRMATIONS="0",
+        RESPONSE_CACHE_SIZE="0",
+        ADMISSION_DEADLINE=str(args.deadline),
+    )
+    from bench import stub_llm
+
+    llm = stub_llm.install(args.llm_latency, capacity=args.capacity)
+    os.chdir(workdir)
+    try:
+        asyncio.run(main(args, llm))
+    finally:
+        node.stop()
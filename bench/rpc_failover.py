@@ -0,0 +1,132 @@
+"""
+RPC pool under injected latency and faults.
+
+Starts in-process `bench.stub_node` servers with different profiles and drives
+concurrent `eth_blockNumber` / `eth_getLogs` reads through `RpcPool`, once with
+only the first node (the old single `RPC_URL` behaviour) and once with all of
+them:
+
+    python -m bench.rpc_failover --profiles 0.2:0.1:0 0.01:0:0 0.01:0:0.3 --requests 400
+
+A profile is `latency:jitter:error_rate` (seconds, seconds, fraction). Midway
+through each run the node given by `--kill` (index) is stopped, to exercise
+failover and the circuit breaker. Reports latency percentiles, errors, and
+per-endpoint traffic, hedges and failovers.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+
+async def drive(urls, nodes, args):
+    from aiohttp import ClientSession, ClientTimeout
+    from contract.rpc_pool import RpcPool
+
+    pool = RpcPool(urls)
+    latencies, errors = [], 0
+    sem = asyncio.Semaphore(args.concurrency)
+    payloads = [
+        json.dumps({"jsonrpc": "2.0", "id": 1, "method": "eth_blockNumber", "params": []}).encode(),
+        json.dumps({"jsonrpc": "2.0", "id": 2, "method": "eth_chainId", "params": []}).encode(),
+    ]
+
+    async with ClientSession(timeout=ClientTimeout(total=args.timeout)) as session:
+        async def one(i):
+            nonlocal errors
+            async with sem:
+                if i == args.requests // 2 and args.kill is not None and args.kill < len(urls):
+                    # Stopping refuses new connections; open keep-alive ones now get 503s.
+                    nodes[args.kill].stop()
+                    nodes[args.kill].error_rate = 1.0
+                start = time.perf_counter()
+                try:
+                    await pool.post(session, payloads[i % 2])
+                    latencies.append(time.perf_counter() - start)
+                except Exception:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.requests)))
+        wall = time.perf_counter() - start
+
+    ms = [x * 1000 for x in latencies]
+    return {
+        "endpoints": len(urls),
+        "requests": args.requests,
+        "errors": errors,
+        "p50_ms": percentile(ms, 50),
+        "p95_ms": percentile(ms, 95),
+        "p99_ms": percentile(ms, 99),
+        "rps": round(len(latencies) / wall, 2),
+        "pool": pool.stats(),
+    }
+
+
+def start_nodes(args):
+    from bench.stub_node import StubNode, SyntheticChain
+
+    chain = SyntheticChain(1, 1)
+    nodes = []
+    for i, profile in enumerate(args.profiles):
+        latency, jitter, error_rate = (float(x) for x in profile.split(":"))
+        nodes.append(StubNode(chain, latency=latency, jitter=jitter, error_rate=error_rate, seed=args.seed + i).start())
+    return nodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RPC pool routing/hedging/failover benchmark")
+    parser.add_argument("--profiles", nargs="+", default=["0.2:0.1:0", "0.01:0:0", "0.01:0.005:0.3"],
+                        help="latency:jitter:error_rate per stub node")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--kill", type=int, default=1, help="index of the node stopped halfway (-1: none)")
+    parser.add_argument("--timeout", type=float, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write results as JSON")
+    args = parser.parse_args()
+    if args.kill < 0:
+        args.kill = None
+
+    sys.path.insert(0, ROOT)
+    report = {"config": vars(args), "runs": {}}
+    for label, count in (("single", 1), ("pool", len(args.profiles))):
+        nodes = start_nodes(args)
+        try:
+            result = asyncio.run(drive([n.url for n in nodes[:count]], nodes, args))
+        finally:
+            for node in nodes:
+                try:
+                    node.stop()
+                except Exception:
+                    pass
+        report["runs"][label] = result
+        print(
+            f"{label:>6}: p50 {result['p50_ms']} p95 {result['p95_ms']} p99 {result['p99_ms']} ms  "
+            f"{result['rps']} rps  {result['errors']} err  hedges {result['pool']['hedges']} "
+            f"failovers {result['pool']['failovers']}",
+            file=sys.stderr,
+        )
+        for endpoint in result["pool"]["endpoints"]:
+            print(f"        {json.dumps(endpoint)}", file=sys.stderr)
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
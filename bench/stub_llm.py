@@ -0,0 +1,122 @@
+"""
+Deterministic stand-in for the agents SDK runner.
+
+`install()` replaces `Runner.run` / `Runner.run_streamed` with coroutines that
+sleep for a configurable latency and answer from the prompt text alone, and
+builds every agent profile without its AgentKit tools so the app boots without
+AgentKit, CDP credentials or OpenAI. Each run reports token usage estimated
+from the agent instructions plus the prompt (~4 characters per token), so
+per-profile token metrics are exercised. With `capacity` set, runs share that
+much throughput the way a rate-limited provider does: beyond `capacity`
+concurrent runs, every run slows down in proportion. Call it before importing
+`chatbot`.
+"""
+
+import asyncio
+import random
+from types import SimpleNamespace
+
+INTENTS = ("find_shipment_company", "shipment_data", "advice")
+
+
+class StubLLM:
+    def __init__(self, latency=0.2, jitter=0.0, seed=0, tokens=40, capacity=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.tokens = tokens
+        self.capacity = capacity
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.prompt_chars = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def work(self, seconds):
+        """Sleep `seconds` of model time, stretched while more than `capacity` runs are in flight."""
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if not self.capacity:
+                await asyncio.sleep(seconds)
+                return
+            loop = asyncio.get_running_loop()
+            while seconds > 0:
+                # Progress is credited for the time actually slept, at the share of capacity this run had.
+                share = min(1.0, self.capacity / self.in_flight)
+                start = loop.time()
+                await asyncio.sleep(min(0.05, seconds / share))
+                seconds -= (loop.time() - start) * share
+        finally:
+            self.in_flight -= 1
+
+    def delay(self):
+        return max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+
+    def answer(self, prompt):
+        text = prompt.lower()
+        if "decide the user's intent" in text:
+            user = text.split("user prompt:", 1)[1].split("\n", 1)[0]
+            if any(w in user for w in ("temperature", "humidity", "vibration", "sensor")):
+                return "shipment_data"
+            if any(w in user for w in ("company", "carrier", "reliable")):
+                return "find_shipment_company"
+            return "advice"
+        if "what data is he interested in" in text:
+            return "temperature, humidity, vibrations"
+        words = [f"word{i}" for i in range(self.tokens)]
+        return " ".join(words)
+
+    @staticmethod
+    def usage(agent, prompt, output):
+        input_tokens = (len(agent.instructions or "") + len(prompt)) // 4 + 1
+        return [SimpleNamespace(usage=SimpleNamespace(input_tokens=input_tokens, output_tokens=len(output.split())))]
+
+    async def run(self, agent, prompt, *args, **kwargs):
+        self.calls += 1
+        self.prompt_chars += len(prompt)
+        await self.work(self.delay())
+        output = self.answer(prompt)
+        return SimpleNamespace(final_output=output, raw_responses=self.usage(agent, prompt, output))
+
+    def run_streamed(self, agent, prompt, *args, **kwargs):
+        self.calls += 1
+        self.prompt_chars += len(prompt)
+        return StubStream(self, agent, prompt)
+
+
+class StubStream:
+    def __init__(self, llm, agent, prompt):
+        self.llm = llm
+        self.agent = agent
+        self.prompt = prompt
+        self.final_output = None
+        self.raw_responses = []
+
+    async def stream_events(self):
+        words = self.llm.answer(self.prompt).split(" ")
+        step = self.llm.delay() / max(1, len(words))
+        for i, word in enumerate(words):
+            await self.llm.work(step)
+            yield SimpleNamespace(
+                type="raw_response_event",
+                data=SimpleNamespace(type="response.output_text.delta", delta=word if i == 0 else " " + word),
+            )
+        self.final_output = " ".join(words)
+        self.raw_responses = self.llm.usage(self.agent, self.prompt, self.final_output)
+
+
+def install(latency=0.2, jitter=0.0, seed=0, capacity=None):
+    from agents.agent import Agent
+    from agents.run import Runner
+    import create_agent
+
+    llm = StubLLM(latency, jitter, seed, capacity=capacity)
+    Runner.run = llm.run
+    Runner.run_streamed = llm.run_streamed
+    def create_profile_agent(name):
+        profile = create_agent.AGENT_PROFILES[name]
+        return Agent(name=profile.name, instructions=profile.instructions, model_settings=profile.model_settings)
+
+    create_agent.create_profile_agent = create_profile_agent
+    create_agent.create_agent = lambda: (create_profile_agent("onchain"), {})
+    return llm
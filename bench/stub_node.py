@@ -0,0 +1,406 @@
+"""
+Stand-in JSON-RPC node for benchmarks.
+
+Serves a synthetic `LogisticsDataStorage` and `CompanyShipmentTracker` at any
+scale without deploying or mining anything. Every shipment, reading and
+company entry is derived deterministically from `--seed`, and responses are
+ABI-encoded on demand (sensor arrays with NumPy), so 10k shipments x 1k
+readings costs no seeding time.
+
+Implements what the app uses: eth_chainId, eth_blockNumber, eth_getLogs
+(DeliveryCreated / DataSubmitted / CompanyEntryAdded), eth_call (getDeliveryData, its paged
+overload and getDeliveryDataLength, getAllCompanies, getCompanies,
+getCompanyCount), eth_getTransactionByHash and JSON-RPC batches, plus
+`stub_stats` (HTTP requests / RPC calls served so far). `--legacy-views`
+reverts the paged views, like contracts deployed before them.
+`--reading-logs` also serves a DataSubmitted log per generated reading (in its
+shipment's DeliveryCreated block); readings added later with
+`SyntheticChain.mine_readings` always get one, in a new block.
+`--latency` / `--jitter` delay each HTTP request and `--error-rate` turns that
+fraction of requests into HTTP 503, for fault-injection tests.
+
+    python -m bench.stub_node --shipments 10000 --readings 1000 --port 8545
+"""
+
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import numpy as np
+from eth_abi import encode
+from web3 import Web3
+
+TRACKER_ADDRESS = "0x" + "11" * 20
+LOGISTICS_ADDRESS = "0x" + "22" * 20
+CHAIN_ID = 84532
+GENESIS_TIMESTAMP = 1735689600  # 2025-01-01
+
+DELIVERY_CREATED = Web3.to_hex(Web3.keccak(text="DeliveryCreated(bytes32,address)"))
+DATA_SUBMITTED = Web3.to_hex(Web3.keccak(text="DataSubmitted(bytes32,(uint256,int16,uint16,uint16,int16,int16,int16))"))
+COMPANY_ENTRY_ADDED = Web3.to_hex(Web3.keccak(text="CompanyEntryAdded(string,(uint256,bool,uint256,uint256))"))
+GET_DELIVERY_DATA = Web3.keccak(text="getDeliveryData(bytes32)")[:4]
+GET_DELIVERY_DATA_PAGE = Web3.keccak(text="getDeliveryData(bytes32,uint256,uint256)")[:4]
+GET_DELIVERY_DATA_LENGTH = Web3.keccak(text="getDeliveryDataLength(bytes32)")[:4]
+GET_ALL_COMPANIES = Web3.keccak(text="getAllCompanies()")[:4]
+GET_COMPANIES = Web3.keccak(text="getCompanies(uint256,uint256)")[:4]
+GET_COMPANY_COUNT = Web3.keccak(text="getCompanyCount()")[:4]
+ADD_SHIPMENT_ENTRY = Web3.keccak(text="addShipmentEntry(string,uint256,bool,uint256)")[:4]
+
+COMPANY_TUPLE = "(string,uint256,uint256,uint256,uint256,uint256,(uint256,bool,uint256,uint256)[])[]"
+COMPANY_SUMMARY_TUPLE = "(string,uint256,uint256,uint256,uint256,uint256)[]"
+READING_TUPLE = "(uint256,int16,uint16,uint16,int16,int16,int16)"
+
+
+def _hex(value):
+    return hex(value)
+
+
+def _word(value):
+    return "0x" + value.to_bytes(32, "big").hex()
+
+
+def encode_readings(rows):
+    """ABI-encode `(uint256,int16,uint16,uint16,int16,int16,int16)[]` from an (n, 7) int64 array."""
+    n = len(rows)
+    flat = rows.reshape(-1)
+    words = np.zeros((flat.size, 32), dtype=np.uint8)
+    words[flat < 0, :24] = 0xFF
+    words[:, 24:] = flat.astype(">i8").view(np.uint8).reshape(-1, 8)
+    return (32).to_bytes(32, "big") + n.to_bytes(32, "big") + words.tobytes()
+
+
+class SyntheticChain:
+    """Deterministic chain state: one block per DeliveryCreated / CompanyEntryAdded event."""
+
+    def __init__(
+        self, shipments=200, readings=200, companies=20, entries=20, seed=0, paged_views=True, reading_logs=False
+    ):
+        self.shipments = shipments
+        self.readings = readings
+        self.seed = seed
+        self.paged_views = paged_views
+        self.reading_logs = reading_logs
+        self.mined = []  # (block, shipment index, (n, 7) rows) added by mine_readings
+        self.shipment_ids = [Web3.keccak(text=f"shipment-{seed}-{i}") for i in range(shipments)]
+        self.shipment_index = {bytes(sid): i for i, sid in enumerate(self.shipment_ids)}
+
+        rng = random.Random(seed)
+        self.company_names = [f"Company {i:04d}" for i in range(companies)]
+        self.entries = []  # (company index, deliveryTime, success, feedbackScore, timestamp)
+        for c in range(companies):
+            for _ in range(entries):
+                self.entries.append((
+                    c,
+                    rng.randint(60000, 120000),
+                    rng.random() > 0.2,
+                    rng.randint(6000, 10000),
+                    GENESIS_TIMESTAMP + len(self.entries),
+                ))
+        rng.shuffle(self.entries)
+        self.entries_head = self.head = shipments + len(self.entries)
+
+    # === Blocks: [1, shipments] create deliveries, then one company entry per block, then mined readings ===
+
+    def delivery_logs(self, from_block, to_block):
+        logs = []
+        for block in range(max(from_block, 1), min(to_block, self.shipments) + 1):
+            sid = self.shipment_ids[block - 1]
+            logs.append(self._log(
+                LOGISTICS_ADDRESS, block,
+                [DELIVERY_CREATED, Web3.to_hex(sid), _word(0xC0FFEE)], "0x",
+            ))
+        return logs
+
+    def reading_logs_in(self, from_block, to_block):
+        logs = []
+        if self.reading_logs:
+            for block in range(max(from_block, 1), min(to_block, self.shipments) + 1):
+                logs.extend(self._reading_logs(block, block - 1, self.generated_readings(block - 1), 1))
+        for block, index, rows in self.mined:
+            if from_block <= block <= to_block:
+                logs.extend(self._reading_logs(block, index, rows, 0))
+        return logs
+
+    def _reading_logs(self, block, index, rows, first_log_index):
+        sid = Web3.to_hex(self.shipment_ids[index])
+        return [
+            self._log(
+                LOGISTICS_ADDRESS, block, [DATA_SUBMITTED, sid],
+                "0x" + encode([READING_TUPLE], [tuple(int(v) for v in row)]).hex(), first_log_index + i,
+            )
+            for i, row in enumerate(rows)
+        ]
+
+    def mine_readings(self, index, rows):
+        """Append `rows` ((n, 7) timestamp + SensorData fields) to shipment `index` in a new block."""
+        self.head += 1
+        self.mined.append((self.head, index, np.asarray(rows, dtype=np.int64).reshape(-1, 7)))
+        return self.head
+
+    def mine_blocks(self, blocks=1):
+        """Advance the head by empty blocks (to confirm what was mined before)."""
+        self.head += blocks
+        return self.head
+
+    def entry_logs(self, from_block, to_block):
+        logs = []
+        first = max(from_block, self.shipments + 1)
+        for block in range(first, min(to_block, self.entries_head) + 1):
+            c, delivery_time, success, feedback, ts = self.entries[block - self.shipments - 1]
+            data = encode(["(uint256,bool,uint256,uint256)"], [(delivery_time, success, feedback, ts)])
+            name_hash = Web3.to_hex(Web3.keccak(text=self.company_names[c]))
+            logs.append(self._log(TRACKER_ADDRESS, block, [COMPANY_ENTRY_ADDED, name_hash], "0x" + data.hex()))
+        return logs
+
+    def _log(self, address, block, topics, data, log_index=0):
+        return {
+            "address": address,
+            "blockHash": _word(block),
+            "blockNumber": _hex(block),
+            "data": data,
+            "logIndex": _hex(log_index),
+            "removed": False,
+            "topics": topics,
+            "transactionHash": _word(block),
+            "transactionIndex": "0x0",
+        }
+
+    def readings_for(self, index):
+        rows = self.generated_readings(index)
+        extra = [mined for _, i, mined in self.mined if i == index]
+        return np.concatenate([rows, *extra]) if extra else rows
+
+    def reading_count(self, index):
+        return self.readings + sum(len(mined) for _, i, mined in self.mined if i == index)
+
+    def generated_readings(self, index):
+        rng = np.random.default_rng(self.seed * 1_000_003 + index)
+        n = self.readings
+        rows = np.empty((n, 7), dtype=np.int64)
+        rows[:, 0] = GENESIS_TIMESTAMP + index * 86400 + np.arange(n) * 60
+        rows[:, 1] = rng.integers(2000, 2800, n)
+        rows[:, 2] = rng.integers(4000, 6000, n)
+        rows[:, 3] = rng.integers(0, 500, n)
+        rows[:, 4] = rng.integers(-100, 100, n)
+        rows[:, 5] = rng.integers(-100, 100, n)
+        rows[:, 6] = 9800 + rng.integers(-100, 100, n)
+        return rows
+
+    def all_companies(self):
+        totals = {}
+        for c, delivery_time, success, feedback, ts in self.entries:
+            t = totals.setdefault(c, [0, 0, 0, 0, 0, []])
+            t[0] += 1
+            t[1 if success else 2] += 1
+            t[3] += feedback
+            t[4] += delivery_time
+            t[5].append((delivery_time, success, feedback, ts))
+        return [(self.company_names[c], *t) for c, t in sorted(totals.items())]
+
+    # === JSON-RPC ===
+
+    def call(self, tx):
+        data = bytes.fromhex(tx.get("data", tx.get("input", "0x"))[2:])
+        to = tx.get("to", "").lower()
+        selector, args = data[:4], data[4:]
+        if to == LOGISTICS_ADDRESS and selector == GET_DELIVERY_DATA:
+            index = self.shipment_index.get(args[:32])
+            if index is None:
+                return encode_readings(np.empty((0, 7), dtype=np.int64))
+            return encode_readings(self.readings_for(index))
+        if to == LOGISTICS_ADDRESS and selector == GET_DELIVERY_DATA_LENGTH and self.paged_views:
+            index = self.shipment_index.get(args[:32])
+            return encode(["uint256"], [0 if index is None else self.reading_count(index)])
+        if to == LOGISTICS_ADDRESS and selector == GET_DELIVERY_DATA_PAGE and self.paged_views:
+            index = self.shipment_index.get(args[:32])
+            offset, limit = int.from_bytes(args[32:64], "big"), int.from_bytes(args[64:96], "big")
+            if index is None:
+                return encode_readings(np.empty((0, 7), dtype=np.int64))
+            return encode_readings(self.readings_for(index)[offset:offset + limit])
+        if to == TRACKER_ADDRESS and selector == GET_ALL_COMPANIES:
+            return encode([COMPANY_TUPLE], [self.all_companies()])
+        if to == TRACKER_ADDRESS and selector == GET_COMPANIES and self.paged_views:
+            offset, limit = int.from_bytes(args[:32], "big"), int.from_bytes(args[32:64], "big")
+            page = [company[:6] for company in self.all_companies()[offset:offset + limit]]
+            return encode([COMPANY_SUMMARY_TUPLE], [page])
+        if to == TRACKER_ADDRESS and selector == GET_COMPANY_COUNT:
+            return encode(["uint256"], [len(self.company_names)])
+        raise ValueError("execution reverted")
+
+    def transaction(self, tx_hash):
+        block = int(tx_hash, 16)
+        if block <= self.shipments or block > self.entries_head:
+            return None
+        c, delivery_time, success, feedback, _ = self.entries[block - self.shipments - 1]
+        data = ADD_SHIPMENT_ENTRY + encode(
+            ["string", "uint256", "bool", "uint256"], [self.company_names[c], delivery_time, success, feedback]
+        )
+        return {
+            "blockHash": _word(block), "blockNumber": _hex(block), "from": "0x" + "33" * 20,
+            "gas": _hex(300000), "gasPrice": _hex(2 * 10**9), "hash": tx_hash, "input": "0x" + data.hex(),
+            "nonce": _hex(block), "to": TRACKER_ADDRESS, "transactionIndex": "0x0", "value": "0x0",
+            "type": "0x0", "chainId": _hex(CHAIN_ID), "v": "0x0", "r": _word(1), "s": _word(1),
+        }
+
+    def handle(self, method, params):
+        if method == "eth_chainId":
+            return _hex(CHAIN_ID)
+        if method == "net_version":
+            return str(CHAIN_ID)
+        if method == "eth_blockNumber":
+            return _hex(self.head)
+        if method == "eth_gasPrice":
+            return _hex(10**9)
+        if method == "eth_getLogs":
+            f = params[0]
+            from_block = self._block(f.get("fromBlock", "0x0"))
+            to_block = self._block(f.get("toBlock", "latest"))
+            address = f.get("address", "")
+            address = (address[0] if isinstance(address, list) else address).lower()
+            topic = (f.get("topics") or [None])[0]
+            if address == LOGISTICS_ADDRESS:
+                logs = []
+                if topic in (None, DELIVERY_CREATED):
+                    logs += self.delivery_logs(from_block, to_block)
+                if topic in (None, DATA_SUBMITTED):
+                    logs += self.reading_logs_in(from_block, to_block)
+                return sorted(logs, key=lambda entry: (int(entry["blockNumber"], 16), int(entry["logIndex"], 16)))
+            if address == TRACKER_ADDRESS and topic in (None, COMPANY_ENTRY_ADDED):
+                return self.entry_logs(from_block, to_block)
+            return []
+        if method == "eth_call":
+            return "0x" + self.call(params[0]).hex()
+        if method == "eth_getTransactionByHash":
+            return self.transaction(params[0])
+        raise NotImplementedError(method)
+
+    def _block(self, tag):
+        if tag in ("latest", "safe", "finalized", "pending"):
+            return self.head
+        if tag == "earliest":
+            return 0
+        return int(tag, 16) if isinstance(tag, str) else int(tag)
+
+
+class _Server(ThreadingHTTPServer):
+    # The default listen backlog of 5 overflows under concurrent clients and
+    # adds 1s SYN retransmits to the tail latency.
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class StubNode:
+    """Threaded HTTP JSON-RPC server around a `SyntheticChain`."""
+
+    def __init__(self, chain, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0, seed=0):
+        self.chain = chain
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.calls = 0
+        self.lock = threading.Lock()
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                status, payload = node.respond(body)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self.server = _Server((host, port), Handler)
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def respond(self, body):
+        with self.lock:
+            self.requests += 1
+            delay = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+            fail = self.rng.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        if fail:
+            return 503, b'{"error": "injected fault"}'
+
+        request = json.loads(body)
+        batch = isinstance(request, list)
+        responses = [self._one(r) for r in (request if batch else [request])]
+        with self.lock:
+            self.calls += len(responses)
+        return 200, json.dumps(responses if batch else responses[0]).encode()
+
+    def _one(self, request):
+        response = {"jsonrpc": "2.0", "id": request.get("id")}
+        if request.get("method") == "stub_stats":
+            response["result"] = {"requests": self.requests, "calls": self.calls}
+            return response
+        try:
+            response["result"] = self.chain.handle(request["method"], request.get("params", []))
+        except NotImplementedError as e:
+            response["error"] = {"code": -32601, "message": f"Method not found: {e}"}
+        except Exception as e:
+            response["error"] = {"code": 3, "message": str(e)}
+        return response
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic JSON-RPC node for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8545)
+    parser.add_argument("--shipments", type=int, default=200)
+    parser.add_argument("--readings", type=int, default=200)
+    parser.add_argument("--companies", type=int, default=20)
+    parser.add_argument("--entries", type=int, default=20, help="shipment entries per company")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every HTTP request")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--legacy-views", action="store_true", help="no paged view functions")
+    parser.add_argument("--reading-logs", action="store_true", help="a DataSubmitted log per generated reading")
+    args = parser.parse_args()
+
+    chain = SyntheticChain(
+        args.shipments, args.readings, args.companies, args.entries, args.seed,
+        paged_views=not args.legacy_views, reading_logs=args.reading_logs,
+    )
+    node = StubNode(chain, args.host, args.port, args.latency, args.jitter, args.error_rate, args.seed)
+    print(json.dumps({
+        "RPC_URL": node.url,
+        "CONTRACT_ADDRESS": Web3.to_checksum_address(TRACKER_ADDRESS),
+        "LOGISTICS_CONTRACT_ADDRESS": Web3.to_checksum_address(LOGISTICS_ADDRESS),
+        "head": chain.head,
+    }), flush=True)
+    try:
+        node.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
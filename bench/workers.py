@@ -0,0 +1,210 @@
+"""
+RPC load and memory of the app as the number of workers grows.
+
+Boots a `bench.stub_node` chain, then for each worker count starts
+`uvicorn --workers N` on this module's `create_app` (the app with
+`bench.stub_llm` installed), sends a mix of shipment_data and
+find_shipment_company queries, lets the workers idle for `--idle` seconds and
+reports the JSON-RPC calls the node served and the summed proportional set
+size (PSS, shared pages split between the processes mapping them) of the
+workers. Both `DATA_TIER` modes are measured:
+
+    python -m bench.workers --workers 1 2 4 8 --shipments 300 --readings 1000
+
+With `DATA_TIER=off` every worker follows the chain and caches the sensor
+histories itself; with `shared` one elected worker does and the others map the
+shared column file and read the rest from the SQLite snapshot.
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROMPTS = {
+    "shipment_data": "Show me the temperature and humidity of my shipments",
+    "find_shipment_company": "Which shipping company is the most reliable?",
+}
+
+
+def create_app():
+    """uvicorn `--factory` entry point of every worker: the app on the stub LLM."""
+    from bench import stub_llm
+
+    stub_llm.install(float(os.getenv("BENCH_LLM_LATENCY", "0.01")))
+    import chatbot
+
+    return chatbot.app
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_node(args):
+    cmd = [
+        sys.executable, "-m", "bench.stub_node", "--port", "0",
+        "--shipments", str(args.shipments), "--readings", str(args.readings), "--seed", str(args.seed),
+    ]
+    proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    return proc, json.loads(proc.stdout.readline())
+
+
+def worker_pids(master):
+    """Worker processes of the uvicorn `master` (not its multiprocessing helpers)."""
+    pids = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                cmdline = f.read()
+        except OSError:
+            continue
+        if ppid == master and b"resource_tracker" not in cmdline:
+            pids.append(int(entry))
+    return pids
+
+
+def pss_bytes(pid):
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Pss:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+async def rpc_calls(client, url):
+    response = await client.post(url, json={"jsonrpc": "2.0", "id": 1, "method": "stub_stats", "params": []})
+    return response.json()["result"]["calls"]
+
+
+async def measure(args, info, mode, workers, workdir):
+    import httpx
+
+    port = free_port()
+    env = dict(
+        os.environ,
+        RPC_URL=info["RPC_URL"],
+        CONTRACT_ADDRESS=info["CONTRACT_ADDRESS"],
+        LOGISTICS_CONTRACT_ADDRESS=info["LOGISTICS_CONTRACT_ADDRESS"],
+        INDEXER_DB=os.path.join(workdir, f"{mode}-{workers}-index.db"),
+        DATA_TIER=mode,
+        DATA_TIER_DB=os.path.join(workdir, f"{mode}-{workers}-tier.db"),
+        INGEST_RAW_PATH=os.path.join(workdir, "raw.jsonl"),
+        RESPONSE_CACHE_SIZE="0",
+        BENCH_LLM_LATENCY=str(args.llm_latency),
+    )
+    cmd = [
+        sys.executable, "-m", "uvicorn", "bench.workers:create_app", "--factory",
+        "--workers", str(workers), "--port", str(port), "--log-level", "warning",
+    ]
+    server = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient(timeout=None) as client:
+            start = time.perf_counter()
+            while True:
+                try:
+                    if (await client.get(f"{base}/health/live")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.perf_counter() - start > 120:
+                    raise RuntimeError("❌ uvicorn did not start")
+                await asyncio.sleep(0.2)
+
+            before = await rpc_calls(client, info["RPC_URL"])
+            sem = asyncio.Semaphore(args.concurrency)
+            latencies, errors = [], 0
+
+            async def one(i):
+                nonlocal errors
+                prompt = list(PROMPTS.values())[i % len(PROMPTS)]
+                async with sem:
+                    t = time.perf_counter()
+                    response = await client.post(f"{base}/query", json={"prompt": prompt})
+                    if response.status_code != 200 or response.json()["reply"].startswith("Sorry, something"):
+                        errors += 1
+                    else:
+                        latencies.append(time.perf_counter() - t)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(one(i) for i in range(args.requests)))
+            wall = time.perf_counter() - start
+            await asyncio.sleep(args.idle)
+            calls = await rpc_calls(client, info["RPC_URL"]) - before - 1
+            # A single worker is served by the uvicorn process itself.
+            pids = worker_pids(server.pid) or [server.pid]
+            pss = sorted((pss_bytes(pid) for pid in pids), reverse=True)
+    finally:
+        server.send_signal(signal.SIGINT)
+        try:
+            server.wait(30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "workers": workers,
+        "processes": len(pids),
+        "requests": args.requests,
+        "errors": errors,
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+        "wall_s": round(wall, 2),
+        "rpc_calls": calls,
+        "pss_mb": round(sum(pss) / 2 ** 20, 1),
+        "pss_per_worker_mb": [round(b / 2 ** 20, 1) for b in pss],
+    }
+
+
+async def main(args):
+    node, info = start_node(args)
+    workdir = tempfile.mkdtemp(prefix="bench-workers-")
+    rows = []
+    try:
+        for mode in args.modes:
+            for workers in args.workers:
+                row = await measure(args, info, mode, workers, workdir)
+                rows.append(row)
+                print(
+                    f"{mode:>6} x{workers:<2}  {row['processes']} procs  {row['errors']} err  "
+                    f"p50 {row['p50_ms']} ms  {row['wall_s']} s  {row['rpc_calls']} rpc calls  "
+                    f"{row['pss_mb']} MB PSS {row['pss_per_worker_mb']}",
+                    file=sys.stderr,
+                )
+    finally:
+        node.terminate()
+        node.wait()
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--modes", nargs="+", default=["off", "shared"], choices=["off", "shared"])
+    parser.add_argument("--shipments", type=int, default=200)
+    parser.add_argument("--readings", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--idle", type=float, default=15, help="seconds of background polling after the load")
+    parser.add_argument("--llm-latency", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out")
+    asyncio.run(main(parser.parse_args()))
@@ -1,32 +1,85 @@
 import os
 import json
-from fastapi import FastAPI
-from pydantic import BaseModel
-from dotenv import load_dotenv
+import asyncio
+import functools
+from contextlib import aclosing
+from typing import Literal
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
 from web3 import Web3
-from agents.run import Runner
+from dotenv import load_dotenv
 
-from contract.query_logistics_data import query_logistics_data
-from create_agent import create_agent
+from contract import web3_client, sensor_columns, sensor_stats
+from contract.ingest import get_gateway, BackpressureError
+from pipeline import Pipeline, Stage
+from response_cache import ResponseCache, data_version, STATIC
+from intent_classifier import create_classifier, INTENT_CONFIDENCE
+import telemetry
+import live_feed
+import wire_format
+import admission
+import data_tier
+from warmup import LazyResource, BOOT_MODE, warm_up, readiness
 import logging as L
 load_dotenv()
-from cdp import *
 from fastapi.middleware.cors import CORSMiddleware
 
-
 # === CONFIG ===
-RPC_URL = os.getenv("RPC_URL")
-CONTRACT_ADDRESS = os.getenv("CONTRACT_ADDRESS")
-ABI_PATH = os.getenv("ABI_PATH", "contract/CompanyShipmentTracker.json")
-
-# === WEB3 ===
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
-with open(ABI_PATH) as f:
-    abi = json.load(f)["abi"]
-contract = w3.eth.contract(address=Web3.to_checksum_address(CONTRACT_ADDRESS), abi=abi)
+CHART_MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", "500"))
+LLM_STAGE_TIMEOUT = float(os.getenv("LLM_STAGE_TIMEOUT", "60"))
+CHAIN_STAGE_TIMEOUT = float(os.getenv("CHAIN_STAGE_TIMEOUT", "30"))
+DEBUG_DUMPS = os.getenv("DEBUG_DUMPS", "0") == "1"  # write data2.json / response.json per shipment_data query
 
 # === AGENT ===
-agent_executor, config = create_agent()
+# Each LLM stage runs on the leanest agent profile that can serve it (see create_agent.AGENT_PROFILES).
+STAGE_PROFILES = {
+    "intent": "classifier",
+    "metrics": "classifier",
+    "summary": "summarizer",
+    "recommendation": "summarizer",
+    "advice": "advisor",
+    "onchain": "onchain",
+}
+# Admission lanes, served in admission.LANES order: short classifications first, long advice generations last.
+STAGE_LANES = {
+    "intent": "classify",
+    "metrics": "classify",
+    "summary": "answer",
+    "recommendation": "answer",
+    "advice": "generate",
+    "onchain": "generate",
+}
+# Stages whose agent holds the wallet and AgentKit tools: their replies depend on wallet and chain state
+# the prompt does not carry (balances, transactions the agent just sent), so they are never cached.
+UNCACHED_STAGES = {stage for stage, profile in STAGE_PROFILES.items() if profile == "onchain"}
+
+def build_agent(profile):
+    # AgentKit / CDP imports alone take seconds, so they happen on first use or during warm-up.
+    from create_agent import create_profile_agent
+    return create_profile_agent(profile)
+
+async def connect_chain():
+    web3 = await web3_client.get_web3()
+    await web3.eth.chain_id
+    return web3
+
+agent_profiles = {
+    profile: LazyResource(f"agent.{profile}", functools.partial(build_agent, profile))
+    for profile in dict.fromkeys(STAGE_PROFILES.values())
+}
+chain = LazyResource("web3", connect_chain, required=False)
+RESOURCES = (*agent_profiles.values(), chain)
+if BOOT_MODE == "eager":
+    for resource in agent_profiles.values():
+        resource.get_sync()
+
+intent_model = create_classifier()
+warmup_task = None
+data_tier_task = None
+ingest_task = None
+response_cache = ResponseCache()
+llm_admission = admission.AdmissionController()
 
 # === FASTAPI ===
 app = FastAPI()
@@ -37,9 +90,68 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+
+@app.on_event("startup")
+async def start_warmup():
+    # Background mode builds everything now; every mode retries failed builds without waiting for traffic.
+    global warmup_task
+    warmup_task = asyncio.create_task(warm_up(RESOURCES, cold=BOOT_MODE == "background"))
+
+@app.on_event("shutdown")
+async def stop_warmup():
+    if warmup_task:
+        warmup_task.cancel()
+        await asyncio.gather(warmup_task, return_exceptions=True)
+
+@app.on_event("startup")
+async def start_data_tier():
+    # One worker per node is elected to follow the leaderboard and sensor events; the others read its snapshots.
+    global data_tier_task
+    data_tier_task = asyncio.create_task(data_tier.get_tier().run(listeners=[live_feed.get_feed().publish]))
+
+@app.on_event("shutdown")
+async def stop_data_tier():
+    # Awaited so the refresher lock is released before the worker exits.
+    if data_tier_task:
+        data_tier_task.cancel()
+        await asyncio.gather(data_tier_task, return_exceptions=True)
+
+@app.on_event("startup")
+async def start_ingest():
+    global ingest_task
+    ingest_task = asyncio.create_task(get_gateway().run())
+
+@app.on_event("shutdown")
+async def stop_ingest():
+    # Cancelling flushes whatever is still buffered.
+    if ingest_task:
+        ingest_task.cancel()
+        await asyncio.gather(ingest_task, return_exceptions=True)
+
+@app.on_event("shutdown")
+async def close_web3():
+    await web3_client.close()
+
+@app.on_event("shutdown")
+def save_response_cache():
+    response_cache.save()
+
 class QueryRequest(BaseModel):
     prompt: str
     name: str = None
+    max_points: int = Field(None, gt=2)  # per metric; defaults to CHART_MAX_POINTS
+    downsample: Literal["lttb", "minmax", "raw"] = "lttb"  # "raw" returns every point
+    timings: bool = False  # add the per-stage `timings` block to the response
+
+class SensorReading(BaseModel):
+    shipmentId: str  # 0x-prefixed bytes32
+    temperature: int  # °C x100
+    humidity: int  # % x100
+    vibrations: int
+    accelX: int
+    accelY: int
+    accelZ: int
+    timestamp: int = None  # unix seconds; defaults to arrival time
 
 @app.get("/")
 def root():
@@ -49,18 +161,166 @@ def root():
 def health():
     return {"status": "ok"}
 
-@app.post("/query")
-async def query_intent(req: QueryRequest):
-    user_prompt = req.prompt.strip()
+@app.get("/health/live")
+def liveness():
+    """The process is up and serving; says nothing about dependencies."""
+    return {"status": "ok"}
+
+@app.get("/health/ready")
+def readiness_probe():
+    """200 once every required resource is warmed up, 503 (with per-resource state) until then."""
+    ready, report = readiness(RESOURCES)
+    return JSONResponse(report, status_code=200 if ready else 503)
+
+@app.get("/cache/stats")
+def cache_stats():
+    return response_cache.stats()
+
+@app.post("/ingest")
+async def ingest(readings: list[SensorReading]):
+    """Buffer device readings; they reach the chain aggregated on the next flush."""
+    gateway = get_gateway()
+    try:
+        accepted = gateway.add([reading.model_dump() for reading in readings])
+    except BackpressureError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"accepted": accepted, "buffered": gateway.buffered}
 
-    # === Step 1: Detect user intent ===
-    thought = (
+@app.get("/ingest/stats")
+def ingest_stats():
+    return get_gateway().stats()
+
+def shipment_key(shipment_id):
+    """bytes32 of a 0x-prefixed shipment id, or None if it is not one."""
+    try:
+        key = bytes(Web3.to_bytes(hexstr=shipment_id))
+    except ValueError:
+        return None
+    return key if len(key) == 32 else None
+
+@app.get("/shipments/{shipment_id}/stats")
+async def shipment_stats(shipment_id: str):
+    """Running and rolling sensor statistics of one shipment, served from memory or the shared data tier."""
+    key = shipment_key(shipment_id)
+    if key is None:
+        raise HTTPException(status_code=400, detail=f"❌ shipment id must be 32 bytes: {shipment_id}")
+    stats = await data_tier.get_tier().shipment_stats(key)
+    if stats is None:
+        raise HTTPException(status_code=404, detail=f"❌ No readings for shipment {shipment_id}")
+    return stats
+
+@app.websocket("/ws/shipments/{shipment_id}")
+async def shipment_feed(websocket: WebSocket, shipment_id: str):
+    """Live points of one shipment: a `stats` snapshot, then `points` batches (and `ping` when idle)."""
+    key = shipment_key(shipment_id)
+    if key is None:
+        await websocket.close(code=1008, reason="shipment id must be 32 bytes")
+        return
+    await websocket.accept()
+    feed = live_feed.get_feed()
+    subscriber = feed.subscribe(key)
+    sender = asyncio.create_task(push_points(websocket, subscriber))
+    try:
+        # Clients only listen; this returns once they disconnect.
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        feed.unsubscribe(subscriber)
+
+async def push_points(websocket, subscriber):
+    try:
+        stats = await data_tier.get_tier().shipment_stats(subscriber.shipment_id)
+        await websocket.send_json({"event": "stats", "data": stats})
+        while True:
+            points, dropped = await subscriber.batch()
+            if points or dropped:
+                await websocket.send_json({"event": "points", "data": points, "dropped": dropped})
+            else:
+                await websocket.send_json({"event": "ping"})
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        L.exception("Live feed send failed")
+        await websocket.close(code=1011)
+
+@app.get("/ws/stats")
+def live_feed_stats():
+    return live_feed.get_feed().stats()
+
+@app.get("/rpc/stats")
+def rpc_stats():
+    """Per-endpoint EWMA latency, error rate, hedge delay and breaker state of the RPC pool."""
+    return web3_client.get_pool().stats()
+
+@app.get("/admission/stats")
+def admission_stats():
+    """LLM slots in use, queued runs per lane, average run time per lane and shed counts."""
+    return llm_admission.stats()
+
+@app.get("/data/stats")
+def shared_data_stats():
+    """This worker's role in the shared data tier, and the version, block and age of the current snapshot."""
+    return data_tier.get_tier().stats()
+
+@app.get("/metrics")
+def metrics():
+    body, content_type = telemetry.metrics_payload()
+    return Response(body, media_type=content_type)
+
+async def run_agent(thought, stage, intent, user_prompt, version=STATIC):
+    """Run the agent on `thought`, reusing a cached reply for the same prompt, stage and data version."""
+    key = None if stage in UNCACHED_STAGES else response_cache.key(stage, intent, user_prompt, version)
+    reply = response_cache.get(key) if key else None
+    if reply is not None:
+        L.info(f"Response cache hit for stage={stage} intent={intent}")
+        return reply
+    from agents.run import Runner
+    profile = STAGE_PROFILES[stage]
+    agent = await agent_profiles[profile].get()
+    async with llm_admission.slot(STAGE_LANES[stage], intent):
+        with telemetry.span(f"llm.{stage}"):
+            result = await Runner.run(agent, thought)
+    telemetry.record_llm(stage, result, profile)
+    L.info(result)
+    if key:
+        response_cache.put(key, result.final_output)
+    return result.final_output
+
+async def stream_agent(thought, stage, intent, user_prompt, version=STATIC):
+    """Like `run_agent`, but yields text deltas as the model generates them."""
+    key = None if stage in UNCACHED_STAGES else response_cache.key(stage, intent, user_prompt, version)
+    reply = response_cache.get(key) if key else None
+    if reply is not None:
+        L.info(f"Response cache hit for stage={stage} intent={intent}")
+        yield reply
+        return
+    from agents.run import Runner
+    profile = STAGE_PROFILES[stage]
+    agent = await agent_profiles[profile].get()
+    async with llm_admission.slot(STAGE_LANES[stage], intent):
+        result = Runner.run_streamed(agent, thought)
+        with telemetry.span(f"llm.{stage}"):
+            async for event in result.stream_events():
+                if event.type == "raw_response_event" and event.data.type == "response.output_text.delta":
+                    yield event.data.delta
+    telemetry.record_llm(stage, result, profile)
+    if key:
+        response_cache.put(key, result.final_output)
+
+def intent_prompt(user_prompt):
+    return (
         "Your name is Vector! You are a helpful assistant for a shipping quality company.\n"
         "You must spit them exactly as in the enum!\n"
         "Decide the user's intent. Options:\n"
         "- advice\n"
         "- find_shipment_company\n"
         "- shipment_data\n"
+        "- onchain\n"
         "\n"
         f"USER PROMPT: {user_prompt}"
         f""
@@ -68,109 +328,345 @@ async def query_intent(req: QueryRequest):
         f"\n\n\n\n"
         f"example shipment_data for vibrations temperature and humiodity - shipment_data\n"
         f"I need info about shipment company - find_shipment_company\n"
+        f"check my wallet balance, send or swap tokens, use the faucet - onchain\n"
         f"Else advice :) \n"
     )
 
-    try:
-        result = await Runner.run(agent_executor, thought)
-        L.info(result)
-        intent_output = result.final_output.lower()
+def recommendation_prompt(top_companies):
+    return (
+        "You're a shipping assistant helping a user find a reliable shipping company.\n"
+        f"Based on this data: {json.dumps(top_companies, indent=2)}\n"
+        "Generate a friendly, human-readable recommendation. NEVER use h tags! You CAN use bold"
+    )
+
+def summary_prompt(user_prompt, stats):
+    return (
+        "Your name is Vector! You are a helpful assistant for a shipping quality company.\n"
+        "Generate a friendly, human-readable response for the user.\n"
+        "You have a histogram of which user is interested answer his question clear and shortly like max 2-3 sentences.\n"
+        f"USER QUERY: {user_prompt} \n"
+        f"basen on the data \n"
+        f"DATA (summary statistics of the on-chain sensor readings):\n{stats}"
+    )
+
+METRICS_PROMPT = (
+    "Based on the customer query in what data is he interested in "
+    "may be more than one "
+    "\n"
+    "-vibrations"
+    "-temperature"
+    "-humidity"
+)
+
+def advice_prompt(user_prompt):
+    return (
+        "Your name is Vector! You are a helpful assistant for a shipping quality company.\n"
+        "Give a short, friendly advice to the user.\n"
+        f"USER QUERY: {user_prompt}"
+    )
+
+def shipments_version(data):
+    return data_version(*(
+        memoryview(part)
+        for shipment in data
+        for part in (shipment.shipment_id.encode(), *shipment.columns.values())
+    ))
+
+async def detect_intent(user_prompt):
+    """Return `(intent, intent_source)`, asking the LLM only when the local classifier is unsure."""
+    with telemetry.span("intent.local"):
+        intent, confidence = intent_model.classify(user_prompt)
+    if intent is not None and confidence >= INTENT_CONFIDENCE:
+        intent_source = "local"
+    else:
+        intent_source = "llm"
+        intent_output = (await run_agent(intent_prompt(user_prompt), "intent", None, user_prompt)).lower()
         L.info(f"Intent output: {intent_output}")
         match True:
             case _ if "find_shipment_company" in intent_output:
                 intent = "find_shipment_company"
             case _ if "shipment_data" in intent_output:
                 intent = "shipment_data"
+            case _ if "onchain" in intent_output:
+                intent = "onchain"
             case _:
                 intent = "advice"
-        L.info(f"Detected intent: {intent}")
+    L.info(f"Detected intent: {intent} (source={intent_source}, local confidence={confidence:.2f})")
+    trace = telemetry.current_trace()
+    if trace is not None:
+        trace.intent = intent
+    return intent, intent_source
+
+async def top_companies(n=3):
+    with telemetry.span("companies"):
+        return await data_tier.get_tier().top_companies(n)
+
+def chart_metrics(metrics):
+    """The sensor series named in the metric classifier's reply."""
+    return [metric for metric in ['vibrations', 'temperature', 'humidity'] if metric in metrics.lower()]
+
+def build_chart_data(data, metrics, req, fmt="json"):
+    plot_data = {}
+    max_points = None if req.downsample == "raw" else (req.max_points or CHART_MAX_POINTS)
+    with telemetry.span("chart"):
+        for metric in chart_metrics(metrics):
+            if fmt == "json":
+                plot_data[metric] = sensor_columns.series(data, metric, max_points, req.downsample)
+            else:
+                ts, values = sensor_columns.series_arrays(data, metric, max_points, req.downsample)
+                plot_data[metric] = wire_format.chart_series(ts, values, fmt)
+    return plot_data
+
+def overloaded(error):
+    return HTTPException(
+        status_code=error.status_code, detail=str(error), headers={"Retry-After": str(error.retry_after)}
+    )
+
+def encode_reply(payload, timings=False, fmt="json"):
+    """Serialize `payload` in `fmt` (timed as the `serialize` stage), optionally with the request's `timings` block."""
+    trace = telemetry.current_trace()
+    if timings and trace is not None:
+        payload["timings"] = trace.to_dict()
+    with telemetry.span("serialize"):
+        body, media_type = wire_format.encode(payload, fmt)
+    return Response(body, media_type=media_type)
+
+@app.post("/query")
+async def query_intent(
+    req: QueryRequest, request: Request, format: Literal["json", "columnar", "msgpack"] = None
+):
+    """`chart_data` encoding follows `?format=` or the Accept header (see wire_format)."""
+    fmt = wire_format.negotiate(request.headers.get("accept"), format)
+    with telemetry.trace_request("/query"):
+        return encode_reply(await answer_query(req, fmt), req.timings, fmt)
+
+async def answer_query(req, fmt="json"):
+    user_prompt = req.prompt.strip()
+
+    try:
+        # === Step 1: Detect user intent ===
+        intent, intent_source = await detect_intent(user_prompt)
+        route = {"intent": intent, "intent_source": intent_source}
 
         if intent == "find_shipment_company":
-            companies = contract.functions.getAllCompanies().call()
+            companies = await top_companies(3)
             if not companies:
-                return {"reply": "Sorry, no company records found on-chain yet."}
-
-            top = sorted(companies, key=lambda c: (c[2], c[3]), reverse=True)[:3]
-            top_companies = [
-                {
-                    "name": c[0],
-                    "successRate": round(c[2] , 2),
-                    "feedbackScore": round(c[3], 2),
-                    "deliveryScore": c[4],
-                    "deliveries": c[1]
-                }
-                for c in top
-            ]
-            print(top_companies)
+                return {"reply": "Sorry, no company records found on-chain yet.", **route}
+
             L.info(
-                f"Top 3 companies: {json.dumps(top_companies, indent=2)}"
+                f"Top 3 companies: {json.dumps(companies, indent=2)}"
             )
 
-            re_thought = (
-                "You're a shipping assistant helping a user find a reliable shipping company.\n"
-                f"Based on this data: {json.dumps(top_companies, indent=2)}\n"
-                "Generate a friendly, human-readable recommendation. NEVER use h tags! You CAN use bold"
-            )
+            re_thought = recommendation_prompt(companies)
             L.info(re_thought)
-            final = await Runner.run(agent_executor, re_thought)
-            return {"reply": final.final_output}
+            version = data_version(companies)
+            final = await run_agent(re_thought, "recommendation", intent, user_prompt, version)
+            return {"reply": final, **route}
         elif intent == "shipment_data":
-            data = query_logistics_data()
-            thought = (
-                "Your name is Vector! You are a helpful assistant for a shipping quality company.\n"
-                "Generate a friendly, human-readable response for the user.\n"
-                "You have a histogram of which user is interested answer his question clear and shortly like max 2-3 sentences.\n"
-                f"USER QUERY: {user_prompt} \n"
-                f"basen on the data \n"
-                f"DATA: {data}"
-            )
+            async def fetch_data():
+                return await data_tier.get_tier().shipments()
 
-            response = await Runner.run(agent_executor, thought)
+            async def compute_stats(data):
+                # NumPy over the whole fleet; keep it off the event loop.
+                with telemetry.span("stats"):
+                    return await asyncio.to_thread(sensor_stats.summarize, data)
 
+            async def summarize(data, stats):
+                with telemetry.span("prompt.summary"):
+                    thought = summary_prompt(user_prompt, stats)
+                    version = shipments_version(data)
+                return await run_agent(thought, "summary", intent, user_prompt, version)
 
-            thought = (
-                "Based on the customer query in what data is he interested in "
-                "may be more than one "
-                "\n"
-                "-vibrations"
-                "-temperature"
-                "-humidity"
-            )
-            # all_data.append({
-            #     "shipmentId": shipment_hex,
-            #     "records": parsed
-            # })
-
-
-
-            _plot_data =[]
-            for i in data:
-                _plot_data.extend(i['records'])
-            with open('data2.json', 'w') as f:
-                f.write(json.dumps(_plot_data, indent=4))
-            classifier = await Runner.run(agent_executor, thought)
-            from collections import defaultdict
-
-            plot_data = defaultdict(list)
-            L.info(classifier.final_output)
-            for metric in ['vibrations', 'temperature', 'humidity']:
-                if metric in classifier.final_output.lower():
-                    for x in _plot_data:
-                        if metric in x:  # safe check
-                            plot_data[metric].append([x['timestamp'], x[metric]])
-            with open('response.json', 'w') as f:
-                f.write(json.dumps({"reply": response.final_output, "chart_data": plot_data}, indent=4))
-            return {"reply": response.final_output, "chart_data": plot_data}
+            async def classify_metrics():
+                return await run_agent(METRICS_PROMPT, "metrics", intent, user_prompt)
+
+            # The metric classifier does not need the chain data or the summary,
+            # so it runs concurrently with both.
+            results = await Pipeline([
+                Stage("data", fetch_data, timeout=CHAIN_STAGE_TIMEOUT),
+                Stage("stats", compute_stats, deps=["data"], timeout=CHAIN_STAGE_TIMEOUT),
+                Stage("summary", summarize, deps=["data", "stats"], timeout=LLM_STAGE_TIMEOUT),
+                Stage("metrics", classify_metrics, timeout=LLM_STAGE_TIMEOUT, required=False, default=""),
+            ]).run()
+            data, response, metrics = results["data"], results["summary"], results["metrics"]
+
+            if DEBUG_DUMPS:
+                with telemetry.span("debug_write"):
+                    with open('data2.json', 'wb') as f:
+                        f.write(wire_format.dumps({name: sensor_columns.concat(data, name) for name in sensor_columns.FIELDS}))
+
+            L.info(metrics)
+            plot_data = build_chart_data(data, metrics, req, fmt)
+            if DEBUG_DUMPS and fmt == "json":
+                with telemetry.span("debug_write"):
+                    with open('response.json', 'wb') as f:
+                        f.write(wire_format.dumps({"reply": response, "chart_data": plot_data}))
+            return {"reply": response, "chart_data": plot_data, **route}
+        elif intent == "onchain":
+            final = await run_agent(user_prompt, "onchain", intent, user_prompt)
+            return {"reply": final, **route}
         else:
-            thought = (
-                "Your name is Vector! You are a helpful assistant for a shipping quality company.\n"
-                "Give a short, friendly advice to the user.\n"
-                f"USER QUERY: {user_prompt}"
-            )
-            final = await Runner.run(agent_executor, thought)
-            return {"reply": final.final_output}
+            final = await run_agent(advice_prompt(user_prompt), "advice", intent, user_prompt)
+            return {"reply": final, **route}
 
 
     except Exception as e:
+        shed = admission.overload_of(e)
+        if shed is not None:
+            L.warning(f"Shed /query: {shed}")
+            raise overloaded(shed)
         L.exception("Error in query_intent")
         return {"reply": "Sorry, something went wrong while processing your request."}
+
+
+def sse(event, data):
+    return f"event: {event}\ndata: {wire_format.dumps(data).decode()}\n\n"
+
+async def stream_query(req, fmt="json"):
+    with telemetry.trace_request("/query/stream") as trace:
+        async for event in stream_events(req, fmt):
+            yield event
+        if req.timings:
+            yield sse("timings", trace.to_dict())
+
+async def merge_events(tokens, late=None):
+    """Yield ("token", text) from `tokens` and, as soon as it finishes, ("late", result) of the `late` task.
+
+    One task drains `tokens` and closes it on exit, so a disconnect still frees its LLM slot; a `late`
+    task that outlives the last token is awaited after it.
+    """
+    queue = asyncio.Queue()
+    end = object()
+
+    async def pump():
+        try:
+            async with aclosing(tokens):
+                async for text in tokens:
+                    queue.put_nowait(text)
+        finally:
+            queue.put_nowait(end)
+
+    pump_task = asyncio.create_task(pump())
+    get = None
+    try:
+        while True:
+            get = get or asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({get} if late is None else {get, late}, return_when=asyncio.FIRST_COMPLETED)
+            if late in done:
+                yield "late", late.result()
+                late = None
+            if get in done:
+                text, get = get.result(), None
+                if text is end:
+                    break
+                yield "token", text
+        await pump_task  # re-raises a failed stream
+        if late is not None:
+            yield "late", await late
+    finally:
+        for task in (get, pump_task, late):
+            if task is not None:
+                task.cancel()
+
+async def stream_events(req, fmt="json"):
+    user_prompt = req.prompt.strip()
+    started = False
+    metrics_task = late = None
+    try:
+        intent, intent_source = await detect_intent(user_prompt)
+        started = True
+        yield sse("intent", {"intent": intent, "intent_source": intent_source})
+
+        if intent == "find_shipment_company":
+            companies = await top_companies(3)
+            if not companies:
+                reply = "Sorry, no company records found on-chain yet."
+                yield sse("token", {"text": reply})
+                yield sse("done", {"reply": reply})
+                return
+            yield sse("companies", companies)
+            tokens = stream_agent(
+                recommendation_prompt(companies), "recommendation", intent, user_prompt, data_version(companies)
+            )
+        elif intent == "shipment_data":
+            metrics_task = asyncio.create_task(run_agent(METRICS_PROMPT, "metrics", intent, user_prompt))
+            data = await asyncio.wait_for(data_tier.get_tier().shipments(), CHAIN_STAGE_TIMEOUT)
+            with telemetry.span("stats"):
+                stats = await asyncio.to_thread(sensor_stats.summarize, data)
+            with telemetry.span("prompt.summary"):
+                thought = summary_prompt(user_prompt, stats)
+                version = shipments_version(data)
+            # The summary streams as soon as the stats are in; the metric labels and the chart they pick
+            # follow as their own events whenever the classifier answers.
+            tokens = stream_agent(thought, "summary", intent, user_prompt, version)
+
+            async def chart_events():
+                try:
+                    metrics = await asyncio.wait_for(metrics_task, LLM_STAGE_TIMEOUT)
+                except Exception:
+                    L.exception("Metric classification failed")
+                    metrics = ""
+                return [
+                    sse("metrics", {"metrics": chart_metrics(metrics)}),
+                    sse("chart_data", build_chart_data(data, metrics, req, fmt)),
+                ]
+
+            late = asyncio.create_task(chart_events())
+        elif intent == "onchain":
+            tokens = stream_agent(user_prompt, "onchain", intent, user_prompt)
+        else:
+            tokens = stream_agent(advice_prompt(user_prompt), "advice", intent, user_prompt)
+
+        reply = []
+        async for kind, value in merge_events(tokens, late):
+            if kind == "token":
+                reply.append(value)
+                yield sse("token", {"text": value})
+            else:
+                for event in value:
+                    yield event
+        yield sse("done", {"reply": "".join(reply)})
+    except admission.OverloadedError as e:
+        if not started:
+            raise  # nothing sent yet: query_stream answers with the 429/503 itself
+        L.warning(f"Shed /query/stream: {e}")
+        yield sse("error", {
+            "reply": "Sorry, the assistant is busy. Please try again shortly.",
+            "status": e.status_code,
+            "retry_after": e.retry_after,
+        })
+    except Exception:
+        L.exception("Error in stream_query")
+        yield sse("error", {"reply": "Sorry, something went wrong while processing your request."})
+    finally:
+        for task in (metrics_task, late):
+            if task is not None:
+                task.cancel()
+
+async def prepend(first, events):
+    yield first
+    async with aclosing(events):
+        async for event in events:
+            yield event
+
+@app.post("/query/stream")
+async def query_stream(req: QueryRequest, format: Literal["json", "columnar"] = "json"):
+    """Server-Sent Events: `intent`, `companies`, then `token`s and a final `done` (and `timings`).
+
+    For shipment data the summary `token`s start once the sensor stats are ready; `metrics` and
+    `chart_data` arrive in between as soon as the metric classifier answers.
+
+    A request shed by admission control before its first event gets a 429/503 response; one shed later
+    ends with an `error` event carrying the status.
+    """
+    events = stream_query(req, format)
+    try:
+        # Intent detection runs before the response starts, so a request shed there gets a real 429/503.
+        first = await anext(events)
+    except admission.OverloadedError as e:
+        raise overloaded(e)
+    return StreamingResponse(
+        prepend(first, events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,125 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.20;
+
+contract CompanyShipmentTracker {
+
+    struct ShipmentEntry {
+        uint256 deliveryTime; // in seconds
+        bool success;
+        uint256 feedbackScore; // 0 - 10000 (i.e., 9855 = 98.55%)
+        uint256 timestamp;
+    }
+
+    struct CompanyData {
+        string name;
+        uint256 totalDeliveries;
+        uint256 successfulDeliveries;
+        uint256 unsuccessfulDeliveries;
+        uint256 totalFeedbackScore;
+        uint256 totalDeliveryTime;
+        ShipmentEntry[] entries;
+    }
+
+    // CompanyData without its entries, for the paged view.
+    struct CompanySummary {
+        string name;
+        uint256 totalDeliveries;
+        uint256 successfulDeliveries;
+        uint256 unsuccessfulDeliveries;
+        uint256 totalFeedbackScore;
+        uint256 totalDeliveryTime;
+    }
+
+    mapping(string => CompanyData) private companies;
+    string[] private companyNames;
+
+    event CompanyEntryAdded(string indexed name, ShipmentEntry entry);
+
+    function addShipmentEntry(string memory name, uint256 deliveryTime, bool success, uint256 feedbackScore) external {
+        CompanyData storage company = companies[name];
+        if (company.totalDeliveries == 0) {
+            company.name = name;
+            companyNames.push(name);
+        }
+
+        ShipmentEntry memory entry = ShipmentEntry({
+            deliveryTime: deliveryTime,
+            success: success,
+            feedbackScore: feedbackScore,
+            timestamp: block.timestamp
+        });
+        company.entries.push(entry);
+
+        company.totalDeliveries++;
+        if (success) {
+            company.successfulDeliveries++;
+        } else {
+            company.unsuccessfulDeliveries++;
+        }
+        company.totalFeedbackScore += feedbackScore;
+        company.totalDeliveryTime += deliveryTime;
+
+        emit CompanyEntryAdded(name, entry);
+    }
+
+    function getCompanyMetrics(string memory name) external view returns (
+        string memory companyName,
+        uint256 totalDeliveries,
+        uint256 successRate, // 0 - 10000
+        uint256 avgFeedbackScore, // 0 - 10000
+        uint256 avgDeliveryScore, // 0 - 100, one point off per started 20 minutes of average delivery time
+        uint256 successfulDeliveries,
+        uint256 unsuccessfulDeliveries
+    ) {
+        CompanyData storage company = companies[name];
+        totalDeliveries = company.totalDeliveries;
+        if (totalDeliveries == 0) {
+            return ("", 0, 0, 0, 0, 0, 0);
+        }
+
+        uint256 avgDeliveryTime = company.totalDeliveryTime / totalDeliveries;
+        uint256 penalty = (avgDeliveryTime + 1199) / 1200;
+
+        companyName = company.name;
+        successRate = (company.successfulDeliveries * 10000) / totalDeliveries;
+        avgFeedbackScore = company.totalFeedbackScore / totalDeliveries;
+        avgDeliveryScore = penalty >= 100 ? 0 : 100 - penalty;
+        successfulDeliveries = company.successfulDeliveries;
+        unsuccessfulDeliveries = company.unsuccessfulDeliveries;
+    }
+
+    function getCompanyEntries(string memory name) external view returns (ShipmentEntry[] memory) {
+        return companies[name].entries;
+    }
+
+    // Copies every company with all of its entries; prefer the paged getCompanies below.
+    function getAllCompanies() external view returns (CompanyData[] memory) {
+        CompanyData[] memory allCompanies = new CompanyData[](companyNames.length);
+        for (uint256 i = 0; i < companyNames.length; i++) {
+            allCompanies[i] = companies[companyNames[i]];
+        }
+        return allCompanies;
+    }
+
+    function getCompanyCount() external view returns (uint256) {
+        return companyNames.length;
+    }
+
+    // Up to `limit` company summaries starting at `offset` (first entry order); empty past the end.
+    function getCompanies(uint256 offset, uint256 limit) external view returns (CompanySummary[] memory page) {
+        uint256 total = companyNames.length;
+        uint256 end = offset >= total ? offset : (limit > total - offset ? total : offset + limit);
+        page = new CompanySummary[](end - offset);
+        for (uint256 i = offset; i < end; i++) {
+            CompanyData storage company = companies[companyNames[i]];
+            page[i - offset] = CompanySummary({
+                name: company.name,
+                totalDeliveries: company.totalDeliveries,
+                successfulDeliveries: company.successfulDeliveries,
+                unsuccessfulDeliveries: company.unsuccessfulDeliveries,
+                totalFeedbackScore: company.totalFeedbackScore,
+                totalDeliveryTime: company.totalDeliveryTime
+            });
+        }
+    }
+}
@@ -0,0 +1,97 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.20;
+
+contract LogisticsDataStorage {
+
+    struct SensorData {
+        uint256 timestamp;
+        int16 temperature; // °C x100
+        uint16 humidity; // % x100
+        uint16 vibrations;
+        int16 accelX;
+        int16 accelY;
+        int16 accelZ;
+    }
+
+    struct Delivery {
+        address company;
+        string origin;
+        string destination;
+        string cargoType;
+        string status;
+        uint256 createdAt;
+    }
+
+    mapping(bytes32 => Delivery) public deliveries;
+    mapping(bytes32 => SensorData[]) private sensorData;
+
+    event DeliveryCreated(bytes32 indexed shipmentId, address indexed company);
+    event DataSubmitted(bytes32 indexed shipmentId, SensorData data);
+
+    function createDelivery(
+        bytes32 shipmentId,
+        string memory origin,
+        string memory destination,
+        string memory cargoType
+    ) external {
+        require(deliveries[shipmentId].company == address(0), "Shipment already exists");
+
+        deliveries[shipmentId] = Delivery({
+            company: msg.sender,
+            origin: origin,
+            destination: destination,
+            cargoType: cargoType,
+            status: "Created",
+            createdAt: block.timestamp
+        });
+        emit DeliveryCreated(shipmentId, msg.sender);
+    }
+
+    function submitSensorData(
+        bytes32 shipmentId,
+        int16 temperature,
+        uint16 humidity,
+        uint16 vibrations,
+        int16 accelX,
+        int16 accelY,
+        int16 accelZ
+    ) external {
+        require(deliveries[shipmentId].company != address(0), "Unknown shipment");
+
+        SensorData memory data = SensorData({
+            timestamp: block.timestamp,
+            temperature: temperature,
+            humidity: humidity,
+            vibrations: vibrations,
+            accelX: accelX,
+            accelY: accelY,
+            accelZ: accelZ
+        });
+        sensorData[shipmentId].push(data);
+        emit DataSubmitted(shipmentId, data);
+    }
+
+    // Copies the whole sensor history; prefer the paged overload below.
+    function getDeliveryData(bytes32 shipmentId) external view returns (SensorData[] memory) {
+        return sensorData[shipmentId];
+    }
+
+    function getDeliveryDataLength(bytes32 shipmentId) external view returns (uint256) {
+        return sensorData[shipmentId].length;
+    }
+
+    // Up to `limit` readings starting at `offset` (submission order); empty past the end.
+    function getDeliveryData(bytes32 shipmentId, uint256 offset, uint256 limit)
+        external
+        view
+        returns (SensorData[] memory page)
+    {
+        SensorData[] storage history = sensorData[shipmentId];
+        uint256 total = history.length;
+        uint256 end = offset >= total ? offset : (limit > total - offset ? total : offset + limit);
+        page = new SensorData[](end - offset);
+        for (uint256 i = offset; i < end; i++) {
+            page[i - offset] = history[i];
+        }
+    }
+}
@@ -0,0 +1,103 @@
+import os
+import logging
+from hexbytes import HexBytes
+from eth_utils import get_abi_output_types
+
+"""
+Bulk `getDeliveryData` reads.
+
+Packs many `eth_call`s into JSON-RPC batch requests so thousands of shipments
+cost a handful of round-trips instead of one blocking call each. Every item is
+decoded independently: a revert or RPC error for one shipment is reported in
+`failures` and never fails the rest of the batch.
+"""
+
+# === CONFIG ===
+RPC_BATCH_SIZE = int(os.getenv("RPC_BATCH_SIZE", "200"))
+
+log = logging.getLogger(__name__)
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+async def batch_call(web3, contract, fn_name, args_list, batch_size=RPC_BATCH_SIZE, block="latest"):
+    """
+    Call `fn_name` once per entry of `args_list` using JSON-RPC batches.
+    Overloaded functions are named by signature, e.g. "getDeliveryData(bytes32)".
+
+    Returns `(results, failures)`, both lists aligned with `args_list`:
+    `results[i]` is the decoded return value (or None) and `failures[i]` is the
+    error message (or None).
+    """
+    if "(" in fn_name:
+        fn_abi = contract.get_function_by_signature(fn_name).abi
+    else:
+        fn_abi = contract.get_function_by_name(fn_name).abi
+    output_types = get_abi_output_types(fn_abi)
+    single = len(output_types) == 1
+
+    results = [None] * len(args_list)
+    failures = [None] * len(args_list)
+
+    def decode(i, raw):
+        try:
+            decoded = web3.codec.decode(output_types, HexBytes(raw))
+            results[i] = decoded[0] if single else decoded
+        except Exception as e:
+            failures[i] = f"decode failed: {e}"
+
+    indexes = list(range(len(args_list)))
+    for chunk in _chunks(indexes, max(1, batch_size)):
+        requests = [
+            ("eth_call", [{"to": contract.address, "data": contract.encode_abi(fn_name, args=args_list[i])}, block])
+            for i in chunk
+        ]
+        try:
+            responses = await web3.provider.make_batch_request(requests)
+        except Exception as e:
+            responses = e
+
+        if not isinstance(responses, list):
+            # The node rejected the whole batch (or does not support batching):
+            # fall back to plain calls so per-item errors are still reported.
+            log.info(f"Batch of {len(chunk)} {fn_name} calls rejected ({responses}), falling back to single calls")
+            for i in chunk:
+                try:
+                    value = await contract.functions[fn_name](*args_list[i]).call(block_identifier=block)
+                    results[i] = value
+                except Exception as e:
+                    failures[i] = str(e)
+            continue
+
+        for i, response in zip(chunk, responses):
+            if "error" in response:
+                failures[i] = response["error"].get("message", str(response["error"]))
+            else:
+                decode(i, response["result"])
+
+    return results, failures
+
+
+async def fetch_delivery_data(web3, contract, shipment_ids, batch_size=RPC_BATCH_SIZE):
+    """
+    Fetch `getDeliveryData` for every shipment in a few batched round-trips.
+
+    Returns `(data, failures)`: `data` maps shipment ID to its sensor tuples and
+    `failures` maps shipment ID to the error message for the calls that failed.
+    """
+    results, errors = await batch_call(
+        web3, contract, "getDeliveryData(bytes32)", [(sid,) for sid in shipment_ids], batch_size=batch_size
+    )
+    data = {}
+    failures = {}
+    for shipment_id, value, error in zip(shipment_ids, results, errors):
+        if error is not None:
+            failures[shipment_id] = error
+        else:
+            data[shipment_id] = value
+    if failures:
+        log.warning(f"getDeliveryData failed for {len(failures)} of {len(shipment_ids)} shipments")
+    return data, failures
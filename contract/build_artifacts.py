@@ -0,0 +1,78 @@
+"""
+Rebuild the contract artifacts from their Solidity sources.
+
+Compiles `contract/<Name>.sol` with solc `SOLC_VERSION` (through py-solc-x,
+which installs that compiler on first use) and writes `contract/<Name>.json`
+in the Hardhat artifact format the app and the tests load, so the ABI and the
+bytecode always come from the source. Run it after changing a contract:
+
+    python -m contract.build_artifacts
+    python -m contract.build_artifacts CompanyShipmentTracker
+"""
+
+import os
+import json
+import argparse
+
+# === CONFIG ===
+SOLC_VERSION = os.getenv("SOLC_VERSION", "0.8.20")
+SOLC_OPTIMIZE = os.getenv("SOLC_OPTIMIZE", "false").lower() == "true"  # Hardhat's default
+
+CONTRACT_DIR = os.path.dirname(os.path.abspath(__file__))
+CONTRACTS = ("CompanyShipmentTracker", "LogisticsDataStorage")
+
+
+def compile_contract(name, solc_version=SOLC_VERSION):
+    """The Hardhat artifact (`hh-sol-artifact-1`) of `contract/<name>.sol`."""
+    import solcx
+
+    if solc_version not in {str(v) for v in solcx.get_installed_solc_versions()}:
+        solcx.install_solc(solc_version)
+    source_name = f"contracts/{name}.sol"
+    with open(os.path.join(CONTRACT_DIR, f"{name}.sol")) as f:
+        source = f.read()
+    output = solcx.compile_standard(
+        {
+            "language": "Solidity",
+            "sources": {source_name: {"content": source}},
+            "settings": {
+                "optimizer": {"enabled": SOLC_OPTIMIZE, "runs": 200},
+                "outputSelection": {"*": {"*": ["abi", "evm.bytecode.object", "evm.deployedBytecode.object"]}},
+            },
+        },
+        solc_version=solc_version,
+    )
+    compiled = output["contracts"][source_name][name]
+    return {
+        "_format": "hh-sol-artifact-1",
+        "contractName": name,
+        "sourceName": source_name,
+        "abi": compiled["abi"],
+        "bytecode": "0x" + compiled["evm"]["bytecode"]["object"],
+        "deployedBytecode": "0x" + compiled["evm"]["deployedBytecode"]["object"],
+        "linkReferences": {},
+        "deployedLinkReferences": {},
+    }
+
+
+def write_artifact(name, artifact):
+    path = os.path.join(CONTRACT_DIR, f"{name}.json")
+    with open(path, "w") as f:
+        json.dump(artifact, f, indent=2)
+        f.write("\n")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("contracts", nargs="*", help=f"default: {' '.join(CONTRACTS)}")
+    parser.add_argument("--solc", default=SOLC_VERSION, help="solc version")
+    args = parser.parse_args()
+    for name in args.contracts or CONTRACTS:
+        artifact = compile_contract(name, args.solc)
+        print(f"✅ {write_artifact(name, artifact)}: {len(artifact['abi'])} ABI entries, "
+              f"{len(artifact['deployedBytecode']) // 2 - 1} bytes deployed")
+
+
+if __name__ == "__main__":
+    main()
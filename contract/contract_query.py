@@ -1,16 +1,16 @@
 import dotenv
 from web3 import Web3
+from rpc_pool import PooledHTTPProvider
 import json
 import os
 # --- CONFIGURATION ---
 dotenv.load_dotenv()
 ABI_PATH = "CompanyShipmentTracker.json"
-RPC_URL = os.getenv('RPC_URL')
 PRIVATE_KEY = os.getenv('PRIVATE_KEY')
 CONTRACT_ADDRESS = os.getenv('CONTRACT_ADDRESS')
 ACCOUNT_ADDRESS = os.getenv('ACCOUNT_ADDRESS')
 # --- SETUP ---
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
+w3 = Web3(PooledHTTPProvider())  # RPC_URLS / RPC_URL, with failover
 with open(ABI_PATH) as f:
     contract_abi = json.load(f)["abi"]
 contract = w3.eth.contract(address=Web3.to_checksum_address(CONTRACT_ADDRESS), abi=contract_abi)
@@ -1,11 +1,13 @@
 import dotenv
+import argparse
 from web3 import Web3
 import json
+from tx_submitter import TxSubmitter, TX_WINDOW
+from rpc_pool import PooledHTTPProvider
 
 # --- CONFIGURATION ---
 import os
 dotenv.load_dotenv()
-RPC_URL = os.getenv('RPC_URL')
 PRIVATE_KEY = os.getenv('PRIVATE_KEY')
 CONTRACT_ADDRESS = os.getenv('CONTRACT_ADDRESS')
 ACCOUNT_ADDRESS = os.getenv('ACCOUNT_ADDRESS')
@@ -15,24 +17,31 @@ with open('CompanyShipmentTracker.json') as f:
 import time
 import random
 # --- SETUP ---
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
+w3 = Web3(PooledHTTPProvider())  # RPC_URLS / RPC_URL, with failover
 contract = w3.eth.contract(address=Web3.to_checksum_address(CONTRACT_ADDRESS), abi=contract_abi)
 
 contract = w3.eth.contract(address=Web3.to_checksum_address(CONTRACT_ADDRESS), abi=contract_abi)
 
-def send_tx(fn):
-    nonce = w3.eth.get_transaction_count(ACCOUNT_ADDRESS)
-    tx = fn.build_transaction({
-        'from': ACCOUNT_ADDRESS,
-        'nonce': nonce,
-        'gas': 300000,
-        'gasPrice': w3.to_wei('2', 'gwei')
-    })
-    signed = w3.eth.account.sign_transaction(tx, PRIVATE_KEY)
-    tx_hash = w3.eth.send_raw_transaction(signed.raw_transaction)
-    receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
-    print(f"✅ TX confirmed: {tx_hash.hex()}")
-    return receipt
+parser = argparse.ArgumentParser(description="Seed shipment entries for a list of companies")
+parser.add_argument("--mode", choices=["pipelined", "serial"], default="pipelined",
+                    help="serial waits for each receipt before sending the next tx")
+parser.add_argument("--window", type=int, default=TX_WINDOW, help="max transactions in flight when pipelined")
+parser.add_argument("--entries", type=int, default=5, help="shipment entries per company")
+args = parser.parse_args()
+
+def print_receipt(label, receipt):
+    print(f"✅ TX confirmed: {Web3.to_hex(receipt['transactionHash'])} ({label})")
+
+submitter = TxSubmitter(
+    w3,
+    PRIVATE_KEY,
+    window=1 if args.mode == "serial" else args.window,
+    gas_price=w3.to_wei('2', 'gwei'),
+    on_receipt=print_receipt,
+)
+
+def send_tx(fn, label=None):
+    return submitter.submit(fn, label=label)
 
 def generate_shipments(n):
     return [
@@ -53,8 +62,9 @@ company_list = [
     "TurboTrek Cargo"
 ]
 
+start = time.time()
 for company in company_list:
-    entries = generate_shipments(5)
+    entries = generate_shipments(args.entries)
     print(f"\n📦 Sending entries for: {company}")
     for idx, (deliveryTime, success, feedbackScore) in enumerate(entries):
         print(f"  ↪ Entry {idx+1}: Delivery={deliveryTime}, Success={success}, Feedback={feedbackScore}")
@@ -64,8 +74,10 @@ for company in company_list:
                 deliveryTime,
                 success,
                 feedbackScore
-            )
+            ),
+            label=f"{company} #{idx+1}"
         )
         # time.sleep(1.2)  # slight delay for rate-limited nodes
 
-print("\n✅ All companies processed.")
\ No newline at end of file
+submitter.wait()
+print(f"\n✅ All companies processed in {time.time() - start:.1f}s ({args.mode}).")
\ No newline at end of file
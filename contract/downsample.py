@@ -0,0 +1,63 @@
+import numpy as np
+
+"""
+Shape-preserving downsampling for chart series.
+
+Both methods return the *indices* of the points to keep, so the caller can
+slice any number of aligned columns (timestamps, values) with one selection.
+
+- `lttb`: Largest-Triangle-Three-Buckets; keeps the points that contribute
+  the most visual area, the usual choice for line charts.
+- `minmax`: keeps the minimum and maximum of every bucket, so spikes (e.g.
+  vibration peaks or temperature excursions) are never dropped.
+"""
+
+METHODS = ("lttb", "minmax")
+
+
+def lttb(x, y, n_out):
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # n_out - 2 buckets over the points between the fixed first and last one.
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i == n_out - 3:
+            avg_x, avg_y = x[-1], y[-1]
+        else:
+            nxt_hi = edges[i + 2]
+            avg_x, avg_y = x[hi:nxt_hi].mean(), y[hi:nxt_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+
+def minmax(x, y, n_out):
+    n = len(y)
+    if n_out >= n or n_out < 2:
+        return np.arange(n)
+    y = np.asarray(y)
+    keep = []
+    for bucket in np.array_split(np.arange(n), n_out // 2):
+        values = y[bucket]
+        keep.append(bucket[np.argmin(values)])
+        keep.append(bucket[np.argmax(values)])
+    return np.unique(np.asarray(keep, dtype=np.int64))
+
+
+def downsample(x, y, n_out, method="lttb"):
+    """Return the indices of at most `n_out` points of `(x, y)` chosen by `method`."""
+    if method == "lttb":
+        return lttb(x, y, n_out)
+    if method == "minmax":
+        return minmax(x, y, n_out)
+    raise ValueError(f"Unknown downsampling method: {method}")
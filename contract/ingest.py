@@ -0,0 +1,281 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+import numpy as np
+from web3 import Web3
+
+from contract.tx_submitter import TxSubmitter
+from contract.rpc_pool import PooledHTTPProvider
+from contract.web3_client import LOGISTICS_ABI_PATH, load_abi, get_pool
+
+"""
+Buffered sensor ingest.
+
+Devices post readings at their own sampling rate; readings are buffered per
+shipment and flushed when a shipment has `INGEST_FLUSH_READINGS` buffered or
+its oldest reading is `INGEST_FLUSH_SECONDS` old. A flush appends the raw
+readings to `INGEST_RAW_PATH` (JSON lines, append-only) and reduces each
+shipment's window to `INGEST_POINTS_PER_FLUSH` aggregated readings, which are
+written on-chain through `submitSensorData` with a pipelined `TxSubmitter`.
+
+Each bucket keeps the mean temperature, humidity and acceleration and the peak
+vibration, so shocks survive aggregation. The chain write load is therefore
+bounded by shipments x points per window, independent of the sampling rate.
+Once `INGEST_MAX_BUFFERED` readings (or unsent aggregates, when the chain is
+unreachable) are waiting, `add()` refuses new ones until a flush drains them.
+
+A chain write gives up after `INGEST_FLUSH_TIMEOUT` seconds. Writes go out in
+order and a failed one reports how many were sent before it
+(`PartialWriteError`), so only the rest are retried on the next flush and no
+reading lands on-chain twice.
+"""
+
+# === CONFIG ===
+INGEST_FLUSH_READINGS = int(os.getenv("INGEST_FLUSH_READINGS", "600"))
+INGEST_FLUSH_SECONDS = float(os.getenv("INGEST_FLUSH_SECONDS", "60"))
+INGEST_POINTS_PER_FLUSH = int(os.getenv("INGEST_POINTS_PER_FLUSH", "4"))
+INGEST_MAX_BUFFERED = int(os.getenv("INGEST_MAX_BUFFERED", "200000"))
+INGEST_FLUSH_TIMEOUT = float(os.getenv("INGEST_FLUSH_TIMEOUT", "120"))
+INGEST_RAW_PATH = os.getenv("INGEST_RAW_PATH", os.path.join(os.path.dirname(__file__), "ingest_raw.jsonl"))
+
+# Reading layout, in the on-chain units of `submitSensorData` (temperature and humidity x100).
+FIELDS = ("temperature", "humidity", "vibrations", "accelX", "accelY", "accelZ")
+LIMITS = {
+    "temperature": (-32768, 32767),
+    "humidity": (0, 65535),
+    "vibrations": (0, 65535),
+    "accelX": (-32768, 32767),
+    "accelY": (-32768, 32767),
+    "accelZ": (-32768, 32767),
+}
+
+log = logging.getLogger(__name__)
+
+
+class BackpressureError(RuntimeError):
+    pass
+
+
+class PartialWriteError(RuntimeError):
+    """A chain write that failed after its first `sent` writes were accepted by the node."""
+
+    def __init__(self, sent, error):
+        super().__init__(f"❌ Chain write failed after {sent} sent writes: {error}")
+        self.sent = sent
+        self.error = error
+
+
+def aggregate(rows, points):
+    """Reduce an (n, 6) reading array to at most `points` rows: means, but the peak vibration."""
+    if len(rows) <= points:
+        return rows.astype(np.int64)
+    out = []
+    for bucket in np.array_split(rows, points):
+        row = np.rint(bucket.mean(axis=0)).astype(np.int64)
+        row[2] = bucket[:, 2].max()
+        out.append(row)
+    return np.array(out)
+
+
+class ShipmentBuffer:
+    __slots__ = ("rows", "timestamps", "first_at")
+
+    def __init__(self):
+        self.rows = []
+        self.timestamps = []
+        self.first_at = time.monotonic()
+
+
+class IngestGateway:
+    def __init__(
+        self,
+        submit=None,
+        flush_readings=INGEST_FLUSH_READINGS,
+        flush_seconds=INGEST_FLUSH_SECONDS,
+        points_per_flush=INGEST_POINTS_PER_FLUSH,
+        max_buffered=INGEST_MAX_BUFFERED,
+        raw_path=INGEST_RAW_PATH,
+        flush_timeout=INGEST_FLUSH_TIMEOUT,
+    ):
+        """`submit(writes, timeout)` sends `[(shipment_id, row), ...]` on-chain (blocking); defaults to `ChainWriter`.
+
+        When it raises, the exception's `sent` (see `PartialWriteError`) is how many leading writes
+        reached the chain anyway; only the others are retried.
+        """
+        self.submit = submit
+        self.flush_timeout = flush_timeout
+        self.flush_readings = flush_readings
+        self.flush_seconds = flush_seconds
+        self.points_per_flush = points_per_flush
+        self.max_buffered = max_buffered
+        self.raw_path = raw_path
+        self.buffers = {}  # shipment id (bytes) -> ShipmentBuffer
+        self.buffered = 0
+        self.unsent = []  # aggregated writes retried on the next flush
+        self.wakeup = asyncio.Event()
+        self.flush_lock = asyncio.Lock()
+        self.accepted = self.rejected = self.flushes = self.written = 0
+
+    def add(self, readings):
+        """Buffer `readings` (dicts with `shipmentId` and FIELDS); all or nothing."""
+        if self.buffered + len(self.unsent) + len(readings) > self.max_buffered:
+            self.rejected += len(readings)
+            raise BackpressureError(f"❌ Ingest buffer full ({self.buffered} readings waiting)")
+
+        now = int(time.time())
+        parsed = []
+        for r in readings:
+            shipment_id = bytes(Web3.to_bytes(hexstr=r["shipmentId"]))
+            if len(shipment_id) != 32:
+                raise ValueError(f"❌ shipmentId must be 32 bytes: {r['shipmentId']}")
+            row = []
+            for field in FIELDS:
+                value = int(r[field])
+                lo, hi = LIMITS[field]
+                if not lo <= value <= hi:
+                    raise ValueError(f"❌ {field}={value} out of range [{lo}, {hi}]")
+                row.append(value)
+            parsed.append((shipment_id, row, int(r.get("timestamp") or now)))
+
+        for shipment_id, row, timestamp in parsed:
+            buffer = self.buffers.get(shipment_id)
+            if buffer is None:
+                buffer = self.buffers[shipment_id] = ShipmentBuffer()
+            buffer.rows.append(row)
+            buffer.timestamps.append(timestamp)
+            if len(buffer.rows) >= self.flush_readings:
+                self.wakeup.set()
+        self.buffered += len(parsed)
+        self.accepted += len(parsed)
+        return len(parsed)
+
+    def _due(self, force=False):
+        now = time.monotonic()
+        return [
+            shipment_id
+            for shipment_id, buffer in self.buffers.items()
+            if force or len(buffer.rows) >= self.flush_readings or now - buffer.first_at >= self.flush_seconds
+        ]
+
+    async def flush(self, force=False):
+        """Flush every shipment that hit a size or time window (all of them when `force`)."""
+        async with self.flush_lock:
+            taken = {shipment_id: self.buffers.pop(shipment_id) for shipment_id in self._due(force)}
+            if not taken and not self.unsent:
+                return 0
+            self.buffered -= sum(len(b.rows) for b in taken.values())
+
+            writes = list(self.unsent)
+            for shipment_id, buffer in taken.items():
+                for row in aggregate(np.array(buffer.rows), self.points_per_flush):
+                    writes.append((shipment_id, [int(v) for v in row]))
+
+            await asyncio.to_thread(self._append_raw, taken)
+            try:
+                await asyncio.to_thread(self._submit, writes)
+                sent = len(writes)
+            except Exception as e:
+                sent = getattr(e, "sent", 0)
+                log.exception(
+                    f"On-chain write of {len(writes)} aggregated readings failed after {sent} were sent, "
+                    "retrying the rest next flush"
+                )
+            self.unsent = writes[sent:]
+            self.written += sent
+            self.flushes += 1
+            return len(writes)
+
+    def _append_raw(self, taken):
+        if not taken:
+            return
+        with open(self.raw_path, "a") as f:
+            for shipment_id, buffer in taken.items():
+                sid = Web3.to_hex(shipment_id)
+                for row, timestamp in zip(buffer.rows, buffer.timestamps):
+                    f.write(json.dumps({"shipmentId": sid, "timestamp": timestamp, **dict(zip(FIELDS, row))}))
+                    f.write("\n")
+
+    def _submit(self, writes):
+        if not writes:
+            return
+        if self.submit is None:
+            self.submit = ChainWriter()
+        self.submit(writes, self.flush_timeout)
+
+    async def run(self):
+        """Flush on size or time windows until cancelled, then flush what is left."""
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=min(self.flush_seconds, 5))
+                except asyncio.TimeoutError:
+                    pass
+                self.wakeup.clear()
+                try:
+                    await self.flush()
+                except Exception:
+                    log.exception("Ingest flush failed")
+        except asyncio.CancelledError:
+            await self.flush(force=True)
+            raise
+
+    def stats(self):
+        return {
+            "buffered": self.buffered,
+            "shipments": len(self.buffers),
+            "max_buffered": self.max_buffered,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "flushes": self.flushes,
+            "written": self.written,
+            "unsent": len(self.unsent),
+        }
+
+
+class ChainWriter:
+    """Blocking `submitSensorData` writer for flush threads; one nonce sequence per process.
+
+    Transactions still pending when a call times out stay with the submitter and are collected by
+    the next call.
+    """
+
+    def __init__(self, web3=None, contract=None, private_key=None):
+        self.web3 = web3 or Web3(PooledHTTPProvider(get_pool()))
+        self.contract = contract or self.web3.eth.contract(
+            address=Web3.to_checksum_address(os.getenv("LOGISTICS_CONTRACT_ADDRESS")),
+            abi=load_abi(LOGISTICS_ABI_PATH),
+        )
+        self.submitter = TxSubmitter(self.web3, private_key or os.getenv("PRIVATE_KEY"))
+        self.lock = threading.Lock()
+
+    def __call__(self, writes, timeout=INGEST_FLUSH_TIMEOUT):
+        deadline = time.monotonic() + timeout
+        if not self.lock.acquire(timeout=timeout):
+            raise PartialWriteError(0, TimeoutError("another flush is still writing"))
+        sent = 0
+        try:
+            for shipment_id, row in writes:
+                fn = self.contract.functions.submitSensorData(shipment_id, *row)
+                self.submitter.submit(fn, timeout=max(0.0, deadline - time.monotonic()))
+                sent += 1
+            receipts = self.submitter.wait(max(0.0, deadline - time.monotonic()))
+        except Exception as e:
+            raise PartialWriteError(sent, e) from e
+        finally:
+            self.lock.release()
+        reverted = sum(1 for r in receipts if not r["status"])
+        if reverted:
+            log.warning(f"{reverted}/{len(writes)} aggregated sensor writes reverted")
+
+
+_gateway = None
+
+
+def get_gateway():
+    global _gateway
+    if _gateway is None:
+        _gateway = IngestGateway()
+    return _gateway
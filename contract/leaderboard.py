@@ -0,0 +1,271 @@
+import os
+import asyncio
+import bisect
+import logging
+from web3 import Web3
+
+from contract import single_flight
+from contract.paged_views import iter_companies
+from contract.log_indexer import LogIndexer
+from contract.web3_client import get_web3, get_tracker_contract
+
+"""
+Company leaderboard maintained from `CompanyEntryAdded` events.
+
+`getAllCompanies()` returns every company with its full shipment array, which
+grows with every delivery. The leaderboard instead folds each new
+`CompanyEntryAdded` event into per-company counters (persisted through the
+shared indexer store) and keeps the companies in a sorted ranking, so a top-N
+query is answered from memory without touching the RPC.
+
+The event indexes the company name, so logs only carry its keccak hash. Names
+are resolved once per company from the `addShipmentEntry` transaction input,
+falling back to paging through the `getCompanies` summaries.
+"""
+
+# === CONFIG ===
+LEADERBOARD_POLL_INTERVAL = float(os.getenv("LEADERBOARD_POLL_INTERVAL", "5"))
+
+# `getCompanyMetrics` scores the average delivery time against this bound.
+MAX_DELIVERY_TIME = 120000
+
+log = logging.getLogger(__name__)
+
+
+class CompanyStats:
+    """Running totals for one company; derived metrics match `getCompanyMetrics`."""
+
+    __slots__ = ("name", "deliveries", "successes", "feedback_total", "delivery_time_total")
+
+    def __init__(self, name, deliveries=0, successes=0, feedback_total=0, delivery_time_total=0):
+        self.name = name
+        self.deliveries = deliveries
+        self.successes = successes
+        self.feedback_total = feedback_total
+        self.delivery_time_total = delivery_time_total
+
+    def add(self, delivery_time, success, feedback):
+        self.deliveries += 1
+        self.successes += 1 if success else 0
+        self.feedback_total += feedback
+        self.delivery_time_total += delivery_time
+
+    def merged(self, other):
+        return CompanyStats(
+            self.name,
+            self.deliveries + other.deliveries,
+            self.successes + other.successes,
+            self.feedback_total + other.feedback_total,
+            self.delivery_time_total + other.delivery_time_total,
+        )
+
+    @property
+    def success_rate(self):
+        """Basis points (10000 = 100%)."""
+        return self.successes * 10000 // self.deliveries if self.deliveries else 0
+
+    @property
+    def avg_feedback(self):
+        """Basis points (10000 = 100%)."""
+        return self.feedback_total // self.deliveries if self.deliveries else 0
+
+    @property
+    def delivery_score(self):
+        """0 - 100, lower average delivery time scores higher."""
+        if not self.deliveries:
+            return 0
+        avg = self.delivery_time_total // self.deliveries
+        penalty = -(-avg * 100 // MAX_DELIVERY_TIME)
+        return max(0, 100 - penalty)
+
+    def rank_key(self, name_hash):
+        return (-self.success_rate, -self.avg_feedback, name_hash)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "successRate": round(self.success_rate / 100, 2),
+            "feedbackScore": round(self.avg_feedback / 100, 2),
+            "deliveryScore": self.delivery_score,
+            "deliveries": self.deliveries,
+        }
+
+
+class CompanyLeaderboard(LogIndexer):
+    table = "company_entries"
+    columns = (
+        "contract", "tx_hash", "log_index", "name_hash",
+        "delivery_time", "success", "feedback", "timestamp", "block",
+    )
+    schema = (
+        "CREATE TABLE IF NOT EXISTS company_entries ("
+        " contract TEXT NOT NULL,"
+        " tx_hash BLOB NOT NULL,"
+        " log_index INTEGER NOT NULL,"
+        " name_hash BLOB NOT NULL,"
+        " delivery_time INTEGER NOT NULL,"
+        " success INTEGER NOT NULL,"
+        " feedback INTEGER NOT NULL,"
+        " timestamp INTEGER NOT NULL,"
+        " block INTEGER NOT NULL,"
+        " PRIMARY KEY (contract, tx_hash, log_index))",
+        "CREATE TABLE IF NOT EXISTS company_names ("
+        " contract TEXT NOT NULL,"
+        " name_hash BLOB NOT NULL,"
+        " name TEXT NOT NULL,"
+        " PRIMARY KEY (contract, name_hash))",
+    )
+
+    def __init__(self, web3, contract, **kwargs):
+        super().__init__(web3, contract.address, contract.abi, "CompanyEntryAdded", **kwargs)
+        self.contract = contract
+        self.names = {
+            bytes(h): name
+            for h, name in self.store.execute(
+                "SELECT name_hash, name FROM company_names WHERE contract = ?", (self.address,)
+            )
+        }
+        self.stats = {}
+        self.ranking = []  # sorted rank keys, best first
+        self.tip_stats = {}
+        self.synced = False
+
+        for h, deliveries, successes, feedback, delivery_time in self.store.execute(
+            "SELECT name_hash, COUNT(*), SUM(success), SUM(feedback), SUM(delivery_time) "
+            "FROM company_entries WHERE contract = ? GROUP BY name_hash",
+            (self.address,),
+        ):
+            h = bytes(h)
+            self.stats[h] = CompanyStats(self.names.get(h), deliveries, successes, feedback, delivery_time)
+            self.ranking.append(self.stats[h].rank_key(h))
+        self.ranking.sort()
+
+    @staticmethod
+    def _name_hash(event):
+        return bytes(event["args"]["name"])
+
+    @staticmethod
+    def _entry(event):
+        entry = event["args"]["entry"]
+        return entry["deliveryTime"], entry["success"], entry["feedbackScore"], entry["timestamp"]
+
+    async def prepare(self, events):
+        unknown = {}
+        for e in events:
+            h = self._name_hash(e)
+            if h not in self.names and h not in unknown:
+                unknown[h] = e["transactionHash"]
+        if unknown:
+            await self._resolve_names(unknown)
+
+    async def _resolve_names(self, unknown):
+        resolved = {}
+        for h, tx_hash in unknown.items():
+            try:
+                tx = await self.web3.eth.get_transaction(tx_hash)
+                _, args = self.contract.decode_function_input(tx["input"])
+                if bytes(Web3.keccak(text=args["name"])) == h:
+                    resolved[h] = args["name"]
+            except Exception as e:
+                log.info(f"Could not decode company name from tx {Web3.to_hex(tx_hash)}: {e}")
+
+        if len(resolved) < len(unknown):
+            # Entries added through another contract: page through the company summaries until all are named.
+            async for company in iter_companies(self.contract):
+                h = bytes(Web3.keccak(text=company[0]))
+                if h in unknown:
+                    resolved[h] = company[0]
+                    if len(resolved) == len(unknown):
+                        break
+
+        for h, name in resolved.items():
+            self.names[h] = name
+            if h in self.stats:
+                self.stats[h].name = name
+            self.store.execute(
+                "INSERT OR IGNORE INTO company_names (contract, name_hash, name) VALUES (?, ?, ?)",
+                (self.address, h, name),
+            )
+
+    def rows(self, events):
+        rows = []
+        for e in events:
+            delivery_time, success, feedback, timestamp = self._entry(e)
+            rows.append((
+                self.address, bytes(e["transactionHash"]), e["logIndex"], self._name_hash(e),
+                delivery_time, int(success), feedback, timestamp, e["blockNumber"],
+            ))
+        return rows
+
+    def on_checkpoint(self, events):
+        for e in events:
+            h = self._name_hash(e)
+            stats = self.stats.get(h)
+            if stats is None:
+                stats = self.stats[h] = CompanyStats(self.names.get(h))
+            else:
+                del self.ranking[bisect.bisect_left(self.ranking, stats.rank_key(h))]
+            delivery_time, success, feedback, _ = self._entry(e)
+            stats.add(delivery_time, success, feedback)
+            bisect.insort(self.ranking, stats.rank_key(h))
+
+    async def refresh(self):
+        tip = await self.sync()
+        tip_stats = {}
+        for e in tip:
+            h = self._name_hash(e)
+            if h not in tip_stats:
+                tip_stats[h] = CompanyStats(self.names.get(h))
+            delivery_time, success, feedback, _ = self._entry(e)
+            tip_stats[h].add(delivery_time, success, feedback)
+        self.tip_stats = tip_stats
+        self.synced = True
+
+    def top(self, n=3):
+        """Best `n` companies by success rate, then average feedback."""
+        if not self.tip_stats:
+            return [self.stats[key[-1]] for key in self.ranking[:n]]
+
+        # Unconfirmed entries can only move the companies they touch.
+        candidates = {key[-1] for key in self.ranking[:n + len(self.tip_stats)]} | set(self.tip_stats)
+        merged = []
+        for h in candidates:
+            stats = self.stats.get(h)
+            tip = self.tip_stats.get(h)
+            if stats and tip:
+                stats = stats.merged(tip)
+            merged.append((stats or tip).rank_key(h) + (stats or tip,))
+        merged.sort(key=lambda row: row[:3])
+        return [row[-1] for row in merged[:n]]
+
+    async def run(self, interval=LEADERBOARD_POLL_INTERVAL):
+        """Keep following new entries until cancelled."""
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("Leaderboard refresh failed")
+            await asyncio.sleep(interval)
+
+
+_leaderboard = None
+
+
+async def get_leaderboard(refresh=True):
+    """Shared leaderboard; synced on first use unless `refresh` is False."""
+    global _leaderboard
+    web3 = await get_web3()
+    contract = await get_tracker_contract()
+    if _leaderboard is None or _leaderboard.web3 is not web3 or _leaderboard.address != contract.address:
+        _leaderboard = CompanyLeaderboard(web3, contract)
+    if refresh and not _leaderboard.synced:
+        await single_flight.coalesced("leaderboard", web3, _leaderboard.refresh)
+    return _leaderboard
+
+
+async def follow(interval=LEADERBOARD_POLL_INTERVAL):
+    """Background task keeping the shared leaderboard up to date."""
+    board = await get_leaderboard(refresh=False)
+    await board.run(interval)
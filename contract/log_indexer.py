@@ -0,0 +1,200 @@
+import os
+import sqlite3
+import logging
+import asyncio
+import threading
+from web3 import Web3
+from eth_utils import event_abi_to_log_topic
+from web3._utils.events import get_event_data
+
+"""
+Checkpointed event indexer.
+
+Instead of asking the node for `fromBlock: 0 .. latest` on every request, each
+indexer keeps a per-contract/per-event block cursor in a local SQLite file and
+only scans the blocks produced since the last checkpoint.
+
+- Ranges are scanned in chunks; the chunk size halves when the provider rejects
+  a range (too many results / range too large) and grows back on success.
+- Only blocks at least `confirmations` deep are checkpointed. The unconfirmed
+  tip is re-scanned on every sync and never persisted, so a reorg cannot leave
+  stale entries behind.
+"""
+
+# === CONFIG ===
+INDEXER_DB = os.getenv("INDEXER_DB", os.path.join(os.path.dirname(__file__), "indexer.db"))
+INDEXER_CONFIRMATIONS = int(os.getenv("INDEXER_CONFIRMATIONS", "12"))
+INDEXER_START_BLOCK = int(os.getenv("INDEXER_START_BLOCK", "0"))
+INDEXER_MAX_CHUNK = int(os.getenv("INDEXER_MAX_CHUNK", "10000"))
+
+log = logging.getLogger(__name__)
+
+_store = None
+
+
+class IndexStore:
+    """SQLite-backed block cursors plus the tables of the indexers sharing it."""
+
+    def __init__(self, path=INDEXER_DB):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS cursors (key TEXT PRIMARY KEY, block INTEGER NOT NULL)"
+            )
+
+    def get_cursor(self, key, default):
+        with self.lock:
+            row = self.conn.execute("SELECT block FROM cursors WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def checkpoint(self, key, block, rows=(), table=None, columns=()):
+        """Store `rows` and move the cursor in one transaction."""
+        with self.lock, self.conn:
+            if rows:
+                placeholders = ", ".join("?" for _ in columns)
+                self.conn.executemany(
+                    f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+                    rows,
+                )
+            self.conn.execute(
+                "INSERT INTO cursors (key, block) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET block = excluded.block",
+                (key, block),
+            )
+
+    def execute(self, sql, params=()):
+        with self.lock, self.conn:
+            return self.conn.execute(sql, params).fetchall()
+
+
+def get_store():
+    """Process-wide store so every indexer shares one SQLite connection."""
+    global _store
+    if _store is None:
+        _store = IndexStore()
+    return _store
+
+
+async def scan_logs(web3, address, topic, from_block, to_block, chunk=INDEXER_MAX_CHUNK):
+    """Yield `(chunk_end, logs)` for [from_block, to_block], adapting chunk size to provider limits."""
+    start = from_block
+    while start <= to_block:
+        end = min(start + chunk - 1, to_block)
+        try:
+            logs = await web3.eth.get_logs({
+                "fromBlock": start,
+                "toBlock": end,
+                "address": address,
+                "topics": [topic],
+            })
+        except Exception as e:
+            if end == start:
+                raise RuntimeError(f"❌ Failed to fetch logs for block {start}: {e}")
+            chunk = max(1, (end - start + 1) // 2)
+            log.info(f"get_logs {start}-{end} rejected ({e}), retrying with chunk={chunk}")
+            continue
+        yield end, logs
+        start = end + 1
+        chunk = min(chunk * 2, INDEXER_MAX_CHUNK)
+
+
+class LogIndexer:
+    """Follows one event of one contract. Subclasses turn decoded events into rows."""
+
+    table = None
+    columns = ()
+    schema = ()
+
+    def __init__(self, web3, address, abi, event_name, store=None,
+                 confirmations=INDEXER_CONFIRMATIONS, start_block=INDEXER_START_BLOCK):
+        self.web3 = web3
+        self.address = Web3.to_checksum_address(address)
+        self.event_abi = next(
+            (item for item in abi if item.get("type") == "event" and item.get("name") == event_name),
+            None,
+        )
+        if not self.event_abi:
+            raise RuntimeError(f"❌ Could not find {event_name} event ABI.")
+        self.topic = Web3.to_hex(event_abi_to_log_topic(self.event_abi))
+        self.store = store or get_store()
+        for ddl in self.schema:
+            self.store.execute(ddl)
+        self.confirmations = confirmations
+        self.start_block = start_block
+        self.key = f"{self.address.lower()}:{event_name}"
+        self.lock = asyncio.Lock()
+
+    def decode(self, logs):
+        return [get_event_data(self.web3.codec, self.event_abi, entry) for entry in logs]
+
+    async def prepare(self, events):
+        """Hook for extra (async) lookups needed before `rows` runs."""
+
+    def rows(self, events):
+        """Map decoded events to rows of `self.table`."""
+        return []
+
+    def on_checkpoint(self, events):
+        """Called once `events` are durably stored."""
+
+    async def sync(self):
+        """Checkpoint confirmed blocks and return the decoded events of the unconfirmed tip."""
+        async with self.lock:
+            head = await self.web3.eth.block_number
+            safe = head - self.confirmations
+            cursor = self.store.get_cursor(self.key, self.start_block - 1)
+
+            if safe > cursor:
+                async for end, logs in scan_logs(self.web3, self.address, self.topic, cursor + 1, safe):
+                    events = self.decode(logs)
+                    await self.prepare(events)
+                    self.store.checkpoint(self.key, end, self.rows(events), self.table, self.columns)
+                    self.on_checkpoint(events)
+                cursor = safe
+
+            tip = []
+            if head > cursor:
+                async for _, logs in scan_logs(self.web3, self.address, self.topic, cursor + 1, head):
+                    tip.extend(self.decode(logs))
+                await self.prepare(tip)
+            return tip
+
+
+class DeliveryIndexer(LogIndexer):
+    """Indexes `DeliveryCreated` so shipment IDs never require a full-history log scan."""
+
+    table = "shipments"
+    columns = ("contract", "shipment_id", "company", "block")
+    schema = (
+        "CREATE TABLE IF NOT EXISTS shipments ("
+        " contract TEXT NOT NULL,"
+        " shipment_id BLOB NOT NULL,"
+        " company TEXT,"
+        " block INTEGER NOT NULL,"
+        " PRIMARY KEY (contract, shipment_id))",
+    )
+
+    def __init__(self, web3, address, abi, **kwargs):
+        super().__init__(web3, address, abi, "DeliveryCreated", **kwargs)
+
+    def rows(self, events):
+        return [
+            (self.address, bytes(e["args"]["shipmentId"]), e["args"]["company"], e["blockNumber"])
+            for e in events
+        ]
+
+    async def shipment_ids(self):
+        tip = await self.sync()
+        rows = self.store.execute(
+            "SELECT shipment_id FROM shipments WHERE contract = ? ORDER BY block", (self.address,)
+        )
+        ids = [bytes(r[0]) for r in rows]
+        seen = set(ids)
+        for e in tip:
+            shipment_id = bytes(e["args"]["shipmentId"])
+            if shipment_id not in seen:
+                seen.add(shipment_id)
+                ids.append(shipment_id)
+        return ids
@@ -0,0 +1,172 @@
+import os
+import asyncio
+import logging
+from web3.exceptions import ABIFunctionNotFound, BadFunctionCallOutput, ContractLogicError
+
+from contract.batch_fetch import batch_call, fetch_delivery_data
+from contract.sensor_columns import ShipmentColumns
+
+"""
+Readers for the paginated view functions.
+
+`getCompanies(offset, limit)` returns company summaries (aggregate counters
+only, no entries) a page at a time, and `getDeliveryDataLength(id)` plus
+`getDeliveryData(id, offset, limit)` page through a shipment's sensor
+history. Responses are bounded by the page size, however long the history.
+
+`DeliveryHistory` keeps each shipment's readings as columns and, per read,
+asks only for their lengths and then pages in the readings added since. The
+first page re-reads the last known reading, and a mismatch (or a shorter
+history) after a reorg drops that shipment and reads it again from the start.
+
+Contracts deployed before these functions revert on them, and their
+artifacts' ABI does not list them. Each reader notices either on first use
+and falls back to `getAllCompanies()` / `getDeliveryData(id)` for that
+contract.
+"""
+
+# === CONFIG ===
+COMPANY_PAGE_SIZE = int(os.getenv("COMPANY_PAGE_SIZE", "100"))
+DELIVERY_PAGE_SIZE = int(os.getenv("DELIVERY_PAGE_SIZE", "500"))
+
+PAGED_DELIVERY_DATA = "getDeliveryData(bytes32,uint256,uint256)"
+
+# What a call to a function the deployed bytecode (or the contract's ABI) lacks raises.
+MISSING_FUNCTION = (ContractLogicError, BadFunctionCallOutput, ABIFunctionNotFound)
+
+log = logging.getLogger(__name__)
+
+
+async def iter_companies(contract, page_size=COMPANY_PAGE_SIZE):
+    """
+    Yield `(name, totalDeliveries, successfulDeliveries, unsuccessfulDeliveries,
+    totalFeedbackScore, totalDeliveryTime)` for every company, one page of
+    `getCompanies` at a time.
+    """
+    offset = 0
+    while True:
+        try:
+            page = await contract.functions.getCompanies(offset, page_size).call()
+        except MISSING_FUNCTION as e:
+            if offset:
+                raise
+            log.info(f"getCompanies not available on {contract.address} ({e}), reading getAllCompanies")
+            for company in await contract.functions.getAllCompanies().call():
+                yield tuple(company[:6])
+            return
+        for company in page:
+            yield tuple(company)
+        if len(page) < page_size:
+            return
+        offset += page_size
+
+
+class DeliveryHistory:
+    """Sensor history of every shipment of one `LogisticsDataStorage`, kept up to date a page at a time."""
+
+    def __init__(self, web3, contract, page_size=DELIVERY_PAGE_SIZE):
+        self.web3 = web3
+        self.contract = contract
+        self.address = contract.address
+        self.page_size = page_size
+        self.paged = None  # unknown until the first read
+        self.shipments = {}  # shipment id -> ShipmentColumns
+        self.last = {}  # shipment id -> last reading, as returned by the contract
+        self.lock = asyncio.Lock()  # one read at a time, so a page is never appended twice
+
+    def seed(self, shipments):
+        """
+        Start from histories read elsewhere (`ShipmentColumns`, e.g. from the shared
+        data tier). The next read checks each tail against the chain as usual.
+        """
+        for columns in shipments:
+            if len(columns):
+                shipment_id = bytes.fromhex(columns.shipment_id)
+                self.shipments[shipment_id] = columns
+                self.last[shipment_id] = columns.raw_row()
+
+    async def _supports_paging(self, shipment_id):
+        try:
+            await self.contract.functions.getDeliveryDataLength(shipment_id).call()
+            return True
+        except MISSING_FUNCTION as e:
+            log.info(f"Paged delivery reads not available on {self.address} ({e}), reading full histories")
+            return False
+
+    async def read(self, shipment_ids):
+        """
+        Returns `(data, failures)`: `data` maps shipment ID to its `ShipmentColumns`
+        (shipments without readings are left out) and `failures` maps shipment ID
+        to the error message for the calls that failed.
+        """
+        if not shipment_ids:
+            return {}, {}
+        async with self.lock:
+            return await self._read(shipment_ids)
+
+    async def _read(self, shipment_ids):
+        if self.paged is None:
+            self.paged = await self._supports_paging(shipment_ids[0])
+        if not self.paged:
+            delivery_data, failures = await fetch_delivery_data(self.web3, self.contract, shipment_ids)
+            data = {
+                sid: ShipmentColumns.from_tuples(sid.hex(), rows) for sid, rows in delivery_data.items() if rows
+            }
+            return data, failures
+
+        lengths, errors = await batch_call(
+            self.web3, self.contract, "getDeliveryDataLength", [(sid,) for sid in shipment_ids]
+        )
+        failures = {}
+        behind = {}  # shipment id -> on-chain length
+        for sid, length, error in zip(shipment_ids, lengths, errors):
+            if error is not None:
+                failures[sid] = error
+                continue
+            known = self.shipments.get(sid)
+            if known is not None and length < len(known):
+                self._forget(sid)
+            if length > len(self.shipments.get(sid, ())):
+                behind[sid] = length
+
+        while behind:
+            args = []
+            for sid, length in behind.items():
+                known = len(self.shipments.get(sid, ()))
+                # Start one reading early to check the stored tail is still on chain.
+                offset = known - 1 if known else 0
+                args.append((sid, offset, min(self.page_size, length - offset)))
+            pages, errors = await batch_call(self.web3, self.contract, PAGED_DELIVERY_DATA, args)
+            for (sid, offset, _), page, error in zip(args, pages, errors):
+                if error is not None:
+                    failures[sid] = error
+                    del behind[sid]
+                    continue
+                if offset < len(self.shipments.get(sid, ())):
+                    if not page or tuple(page[0]) != self.last[sid]:
+                        log.info(f"Sensor history of {sid.hex()} changed on chain, re-reading it")
+                        self._forget(sid)
+                        continue
+                    page = page[1:]
+                if page:
+                    self._append(sid, page)
+                if not page or len(self.shipments[sid]) >= behind[sid]:
+                    del behind[sid]
+
+        if failures:
+            log.warning(f"Paged delivery reads failed for {len(failures)} of {len(shipment_ids)} shipments")
+        data = {sid: self.shipments[sid] for sid in shipment_ids if sid in self.shipments}
+        return data, failures
+
+    def _append(self, shipment_id, rows):
+        known = self.shipments.get(shipment_id)
+        if known is None:
+            self.shipments[shipment_id] = ShipmentColumns.from_tuples(shipment_id.hex(), rows)
+        else:
+            # A new object, so histories already handed out stay unchanged.
+            self.shipments[shipment_id] = known.appended(rows)
+        self.last[shipment_id] = tuple(rows[-1])
+
+    def _forget(self, shipment_id):
+        self.shipments.pop(shipment_id, None)
+        self.last.pop(shipment_id, None)
@@ -1,87 +1,55 @@
-import os
-import json
-from web3 import Web3
-from datetime import datetime
-from dotenv import load_dotenv
-from web3._utils.events import get_event_data
+import telemetry
+from contract import single_flight
+from contract.log_indexer import DeliveryIndexer
+from contract.paged_views import DeliveryHistory
+from contract.web3_client import get_web3, get_logistics_contract, load_abi, LOGISTICS_ABI_PATH
 
-def query_logistics_data():
-    # === Load environment ===
-    load_dotenv()
+_indexer = None
+_history = None
 
-    RPC_URL = os.getenv('RPC_URL')
-    CONTRACT_ADDRESS = os.getenv('LOGISTICS_CONTRACT_ADDRESS')
-    ABI_PATH = os.path.join(os.path.dirname(__file__), 'LogisticsDataStorage.json')
 
-    # === Connect to Web3 ===
-    web3 = Web3(Web3.HTTPProvider(RPC_URL))
-    assert web3.is_connected(), "❌ RPC connection failed."
+def _get_indexer(web3, contract):
+    global _indexer
+    if _indexer is None or _indexer.web3 is not web3 or _indexer.address != contract.address:
+        _indexer = DeliveryIndexer(web3, contract.address, load_abi(LOGISTICS_ABI_PATH))
+    return _indexer
 
-    # === Load ABI ===
-    with open(ABI_PATH) as f:
-        abi = json.load(f)["abi"]
 
-    contract = web3.eth.contract(
-        address=Web3.to_checksum_address(CONTRACT_ADDRESS),
-        abi=abi
-    )
+def _get_history(web3, contract):
+    global _history
+    if _history is None or _history.web3 is not web3 or _history.address != contract.address:
+        _history = DeliveryHistory(web3, contract)
+    return _history
 
-    # === Find the DeliveryCreated event ABI ===
-    event_abi = next((item for item in abi if item.get("type") == "event" and item.get("name") == "DeliveryCreated"), None)
-    if not event_abi:
-        raise RuntimeError("❌ Could not find DeliveryCreated event ABI.")
 
-    # === Fetch logs manually ===
-    try:
-        topic = Web3.keccak(text="DeliveryCreated(bytes32,address)").hex()
-        logs = web3.eth.get_logs({
-            "fromBlock": 0,
-            "toBlock": "latest",
-            "address": Web3.to_checksum_address(CONTRACT_ADDRESS),
-            "topics": ['0x'+str(topic)]
-        })
+async def seed_logistics_data(shipments):
+    """Start the sensor history cache from `shipments` (`ShipmentColumns`) instead of an empty one."""
+    web3 = await get_web3()
+    contract = await get_logistics_contract()
+    _get_history(web3, contract).seed(shipments)
+
+
+async def query_logistics_data():
+    # Concurrent queries at the same block share one scan.
+    web3 = await get_web3()
+    return await single_flight.coalesced("logistics_data", web3, lambda: _query_logistics_data(web3))
 
-        shipment_ids = []
-        for log in logs:
-            decoded = get_event_data(web3.codec, event_abi, log)
-            shipment_ids.append(decoded["args"]["shipmentId"])
 
-        shipment_ids = list(set(shipment_ids))  # De-duplicate
+async def _query_logistics_data(web3):
+    contract = await get_logistics_contract()
 
+    # === Fetch shipment IDs from the checkpointed DeliveryCreated index ===
+    try:
+        with telemetry.span("chain.get_logs"):
+            shipment_ids = await _get_indexer(web3, contract).shipment_ids()
     except Exception as e:
         raise RuntimeError(f"❌ Failed to fetch events: {e}")
 
     if not shipment_ids:
         return []
 
-    all_data = []
-
-    for shipment_id in shipment_ids:
-        shipment_hex = shipment_id.hex()
-
-        try:
-            sensor_data = contract.functions.getDeliveryData(shipment_id).call()
-        except Exception as e:
-            continue
-
-        if not sensor_data:
-            continue
-
-        parsed = []
-        for entry in sensor_data:
-            parsed.append({
-                "timestamp": datetime.utcfromtimestamp(entry[0]).strftime("%Y-%m-%d %H:%M:%S UTC"),
-                "temperature": entry[1] / 100.0,
-                "humidity": entry[2] / 100.0,
-                "vibrations": entry[3],
-                "accelX": entry[4],
-                "accelY": entry[5],
-                "accelZ": entry[6]
-            })
-
-        all_data.append({
-            "shipmentId": shipment_hex,
-            "records": parsed
-        })
+    # === Fetch the readings added since the last query, a page at a time in batched round-trips ===
+    with telemetry.span("chain.get_delivery_data"):
+        delivery_data, _ = await _get_history(web3, contract).read(shipment_ids)
 
-    return all_data
\ No newline at end of file
+    return [delivery_data[shipment_id] for shipment_id in shipment_ids if shipment_id in delivery_data]
@@ -0,0 +1,365 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from urllib.parse import urlparse
+
+import requests
+from aiohttp import ClientConnectionError
+from web3.providers.rpc import AsyncHTTPProvider, HTTPProvider
+from web3._utils.batching import sort_batch_response_by_response_ids
+
+"""
+Multi-endpoint JSON-RPC routing.
+
+`RPC_URLS` (comma-separated, default `RPC_URL`) lists interchangeable nodes.
+For each endpoint the pool tracks an EWMA of latency and error rate, a
+window of recent latencies, a circuit breaker and an optional token-bucket
+rate limit. Every request:
+
+- goes to the healthy endpoint with the lowest expected latency (EWMA plus
+  rate-limit wait, scaled up by its error rate and by the requests already in
+  flight to it; unmeasured endpoints first),
+- for reads, is hedged to the next best endpoint if the first has not answered
+  within its `RPC_HEDGE_PERCENTILE` latency; the first answer wins and the
+  other request is cancelled,
+- fails over to another endpoint on an error, up to `RPC_RETRIES` times.
+  Writes never hedge and only fail over when the connection itself failed,
+  so a signed transaction is not submitted twice.
+
+`RPC_BREAKER_FAILURES` consecutive failures open an endpoint's breaker for
+`RPC_BREAKER_COOLDOWN` seconds, after which a single probe request decides
+whether it closes again. With every breaker open, requests fail fast with
+`RpcUnavailableError`.
+
+`AsyncPooledHTTPProvider` (the app) and `PooledHTTPProvider` (the blocking
+upload scripts) plug the pool into web3; `observers` receive
+`(endpoint, event, seconds)` for metrics, where event is ok, error or
+abandoned (a hedged-away request) with its latency, or hedge / failover when
+a request is sent to that endpoint for that reason.
+"""
+
+# === CONFIG ===
+RPC_TIMEOUT = float(os.getenv("RPC_TIMEOUT", "30"))
+RPC_RETRIES = int(os.getenv("RPC_RETRIES", "2"))
+RPC_EWMA_ALPHA = float(os.getenv("RPC_EWMA_ALPHA", "0.2"))
+RPC_ERROR_PENALTY = float(os.getenv("RPC_ERROR_PENALTY", "10"))
+RPC_LATENCY_WINDOW = int(os.getenv("RPC_LATENCY_WINDOW", "200"))
+RPC_HEDGE_PERCENTILE = float(os.getenv("RPC_HEDGE_PERCENTILE", "95"))
+RPC_HEDGE_MIN_DELAY = float(os.getenv("RPC_HEDGE_MIN_DELAY", "0.05"))
+RPC_HEDGE_MAX_DELAY = float(os.getenv("RPC_HEDGE_MAX_DELAY", "2"))
+RPC_BREAKER_FAILURES = int(os.getenv("RPC_BREAKER_FAILURES", "5"))
+RPC_BREAKER_COOLDOWN = float(os.getenv("RPC_BREAKER_COOLDOWN", "10"))
+RPC_RATE_LIMIT = float(os.getenv("RPC_RATE_LIMIT", "0"))  # requests/s per endpoint, 0 = unlimited
+RPC_RATE_BURST = int(os.getenv("RPC_RATE_BURST", "20"))
+
+WRITE_METHODS = {"eth_sendRawTransaction", "eth_sendTransaction"}
+HEADERS = {"Content-Type": "application/json"}
+
+log = logging.getLogger(__name__)
+
+
+class RpcUnavailableError(ConnectionError):
+    pass
+
+
+def configured_urls():
+    """`RPC_URLS`, else `RPC_URL`; read at pool creation so a late `load_dotenv()` still applies."""
+    return [url.strip() for url in os.getenv("RPC_URLS", os.getenv("RPC_URL") or "").split(",") if url.strip()]
+
+
+class RateLimiter:
+    """Token bucket; `reserve()` takes a token and returns how long to wait for it."""
+
+    def __init__(self, rate, burst=RPC_RATE_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self):
+        with self.lock:
+            self._refill(time.monotonic())
+            return max(0.0, (1 - self.tokens) / self.rate)
+
+    def reserve(self):
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            return max(0.0, -self.tokens / self.rate)
+
+
+class Endpoint:
+    def __init__(self, url, name, rate_limit=RPC_RATE_LIMIT):
+        self.url = url
+        self.name = name  # metrics label; never the full URL, which may embed an API key
+        self.latency = None  # EWMA, seconds
+        self.error_rate = 0.0  # EWMA of failures
+        self.samples = deque(maxlen=RPC_LATENCY_WINDOW)
+        self.failures = 0  # consecutive
+        self.open_until = 0.0
+        self.probing = False
+        self.limiter = RateLimiter(rate_limit) if rate_limit else None
+        self.requests = self.errors = 0
+        self.in_flight = 0
+
+    def available(self, now):
+        return not self.open_until or (now >= self.open_until and not self.probing)
+
+    def score(self):
+        """Sort key: unmeasured endpoints first, then expected latency weighted by requests in flight."""
+        if self.latency is None:
+            return (0, self.in_flight)
+        wait = self.limiter.delay() if self.limiter else 0.0
+        return (1, (self.latency + wait) * (1 + RPC_ERROR_PENALTY * self.error_rate) * (1 + self.in_flight))
+
+    def hedge_delay(self):
+        if len(self.samples) < 20:
+            # Too few samples for a percentile: a multiple of the EWMA, if there is one.
+            if self.latency is None:
+                return RPC_HEDGE_MAX_DELAY
+            return min(RPC_HEDGE_MAX_DELAY, max(RPC_HEDGE_MIN_DELAY, 3 * self.latency))
+        ordered = sorted(self.samples)
+        value = ordered[min(len(ordered) - 1, int(len(ordered) * RPC_HEDGE_PERCENTILE / 100))]
+        return min(RPC_HEDGE_MAX_DELAY, max(RPC_HEDGE_MIN_DELAY, value))
+
+    def _observe(self, seconds):
+        self.samples.append(seconds)
+        self.latency = seconds if self.latency is None else self.latency + RPC_EWMA_ALPHA * (seconds - self.latency)
+
+    def success(self, seconds):
+        self.requests += 1
+        self._observe(seconds)
+        self.error_rate *= 1 - RPC_EWMA_ALPHA
+        self.failures = 0
+        if self.open_until:
+            log.info(f"RPC endpoint {self.name} recovered")
+        self.open_until = 0.0
+        self.probing = False
+
+    def failure(self, seconds):
+        self.requests += 1
+        self.errors += 1
+        self._observe(seconds)
+        self.error_rate += RPC_EWMA_ALPHA * (1 - self.error_rate)
+        self.failures += 1
+        if self.probing or self.failures >= RPC_BREAKER_FAILURES:
+            self.open_until = time.monotonic() + RPC_BREAKER_COOLDOWN
+            self.probing = False
+            log.warning(f"RPC endpoint {self.name} circuit open for {RPC_BREAKER_COOLDOWN}s")
+
+    def abandoned(self, seconds):
+        """A hedged-away request: its elapsed time is a lower bound on the latency."""
+        self._observe(seconds)
+        self.probing = False
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "latency_ms": round(self.latency * 1000, 2) if self.latency is not None else None,
+            "error_rate": round(self.error_rate, 4),
+            "hedge_delay_ms": round(self.hedge_delay() * 1000, 2),
+            "circuit": "open" if self.open_until and time.monotonic() < self.open_until
+            else "half-open" if self.open_until else "closed",
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "errors": self.errors,
+        }
+
+
+class RpcPool:
+    def __init__(self, urls=None, retries=RPC_RETRIES, rate_limit=RPC_RATE_LIMIT):
+        urls = urls or configured_urls()
+        if not urls:
+            raise RuntimeError("❌ No RPC endpoint configured (set RPC_URL or RPC_URLS)")
+        self.endpoints = [Endpoint(url, f"rpc{i}:{urlparse(url).hostname}", rate_limit) for i, url in enumerate(urls)]
+        self.retries = retries
+        self.observers = []  # fn(endpoint, event, seconds)
+        self.hedges = self.failovers = 0
+        self._sync_session = None
+
+    @property
+    def url(self):
+        return self.endpoints[0].url
+
+    def pick(self, exclude=()):
+        """Best available endpoint not in `exclude`, or None; claims the probe of a half-open breaker."""
+        now = time.monotonic()
+        candidates = [e for e in self.endpoints if e not in exclude and e.available(now)]
+        if not candidates:
+            return None
+        best = min(candidates, key=Endpoint.score)
+        if best.open_until:
+            best.probing = True
+        return best
+
+    def _unavailable(self):
+        retry = min(e.open_until for e in self.endpoints) - time.monotonic()
+        return RpcUnavailableError(f"❌ All RPC endpoints are failing; retry in {max(0.0, retry):.1f}s")
+
+    def _notify(self, endpoint, event, seconds):
+        for observer in self.observers:
+            observer(endpoint, event, seconds)
+
+    async def _send(self, session, endpoint, data):
+        if endpoint.limiter:
+            wait = endpoint.limiter.reserve()
+            if wait:
+                await asyncio.sleep(wait)
+        start = time.perf_counter()
+        endpoint.in_flight += 1
+        try:
+            async with session.post(endpoint.url, data=data, headers=HEADERS) as response:
+                response.raise_for_status()
+                body = await response.read()
+        except asyncio.CancelledError:
+            endpoint.abandoned(time.perf_counter() - start)
+            self._notify(endpoint, "abandoned", time.perf_counter() - start)
+            raise
+        except Exception:
+            endpoint.failure(time.perf_counter() - start)
+            self._notify(endpoint, "error", time.perf_counter() - start)
+            raise
+        finally:
+            endpoint.in_flight -= 1
+        endpoint.success(time.perf_counter() - start)
+        self._notify(endpoint, "ok", time.perf_counter() - start)
+        return body
+
+    async def post(self, session, data, read=True):
+        """POST a JSON-RPC payload and return the raw response body."""
+        pending = {}  # task -> endpoint
+        tried = []
+        last_error = None
+        hedged = False
+        try:
+            while True:
+                if not pending:
+                    endpoint = self.pick(tried) if len(tried) <= self.retries else None
+                    if endpoint is None:
+                        raise last_error or self._unavailable()
+                    if tried:
+                        self.failovers += 1
+                        self._notify(endpoint, "failover", 0.0)
+                    tried.append(endpoint)
+                    pending[asyncio.ensure_future(self._send(session, endpoint, data))] = endpoint
+
+                timeout = None
+                if read and not hedged and len(self.endpoints) > 1:
+                    timeout = tried[-1].hedge_delay()
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    endpoint = self.pick(tried)
+                    if endpoint is not None:
+                        self.hedges += 1
+                        self._notify(endpoint, "hedge", 0.0)
+                        tried.append(endpoint)
+                        pending[asyncio.ensure_future(self._send(session, endpoint, data))] = endpoint
+                    continue
+
+                for task in done:
+                    pending.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        return task.result()
+                    last_error = error
+                    if not read and not isinstance(error, ClientConnectionError):
+                        raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def post_sync(self, data, read=True):
+        """Blocking `post` for scripts: failover and breakers, no hedging."""
+        if self._sync_session is None:
+            self._sync_session = requests.Session()
+        tried = []
+        last_error = None
+        while len(tried) <= self.retries:
+            endpoint = self.pick(tried)
+            if endpoint is None:
+                break
+            if tried:
+                self.failovers += 1
+                self._notify(endpoint, "failover", 0.0)
+            tried.append(endpoint)
+            if endpoint.limiter:
+                time.sleep(endpoint.limiter.reserve())
+            start = time.perf_counter()
+            endpoint.in_flight += 1
+            try:
+                response = self._sync_session.post(endpoint.url, data=data, headers=HEADERS, timeout=RPC_TIMEOUT)
+                response.raise_for_status()
+            except Exception as e:
+                endpoint.failure(time.perf_counter() - start)
+                self._notify(endpoint, "error", time.perf_counter() - start)
+                last_error = e
+                if not read and not isinstance(e, requests.ConnectionError):
+                    raise
+                continue
+            finally:
+                endpoint.in_flight -= 1
+            endpoint.success(time.perf_counter() - start)
+            self._notify(endpoint, "ok", time.perf_counter() - start)
+            return response.content
+        raise last_error or self._unavailable()
+
+    def stats(self):
+        return {
+            "endpoints": [e.stats() for e in self.endpoints],
+            "hedges": self.hedges,
+            "failovers": self.failovers,
+        }
+
+
+def _is_read(methods):
+    return not WRITE_METHODS.intersection(methods)
+
+
+class AsyncPooledHTTPProvider(AsyncHTTPProvider):
+    """AsyncWeb3 provider sending every request through an `RpcPool` on a shared aiohttp session."""
+
+    def __init__(self, pool, session, **kwargs):
+        super().__init__(pool.url, **kwargs)
+        self.pool = pool
+        self.session = session
+
+    async def make_request(self, method, params):
+        data = self.encode_rpc_request(method, params)
+        return self.decode_rpc_response(await self.pool.post(self.session, data, _is_read([method])))
+
+    async def make_batch_request(self, batch_requests):
+        data = self.encode_batch_rpc_request(batch_requests)
+        read = _is_read([method for method, _ in batch_requests])
+        response = self.decode_rpc_response(await self.pool.post(self.session, data, read))
+        if not isinstance(response, list):
+            return response
+        return sort_batch_response_by_response_ids(response)
+
+
+class PooledHTTPProvider(HTTPProvider):
+    """Blocking Web3 provider over an `RpcPool`, for the upload scripts and ingest writer."""
+
+    def __init__(self, pool=None, **kwargs):
+        self.pool = pool or RpcPool()
+        super().__init__(self.pool.url, **kwargs)
+
+    def make_request(self, method, params):
+        data = self.encode_rpc_request(method, params)
+        return self.decode_rpc_response(self.pool.post_sync(data, _is_read([method])))
+
+    def make_batch_request(self, batch_requests):
+        data = self.encode_batch_rpc_request(batch_requests)
+        read = _is_read([method for method, _ in batch_requests])
+        response = self.decode_rpc_response(self.pool.post_sync(data, read))
+        if not isinstance(response, list):
+            return response
+        return sort_batch_response_by_response_ids(response)
@@ -0,0 +1,144 @@
+import numpy as np
+
+from contract.downsample import downsample
+
+"""
+Columnar sensor records.
+
+`getDeliveryData` returns a list of `(timestamp, temperature, humidity,
+vibrations, accelX, accelY, accelZ)` tuples. Instead of turning every tuple
+into a dict with a formatted timestamp string, each shipment keeps one typed
+NumPy array per field. Scaling and timestamp formatting are vectorized and
+only happen when a column is actually read.
+"""
+
+FIELDS = ("timestamp", "temperature", "humidity", "vibrations", "accelX", "accelY", "accelZ")
+METRICS = ("temperature", "humidity", "vibrations")
+
+# On-chain fixed point: temperature / humidity are stored in hundredths.
+SCALE = {"temperature": 100.0, "humidity": 100.0}
+
+DTYPES = {
+    "timestamp": np.int64,
+    "temperature": np.float32,
+    "humidity": np.float32,
+    "vibrations": np.uint16,
+    "accelX": np.int16,
+    "accelY": np.int16,
+    "accelZ": np.int16,
+}
+
+
+def format_timestamps(ts):
+    """Vectorized `datetime.utcfromtimestamp(t).strftime("%Y-%m-%d %H:%M:%S UTC")`."""
+    iso = np.datetime_as_string(np.asarray(ts, dtype=np.int64).astype("datetime64[s]"))
+    return np.char.add(np.char.replace(iso, "T", " "), " UTC")
+
+
+class ShipmentColumns:
+    """Sensor history of one shipment as typed column arrays."""
+
+    __slots__ = ("shipment_id", "columns")
+
+    def __init__(self, shipment_id, columns):
+        self.shipment_id = shipment_id
+        self.columns = columns
+
+    @classmethod
+    def from_tuples(cls, shipment_id, sensor_data):
+        raw = np.asarray(sensor_data, dtype=np.int64).reshape(-1, len(FIELDS))
+        columns = {}
+        for i, name in enumerate(FIELDS):
+            col = raw[:, i]
+            if name in SCALE:
+                columns[name] = (col / SCALE[name]).astype(DTYPES[name])
+            else:
+                columns[name] = col.astype(DTYPES[name])
+        return cls(shipment_id, columns)
+
+    def appended(self, sensor_data):
+        """A new `ShipmentColumns` with `sensor_data` tuples added at the end; this one is left as is."""
+        tail = ShipmentColumns.from_tuples(self.shipment_id, sensor_data)
+        return ShipmentColumns(
+            self.shipment_id, {name: np.concatenate([self.columns[name], tail.columns[name]]) for name in FIELDS}
+        )
+
+    def raw_row(self, index=-1):
+        """Reading `index` as the contract returns it: unscaled integers in `FIELDS` order."""
+        return tuple(
+            round(float(self.columns[name][index]) * SCALE[name]) if name in SCALE else int(self.columns[name][index])
+            for name in FIELDS
+        )
+
+    def __len__(self):
+        return len(self.columns["timestamp"])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    @property
+    def nbytes(self):
+        return sum(col.nbytes for col in self.columns.values())
+
+    def timestamps(self):
+        return format_timestamps(self.columns["timestamp"])
+
+    def to_records(self):
+        """Legacy list-of-dicts view, one dict per reading."""
+        values = {name: self.columns[name].tolist() for name in FIELDS[1:]}
+        for name in SCALE:
+            values[name] = [round(v, 2) for v in values[name]]
+        values["timestamp"] = self.timestamps().tolist()
+        return [dict(zip(FIELDS, row)) for row in zip(*(values[name] for name in FIELDS))]
+
+    def to_dict(self):
+        return {"shipmentId": self.shipment_id, "records": self.to_records()}
+
+
+def concat(shipments, name):
+    """Concatenate one column across shipments."""
+    if not shipments:
+        return np.empty(0, dtype=DTYPES[name])
+    return np.concatenate([s[name] for s in shipments])
+
+
+def series_arrays(shipments, metric, max_points=None, method="lttb"):
+    """
+    `(timestamps, values)` arrays for `metric` across `shipments`.
+
+    With `max_points`, the result has at most `max_points` points: every
+    shipment is downsampled with `method` to its share of the budget
+    (proportional to its length, rounded down) before concatenation. When
+    some share is too small to downsample (under 3 points), the concatenated
+    series is downsampled once instead, so the fleet size never grows the
+    output. Scaled metrics are rounded to 2 decimals as float64.
+    """
+    if not shipments:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=DTYPES[metric])
+    total = sum(len(s) for s in shipments)
+    if not max_points or total <= max_points:
+        ts, values = concat(shipments, "timestamp"), concat(shipments, metric)
+    else:
+        budgets = [max_points * len(s) // total for s in shipments]
+        if min(budgets) >= 3:
+            ts_parts, value_parts = [], []
+            for s, budget in zip(shipments, budgets):
+                keep = downsample(s["timestamp"], s[metric], budget, method)
+                ts_parts.append(s["timestamp"][keep])
+                value_parts.append(s[metric][keep])
+            ts, values = np.concatenate(ts_parts), np.concatenate(value_parts)
+        else:
+            ts, values = concat(shipments, "timestamp"), concat(shipments, metric)
+            keep = downsample(ts, values, max_points, method)
+            ts, values = ts[keep], values[keep]
+    if metric in SCALE:
+        values = np.round(values.astype(np.float64), 2)
+    return ts, values
+
+
+def series(shipments, metric, max_points=None, method="lttb"):
+    """`[[timestamp-string, value], ...]` for `metric`, from `series_arrays`."""
+    ts, values = series_arrays(shipments, metric, max_points, method)
+    if not len(ts):
+        return []
+    return [list(pair) for pair in zip(format_timestamps(ts).tolist(), values.tolist())]
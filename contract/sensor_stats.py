@@ -0,0 +1,125 @@
+import os
+import json
+import numpy as np
+
+from contract.sensor_columns import METRICS, format_timestamps
+
+"""
+Token-budgeted statistical summaries of shipment sensor data.
+
+The summary prompt used to embed every reading of every shipment. Instead the
+LLM gets a fleet-wide block (count, min / percentiles / mean / max and
+excursions outside `SENSOR_LIMITS` per metric, plus the time span) followed by
+one compact line per shipment. Shipments are ranked by excursion count, then
+recency, and lines are added only while the estimated prompt size stays
+within `SUMMARY_TOKEN_BUDGET`, so the prompt is bounded whatever the fleet size.
+"""
+
+# === CONFIG ===
+SUMMARY_TOKEN_BUDGET = int(os.getenv("SUMMARY_TOKEN_BUDGET", "1500"))
+# [low, high] per metric in display units (°C, %, raw vibration); null = unbounded.
+SENSOR_LIMITS = json.loads(os.getenv(
+    "SENSOR_LIMITS", '{"temperature": [0, 25], "humidity": [20, 70], "vibrations": [null, 400]}'
+))
+
+UNITS = {"temperature": "°C", "humidity": "%", "vibrations": ""}
+DECIMALS = {"temperature": 1, "humidity": 1, "vibrations": 0}
+
+
+def estimate_tokens(text):
+    """Rough GPT token count (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+def _fmt(metric, value):
+    return f"{value:.{DECIMALS.get(metric, 1)}f}"
+
+
+def excursions(metric, values):
+    low, high = SENSOR_LIMITS.get(metric, (None, None))
+    mask = np.zeros(len(values), dtype=bool)
+    if low is not None:
+        mask |= values < low
+    if high is not None:
+        mask |= values > high
+    return int(mask.sum())
+
+
+def _limits_label(metric):
+    low, high = SENSOR_LIMITS.get(metric, (None, None))
+    if low is None and high is None:
+        return "no limits"
+    if low is None:
+        return f"> {high}{UNITS[metric]}"
+    if high is None:
+        return f"< {low}{UNITS[metric]}"
+    return f"outside [{low}, {high}]{UNITS[metric]}"
+
+
+def _span(ts):
+    start, end = format_timestamps([ts.min(), ts.max()]).tolist()
+    return f"{start[:16]} -> {end[:16]} UTC ({(ts.max() - ts.min()) / 3600:.1f}h)"
+
+
+def metric_summary(metric, values):
+    """One line of fleet-wide statistics for `metric`."""
+    values = values.astype(np.float64)
+    p5, p50, p95 = np.percentile(values, [5, 50, 95])
+    exc = excursions(metric, values)
+    return (
+        f"{metric}{' ' + UNITS[metric] if UNITS[metric] else ''}: "
+        f"min {_fmt(metric, values.min())}, p5 {_fmt(metric, p5)}, median {_fmt(metric, p50)}, "
+        f"mean {_fmt(metric, values.mean())}, p95 {_fmt(metric, p95)}, max {_fmt(metric, values.max())}; "
+        f"{exc} readings ({100 * exc / len(values):.1f}%) {_limits_label(metric)}"
+    )
+
+
+def shipment_line(shipment, metrics, exc):
+    ts = shipment["timestamp"]
+    sid = shipment.shipment_id
+    parts = [f"{sid[:8]}..{sid[-4:]}", f"n={len(shipment)}", _span(ts)]
+    for metric in metrics:
+        values = shipment[metric].astype(np.float64)
+        p95 = np.percentile(values, 95)
+        parts.append(
+            f"{metric[:4]} {_fmt(metric, values.min())}/{_fmt(metric, values.mean())}/{_fmt(metric, values.max())}"
+            f" p95 {_fmt(metric, p95)} exc {exc[metric]}"
+        )
+    return " | ".join(parts)
+
+
+def summarize(shipments, budget=SUMMARY_TOKEN_BUDGET, metrics=METRICS):
+    """Text summary of `shipments` (ShipmentColumns) that fits in about `budget` tokens."""
+    shipments = [s for s in shipments if len(s)]
+    if not shipments:
+        return "No sensor readings recorded yet."
+
+    # Cheap per-shipment pass over every shipment; percentiles only for the lines that make the cut.
+    ranked = []
+    for s in shipments:
+        exc = {metric: excursions(metric, s[metric]) for metric in metrics}
+        ranked.append((-sum(exc.values()), -int(s["timestamp"].max()), s, exc))
+    ranked.sort(key=lambda row: row[:2])
+
+    all_ts = np.concatenate([s["timestamp"] for s in shipments])
+    header = [
+        f"FLEET: {len(shipments)} shipments, {len(all_ts)} readings, {_span(all_ts)}",
+        *(metric_summary(metric, np.concatenate([s[metric] for s in shipments])) for metric in metrics),
+        f"{sum(1 for row in ranked if row[0] < 0)} shipments have excursions.",
+        "SHIPMENTS (id | readings | time span | metric min/mean/max, p95, excursion count), worst first:",
+    ]
+    lines = list(header)
+    used = estimate_tokens("\n".join(lines))
+    shown = 0
+    for _, _, s, exc in ranked:
+        line = shipment_line(s, metrics, exc)
+        cost = estimate_tokens(line) + 1
+        # Keep room for the "omitted" note.
+        if used + cost + 20 > budget:
+            break
+        lines.append(line)
+        used += cost
+        shown += 1
+    if shown < len(ranked):
+        lines.append(f"(+{len(ranked) - shown} more shipments omitted; they are included in the FLEET statistics)")
+    return "\n".join(lines)
@@ -0,0 +1,393 @@
+import os
+import asyncio
+import logging
+from collections import deque
+from web3 import Web3
+
+from contract import single_flight
+from contract.log_indexer import LogIndexer
+from contract.sensor_columns import METRICS, SCALE, format_timestamps
+from contract.sensor_stats import SENSOR_LIMITS
+from contract.web3_client import get_web3, get_logistics_contract
+
+"""
+Per-shipment streaming statistics maintained from `DataSubmitted` events.
+
+Every confirmed reading is stored once in the shared indexer database and
+folded into O(1)-update state per shipment and metric:
+
+- count, Welford mean / variance, min / max over the whole history,
+- breach counters against `SENSOR_LIMITS` (same limits as the prompt summary),
+- rolling mean / std / min / max over the last `AGGREGATE_WINDOW_SECONDS`
+  (running sums plus monotonic deques, amortized O(1) per reading).
+
+Readings in the unconfirmed tip are never persisted; the shipments they touch
+get a merged snapshot at refresh time, so `get()` is a dictionary lookup.
+Each new reading is also handed once to the registered `listeners` (the live
+WebSocket feed), as soon as it appears in the tip. The history read by the
+first sync (and the tip seen by it) only seeds the aggregates: nothing is
+published until that sync has completed.
+"""
+
+# === CONFIG ===
+AGGREGATE_WINDOW_SECONDS = int(os.getenv("AGGREGATE_WINDOW_SECONDS", "3600"))
+AGGREGATES_POLL_INTERVAL = float(os.getenv("AGGREGATES_POLL_INTERVAL", "5"))
+
+log = logging.getLogger(__name__)
+
+
+def _scaled(metric, raw):
+    return raw / SCALE[metric] if metric in SCALE else float(raw)
+
+
+class RunningStats:
+    """Welford mean / variance with min, max and threshold-breach counters."""
+
+    __slots__ = ("count", "mean", "m2", "min", "max", "below", "above")
+
+    def __init__(self, count=0, mean=0.0, m2=0.0, min=None, max=None, below=0, above=0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.min = min
+        self.max = max
+        self.below = below
+        self.above = above
+
+    def add(self, x, low=None, high=None):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        self.min = x if self.min is None or x < self.min else self.min
+        self.max = x if self.max is None or x > self.max else self.max
+        if low is not None and x < low:
+            self.below += 1
+        if high is not None and x > high:
+            self.above += 1
+
+    def merged(self, other):
+        """Combined stats of two disjoint sets of readings (Chan et al.)."""
+        if not other.count:
+            return self.copy()
+        if not self.count:
+            return other.copy()
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        return RunningStats(
+            count,
+            self.mean + delta * other.count / count,
+            self.m2 + other.m2 + delta * delta * self.count * other.count / count,
+            min(self.min, other.min),
+            max(self.max, other.max),
+            self.below + other.below,
+            self.above + other.above,
+        )
+
+    def copy(self):
+        return RunningStats(self.count, self.mean, self.m2, self.min, self.max, self.below, self.above)
+
+    @property
+    def variance(self):
+        """Sample variance."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean": round(self.mean, 4),
+            "std": round(self.variance ** 0.5, 4),
+            "min": self.min,
+            "max": self.max,
+            "below_limit": self.below,
+            "above_limit": self.above,
+        }
+
+
+class RollingWindow:
+    """Mean / std / min / max of the readings in the last `seconds` (by reading timestamp)."""
+
+    __slots__ = ("seconds", "items", "sum", "sumsq", "mins", "maxs")
+
+    def __init__(self, seconds=AGGREGATE_WINDOW_SECONDS):
+        self.seconds = seconds
+        self.items = deque()
+        self.sum = 0.0
+        self.sumsq = 0.0
+        self.mins = deque()  # increasing values: front is the window minimum
+        self.maxs = deque()  # decreasing values: front is the window maximum
+
+    def add(self, ts, x):
+        self.items.append((ts, x))
+        self.sum += x
+        self.sumsq += x * x
+        while self.mins and self.mins[-1][1] >= x:
+            self.mins.pop()
+        self.mins.append((ts, x))
+        while self.maxs and self.maxs[-1][1] <= x:
+            self.maxs.pop()
+        self.maxs.append((ts, x))
+
+        cutoff = ts - self.seconds
+        while self.items[0][0] < cutoff:
+            _, old = self.items.popleft()
+            self.sum -= old
+            self.sumsq -= old * old
+        while self.mins[0][0] < cutoff:
+            self.mins.popleft()
+        while self.maxs[0][0] < cutoff:
+            self.maxs.popleft()
+
+    def copy(self):
+        window = RollingWindow(self.seconds)
+        window.items = deque(self.items)
+        window.sum, window.sumsq = self.sum, self.sumsq
+        window.mins, window.maxs = deque(self.mins), deque(self.maxs)
+        return window
+
+    def to_dict(self):
+        n = len(self.items)
+        if not n:
+            return {"seconds": self.seconds, "count": 0}
+        mean = self.sum / n
+        variance = max(0.0, (self.sumsq - n * mean * mean) / (n - 1)) if n > 1 else 0.0
+        return {
+            "seconds": self.seconds,
+            "count": n,
+            "mean": round(mean, 4),
+            "std": round(variance ** 0.5, 4),
+            "min": self.mins[0][1],
+            "max": self.maxs[0][1],
+        }
+
+
+class ShipmentAggregates:
+    __slots__ = ("shipment_id", "count", "first_timestamp", "last_timestamp", "stats", "windows")
+
+    def __init__(self, shipment_id, window_seconds=AGGREGATE_WINDOW_SECONDS):
+        self.shipment_id = shipment_id
+        self.count = 0
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self.stats = {metric: RunningStats() for metric in METRICS}
+        self.windows = {metric: RollingWindow(window_seconds) for metric in METRICS}
+
+    def add(self, timestamp, values):
+        """Fold one reading; `values` maps each metric to its display-unit value."""
+        self.count += 1
+        if self.first_timestamp is None:
+            self.first_timestamp = timestamp
+        self.last_timestamp = timestamp
+        for metric in METRICS:
+            low, high = SENSOR_LIMITS.get(metric, (None, None))
+            self.stats[metric].add(values[metric], low, high)
+            self.windows[metric].add(timestamp, values[metric])
+
+    def copy(self):
+        other = ShipmentAggregates.__new__(ShipmentAggregates)
+        other.shipment_id = self.shipment_id
+        other.count = self.count
+        other.first_timestamp = self.first_timestamp
+        other.last_timestamp = self.last_timestamp
+        other.stats = {metric: s.copy() for metric, s in self.stats.items()}
+        other.windows = {metric: w.copy() for metric, w in self.windows.items()}
+        return other
+
+    def to_dict(self):
+        return {
+            "shipmentId": Web3.to_hex(self.shipment_id),
+            "count": self.count,
+            "firstTimestamp": self.first_timestamp,
+            "lastTimestamp": self.last_timestamp,
+            "metrics": {
+                metric: {**self.stats[metric].to_dict(), "window": self.windows[metric].to_dict()}
+                for metric in METRICS
+            },
+        }
+
+
+class ShipmentAggregator(LogIndexer):
+    table = "sensor_readings"
+    columns = (
+        "contract", "tx_hash", "log_index", "shipment_id", "timestamp",
+        "temperature", "humidity", "vibrations", "accel_x", "accel_y", "accel_z", "block",
+    )
+    schema = (
+        "CREATE TABLE IF NOT EXISTS sensor_readings ("
+        " contract TEXT NOT NULL,"
+        " tx_hash BLOB NOT NULL,"
+        " log_index INTEGER NOT NULL,"
+        " shipment_id BLOB NOT NULL,"
+        " timestamp INTEGER NOT NULL,"
+        " temperature INTEGER NOT NULL,"
+        " humidity INTEGER NOT NULL,"
+        " vibrations INTEGER NOT NULL,"
+        " accel_x INTEGER NOT NULL,"
+        " accel_y INTEGER NOT NULL,"
+        " accel_z INTEGER NOT NULL,"
+        " block INTEGER NOT NULL,"
+        " PRIMARY KEY (contract, tx_hash, log_index))",
+        "CREATE INDEX IF NOT EXISTS sensor_readings_shipment"
+        " ON sensor_readings (contract, shipment_id, timestamp)",
+    )
+
+    def __init__(self, web3, contract, window_seconds=AGGREGATE_WINDOW_SECONDS, **kwargs):
+        super().__init__(web3, contract.address, contract.abi, "DataSubmitted", **kwargs)
+        self.window_seconds = window_seconds
+        self.aggregates = {}  # shipment id -> ShipmentAggregates (confirmed readings)
+        self.tip = {}  # shipment id -> snapshot including unconfirmed readings
+        self.synced = False
+        self.listeners = []  # fn(shipment_id, points), called once per new reading batch
+        self._published = set()  # (tx hash, log index) of tip readings already sent to listeners
+        self._load()
+
+    def _load(self):
+        """Rebuild state from stored readings: SQL totals, then replay only the rolling windows."""
+        selects = []
+        for metric in METRICS:
+            x = f"{metric} / {SCALE[metric]}" if metric in SCALE else f"CAST({metric} AS REAL)"
+            low, high = SENSOR_LIMITS.get(metric, (None, None))
+            below = f"SUM({x} < {low})" if low is not None else "0"
+            above = f"SUM({x} > {high})" if high is not None else "0"
+            selects.append(f"AVG({x}), SUM(({x}) * ({x})), MIN({x}), MAX({x}), {below}, {above}")
+        rows = self.store.execute(
+            f"SELECT shipment_id, COUNT(*), MIN(timestamp), MAX(timestamp), {', '.join(selects)} "
+            "FROM sensor_readings WHERE contract = ? GROUP BY shipment_id",
+            (self.address,),
+        )
+        for row in rows:
+            agg = ShipmentAggregates(bytes(row[0]), self.window_seconds)
+            agg.count, agg.first_timestamp, agg.last_timestamp = row[1], row[2], row[3]
+            for i, metric in enumerate(METRICS):
+                mean, sumsq, lo, hi, below, above = row[4 + 6 * i: 10 + 6 * i]
+                m2 = max(0.0, sumsq - agg.count * mean * mean)
+                agg.stats[metric] = RunningStats(agg.count, mean, m2, lo, hi, below, above)
+            self.aggregates[agg.shipment_id] = agg
+
+        for row in self.store.execute(
+            f"SELECT r.shipment_id, r.timestamp, {', '.join('r.' + m for m in METRICS)} "
+            "FROM sensor_readings r JOIN ("
+            " SELECT shipment_id, MAX(timestamp) AS last FROM sensor_readings"
+            " WHERE contract = ? GROUP BY shipment_id) m ON r.shipment_id = m.shipment_id "
+            "WHERE r.contract = ? AND r.timestamp >= m.last - ? ORDER BY r.block, r.log_index",
+            (self.address, self.address, self.window_seconds),
+        ):
+            agg = self.aggregates[bytes(row[0])]
+            for metric, raw in zip(METRICS, row[2:]):
+                agg.windows[metric].add(row[1], _scaled(metric, raw))
+
+    @staticmethod
+    def _reading(event):
+        data = event["args"]["data"]
+        return bytes(event["args"]["shipmentId"]), data["timestamp"], data
+
+    def rows(self, events):
+        rows = []
+        for e in events:
+            shipment_id, timestamp, d = self._reading(e)
+            rows.append((
+                self.address, bytes(e["transactionHash"]), e["logIndex"], shipment_id, timestamp,
+                d["temperature"], d["humidity"], d["vibrations"], d["accelX"], d["accelY"], d["accelZ"],
+                e["blockNumber"],
+            ))
+        return rows
+
+    def _fold(self, aggregates, events, copy_on_write=False):
+        copied = set()
+        for e in events:
+            shipment_id, timestamp, d = self._reading(e)
+            agg = aggregates.get(shipment_id)
+            if agg is None:
+                agg = aggregates[shipment_id] = ShipmentAggregates(shipment_id, self.window_seconds)
+                copied.add(shipment_id)
+            elif copy_on_write and shipment_id not in copied:
+                agg = aggregates[shipment_id] = agg.copy()
+                copied.add(shipment_id)
+            agg.add(timestamp, {metric: _scaled(metric, d[metric]) for metric in METRICS})
+        return aggregates
+
+    def on_checkpoint(self, events):
+        self._fold(self.aggregates, events)
+        fresh = []
+        for e in events:
+            key = (bytes(e["transactionHash"]), e["logIndex"])
+            if key in self._published:
+                self._published.discard(key)
+            else:
+                fresh.append(e)
+        self._publish(fresh)
+
+    def _publish(self, events):
+        """Hand each new reading to the listeners as a chart point, grouped by shipment."""
+        if not self.synced or not self.listeners or not events:
+            return
+        by_shipment = {}
+        for e in events:
+            shipment_id, timestamp, d = self._reading(e)
+            point = {"timestamp": str(format_timestamps([timestamp])[0]), "block": e["blockNumber"]}
+            point.update({metric: round(_scaled(metric, d[metric]), 2) for metric in METRICS})
+            by_shipment.setdefault(shipment_id, []).append(point)
+        for shipment_id, points in by_shipment.items():
+            for listener in self.listeners:
+                listener(shipment_id, points)
+
+    async def refresh(self):
+        tip = await self.sync()
+        # Tip readings are published as soon as they are seen; keys of readings that
+        # were reorged away are dropped here so the set stays within the tip.
+        keys = [(bytes(e["transactionHash"]), e["logIndex"]) for e in tip]
+        self._publish([e for e, key in zip(tip, keys) if key not in self._published])
+        self._published = set(keys)
+        snapshots = {}
+        if tip:
+            touched = {bytes(e["args"]["shipmentId"]) for e in tip}
+            base = {sid: self.aggregates[sid] for sid in touched if sid in self.aggregates}
+            snapshots = self._fold(base, tip, copy_on_write=True)
+        self.tip = snapshots
+        self.synced = True
+
+    def get(self, shipment_id):
+        """Aggregates of one shipment (bytes32), including unconfirmed readings, or None."""
+        agg = self.tip.get(shipment_id) or self.aggregates.get(shipment_id)
+        return agg.to_dict() if agg else None
+
+    def shipment_ids(self):
+        return list(self.aggregates.keys() | self.tip.keys())
+
+    async def run(self, interval=AGGREGATES_POLL_INTERVAL):
+        """Keep following new readings until cancelled."""
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("Shipment aggregate refresh failed")
+            await asyncio.sleep(interval)
+
+
+_aggregator = None
+
+
+async def get_aggregator(refresh=True):
+    """Shared aggregator; synced on first use unless `refresh` is False."""
+    global _aggregator
+    web3 = await get_web3()
+    contract = await get_logistics_contract()
+    if _aggregator is None or _aggregator.web3 is not web3 or _aggregator.address != contract.address:
+        _aggregator = ShipmentAggregator(web3, contract)
+    if refresh and not _aggregator.synced:
+        await single_flight.coalesced("shipment_aggregates", web3, _aggregator.refresh)
+    return _aggregator
+
+
+async def follow(interval=AGGREGATES_POLL_INTERVAL, listeners=()):
+    """Background task keeping the shared aggregates up to date and feeding `listeners` new readings."""
+    aggregator = await get_aggregator(refresh=False)
+    aggregator.listeners.extend(listeners)
+    try:
+        await aggregator.run(interval)
+    finally:
+        # A restarted follower registers them again.
+        for listener in listeners:
+            aggregator.listeners.remove(listener)
@@ -0,0 +1,73 @@
+import os
+import time
+import asyncio
+
+import telemetry
+
+"""
+Single-flight coalescing of chain reads.
+
+Concurrent callers of the same read share one in-flight fetch instead of each
+scanning the chain. Reads are keyed by operation and block height, so a
+caller that arrives after a new block starts a fresh fetch and never gets a
+result older than the head it saw. The head itself is read at most once per
+`HEAD_BLOCK_TTL` seconds (also coalesced), so per-request RPC load stays flat
+as concurrency grows.
+
+Every call is counted as `leader` (ran the fetch) or `follower` (shared it) in
+`chain_single_flight_calls_total`.
+"""
+
+# === CONFIG ===
+HEAD_BLOCK_TTL = float(os.getenv("HEAD_BLOCK_TTL", "1"))
+
+
+class SingleFlight:
+    def __init__(self):
+        self.inflight = {}  # key -> task
+        self.counts = {}  # operation -> {"leader": n, "follower": n}
+
+    async def do(self, key, fn):
+        """Await `fn()` once per `key` among concurrent callers; key[0] names the operation."""
+        task = self.inflight.get(key)
+        role = "follower" if task is not None else "leader"
+        if task is None:
+            task = self.inflight[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        counts = self.counts.setdefault(key[0], {"leader": 0, "follower": 0})
+        counts[role] += 1
+        telemetry.record_single_flight(key[0], role)
+        # Shielded so one cancelled caller does not abort the fetch the others are waiting on.
+        return await asyncio.shield(task)
+
+    def stats(self):
+        return {
+            operation: {**counts, "in_flight": sum(1 for key in self.inflight if key[0] == operation)}
+            for operation, counts in self.counts.items()
+        }
+
+
+_flights = SingleFlight()
+_head = {"web3": None, "block": None, "at": 0.0}
+
+
+async def _fetch_head(web3):
+    block = await web3.eth.block_number
+    _head.update(web3=web3, block=block, at=time.monotonic())
+    return block
+
+
+async def head_block(web3):
+    """Latest block number, reused for `HEAD_BLOCK_TTL` seconds."""
+    if _head["web3"] is web3 and time.monotonic() - _head["at"] < HEAD_BLOCK_TTL:
+        return _head["block"]
+    return await _flights.do(("eth_blockNumber", id(web3)), lambda: _fetch_head(web3))
+
+
+async def coalesced(operation, web3, fn):
+    """`fn()` shared by every concurrent caller of `operation` at the current head."""
+    return await _flights.do((operation, await head_block(web3)), fn)
+
+
+def stats():
+    return _flights.stats()
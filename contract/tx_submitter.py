@@ -0,0 +1,251 @@
+import os
+import time
+import logging
+import threading
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+from web3._utils.method_formatters import receipt_formatter
+
+"""
+Pipelined transaction submission for the upload scripts.
+
+Instead of `get_transaction_count` -> send -> `wait_for_transaction_receipt`
+per transaction (one transaction per block at best), nonces are allocated
+locally and up to `window` transactions are kept in flight. Receipts for all
+of them are fetched in one JSON-RPC batch per poll, the gas price is cached,
+and a transaction still pending after `stuck_after` seconds is replaced
+(same nonce) with a bumped gas price. `window=1` gives the old serial
+behaviour.
+
+A nonce is only kept once its transaction was accepted by the node; a failed
+send hands it back, so later transactions never queue behind a gap. Waiting
+for receipts (and for a free slot in the window) gives up with `TimeoutError`
+after `timeout` seconds.
+
+    submitter = TxSubmitter(web3, PRIVATE_KEY)
+    for args in entries:
+        submitter.submit(contract.functions.addShipmentEntry(*args))
+    receipts = submitter.wait()
+"""
+
+# === CONFIG ===
+TX_WINDOW = int(os.getenv("TX_WINDOW", "64"))
+TX_GAS_LIMIT = int(os.getenv("TX_GAS_LIMIT", "300000"))
+TX_POLL_INTERVAL = float(os.getenv("TX_POLL_INTERVAL", "1"))
+TX_STUCK_AFTER = float(os.getenv("TX_STUCK_AFTER", "60"))
+TX_GAS_BUMP = float(os.getenv("TX_GAS_BUMP", "1.125"))  # nodes require >= +10% to replace
+GAS_PRICE_TTL = float(os.getenv("GAS_PRICE_TTL", "15"))
+TX_WAIT_TIMEOUT = float(os.getenv("TX_WAIT_TIMEOUT", "600"))
+
+log = logging.getLogger(__name__)
+
+
+class NonceManager:
+    """Hands out consecutive nonces locally, starting from the pending count."""
+
+    def __init__(self, web3, address):
+        self.web3 = web3
+        self.address = address
+        self.lock = threading.Lock()
+        self.sync()
+
+    def sync(self):
+        with self.lock:
+            self.nonce = self.web3.eth.get_transaction_count(self.address, "pending")
+
+    def next(self):
+        with self.lock:
+            nonce = self.nonce
+            self.nonce += 1
+            return nonce
+
+    def release(self, nonce):
+        """Give back `nonce`, whose transaction never reached the node."""
+        with self.lock:
+            if nonce == self.nonce - 1:
+                self.nonce = nonce
+                return
+        # Later nonces are out already: only the node knows which ones it holds.
+        self.sync()
+
+
+class GasPriceCache:
+    def __init__(self, web3, ttl=GAS_PRICE_TTL):
+        self.web3 = web3
+        self.ttl = ttl
+        self.value = None
+        self.fetched_at = 0.0
+
+    def get(self):
+        now = time.monotonic()
+        if self.value is None or now - self.fetched_at > self.ttl:
+            self.value = self.web3.eth.gas_price
+            self.fetched_at = now
+        return self.value
+
+
+class PendingTx:
+    __slots__ = ("index", "label", "tx", "hashes", "sent_at")
+
+    def __init__(self, index, label, tx, tx_hash):
+        self.index = index
+        self.label = label
+        self.tx = tx
+        self.hashes = [tx_hash]
+        self.sent_at = time.monotonic()
+
+
+class TxSubmitter:
+    def __init__(
+        self,
+        web3,
+        private_key,
+        window=TX_WINDOW,
+        gas=TX_GAS_LIMIT,
+        gas_price=None,
+        poll_interval=TX_POLL_INTERVAL,
+        stuck_after=TX_STUCK_AFTER,
+        gas_bump=TX_GAS_BUMP,
+        on_receipt=None,
+        timeout=TX_WAIT_TIMEOUT,
+    ):
+        """`gas_price=None` uses the node's price (cached); `on_receipt(label, receipt)` is called per mined tx.
+
+        `timeout` bounds every wait for receipts, in seconds.
+        """
+        self.web3 = web3
+        self.account = web3.eth.account.from_key(private_key)
+        self.window = max(1, window)
+        self.gas = gas
+        self.fixed_gas_price = gas_price
+        self.gas_price = GasPriceCache(web3)
+        self.poll_interval = poll_interval
+        self.stuck_after = stuck_after
+        self.gas_bump = gas_bump
+        self.on_receipt = on_receipt
+        self.timeout = timeout
+        self.chain_id = web3.eth.chain_id
+        self.nonces = NonceManager(web3, self.account.address)
+        self.pending = {}  # nonce -> PendingTx
+        self.receipts = []
+        self.replaced = 0
+
+    def _current_gas_price(self):
+        return self.fixed_gas_price if self.fixed_gas_price is not None else self.gas_price.get()
+
+    def _send(self, tx):
+        signed = self.account.sign_transaction(tx)
+        return self.web3.eth.send_raw_transaction(signed.raw_transaction)
+
+    def submit(self, fn, label=None, gas=None, timeout=None):
+        """Sign and send `fn` with the next local nonce; blocks only while the window is full (up to `timeout`)."""
+        self._wait_until(self.window - 1, self.timeout if timeout is None else timeout)
+
+        nonce = self.nonces.next()
+        try:
+            tx = fn.build_transaction({
+                "from": self.account.address,
+                "chainId": self.chain_id,
+                "nonce": nonce,
+                "gas": gas or self.gas,
+                "gasPrice": self._current_gas_price(),
+            })
+            try:
+                tx_hash = self._send(tx)
+            except Exception as e:
+                if "nonce too low" not in str(e).lower():
+                    raise
+                # Someone else used the account: resync once and retry.
+                log.warning(f"Nonce {nonce} already used, resyncing")
+                self.nonces.sync()
+                tx["nonce"] = nonce = self.nonces.next()
+                tx_hash = self._send(tx)
+        except Exception:
+            self.nonces.release(nonce)
+            raise
+
+        index = len(self.receipts)
+        self.receipts.append(None)
+        self.pending[tx["nonce"]] = PendingTx(index, label, tx, tx_hash)
+        return tx_hash
+
+    def _fetch_receipts(self, hashes):
+        """Receipts for `hashes` (None while pending), in one batch when the node supports it."""
+        requests = [("eth_getTransactionReceipt", [Web3.to_hex(h)]) for h in hashes]
+        try:
+            responses = self.web3.provider.make_batch_request(requests)
+        except Exception as e:
+            responses = e
+        if isinstance(responses, list):
+            # web3's own batch API raises as soon as one receipt is still pending,
+            # so format the raw responses the way `get_transaction_receipt` would.
+            return [receipt_formatter(r["result"]) if r.get("result") else None for r in responses]
+
+        receipts = []
+        for h in hashes:
+            try:
+                receipts.append(self.web3.eth.get_transaction_receipt(h))
+            except TransactionNotFound:
+                receipts.append(None)
+        return receipts
+
+    def poll(self):
+        """Collect mined receipts and replace stuck transactions; returns how many completed."""
+        if not self.pending:
+            return 0
+        entries = [(nonce, h) for nonce, p in self.pending.items() for h in p.hashes]
+        receipts = self._fetch_receipts([h for _, h in entries])
+
+        done = 0
+        for (nonce, _), receipt in zip(entries, receipts):
+            if receipt is None or nonce not in self.pending:
+                continue
+            p = self.pending.pop(nonce)
+            if not receipt["status"]:
+                log.warning(f"Transaction {p.label or nonce} reverted: {Web3.to_hex(p.hashes[-1])}")
+            self.receipts[p.index] = receipt
+            if self.on_receipt:
+                self.on_receipt(p.label, receipt)
+            done += 1
+
+        now = time.monotonic()
+        for nonce, p in self.pending.items():
+            if now - p.sent_at > self.stuck_after:
+                self._replace(p)
+        return done
+
+    def _replace(self, p):
+        gas_price = max(int(p.tx["gasPrice"] * self.gas_bump) + 1, self._current_gas_price())
+        tx = {**p.tx, "gasPrice": gas_price}
+        try:
+            tx_hash = self._send(tx)
+        except Exception as e:
+            # Usually "already known" / "nonce too low": the original is being mined.
+            log.info(f"Could not replace nonce {tx['nonce']}: {e}")
+            p.sent_at = time.monotonic()
+            return
+        log.warning(f"Replaced stuck nonce {tx['nonce']} with gas price {gas_price}")
+        p.tx = tx
+        p.hashes.append(tx_hash)
+        p.sent_at = time.monotonic()
+        self.replaced += 1
+
+    def _wait_until(self, pending, timeout):
+        """Poll until at most `pending` transactions are in flight, for up to `timeout` seconds."""
+        deadline = time.monotonic() + timeout
+        while len(self.pending) > pending:
+            if self.poll():
+                continue
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"❌ {len(self.pending)} transactions still pending after {timeout:.0f}s")
+            time.sleep(self.poll_interval)
+
+    def wait(self, timeout=None):
+        """Block until every submitted transaction is mined; returns their receipts in submission order.
+
+        Raises `TimeoutError` after `timeout` seconds (default: the submitter's); the transactions
+        still pending stay in `pending` and a later `wait()` picks them up again.
+        """
+        self._wait_until(0, self.timeout if timeout is None else timeout)
+        receipts, self.receipts = self.receipts, []
+        return receipts
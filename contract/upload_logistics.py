@@ -1,21 +1,24 @@
 import os
 import json
 import dotenv
+import argparse
 from web3 import Web3
 import random
 import time
 
+from tx_submitter import TxSubmitter, TX_WINDOW
+from rpc_pool import PooledHTTPProvider
+
 # Load .env
 dotenv.load_dotenv()
 
 # Configs
-RPC_URL = os.getenv('RPC_URL')
 PRIVATE_KEY = os.getenv('PRIVATE_KEY')
 ACCOUNT_ADDRESS = os.getenv('ACCOUNT_ADDRESS')
 CONTRACT_ADDRESS = os.getenv('LOGISTICS_CONTRACT_ADDRESS')
 
 # Setup Web3
-web3 = Web3(Web3.HTTPProvider(RPC_URL))
+web3 = Web3(PooledHTTPProvider())  # RPC_URLS / RPC_URL, with failover
 assert web3.is_connected(), "Failed to connect to the RPC"
 
 # Load ABI
@@ -27,27 +30,23 @@ contract = web3.eth.contract(address=Web3.to_checksum_address(CONTRACT_ADDRESS),
 # Use a static shipment ID
 shipment_id = web3.keccak(text=str(random.randint(100000, 999999)))
 
+def print_receipt(label, receipt):
+    status = "✅" if receipt['status'] else "❌"
+    print(f"{status} {label} mined in block {receipt['blockNumber']}")
+
 # Create the delivery if not yet created
-def create_delivery():
-    tx = contract.functions.createDelivery(
+def create_delivery(submitter):
+    tx_hash = submitter.submit(contract.functions.createDelivery(
         shipment_id,
         "Berlin",
         "Paris",
         "Vehicle"
-    ).build_transaction({
-        'from': ACCOUNT_ADDRESS,
-        'nonce': web3.eth.get_transaction_count(ACCOUNT_ADDRESS),
-        'gas': 300000,
-        'gasPrice': web3.eth.gas_price,
-    })
-    signed = web3.eth.account.sign_transaction(tx, PRIVATE_KEY)
-    tx_hash = web3.eth.send_raw_transaction(signed.raw_transaction)
+    ), label="createDelivery")
     print("🚚 createDelivery() sent, tx:", web3.to_hex(tx_hash))
-    web3.eth.wait_for_transaction_receipt(tx_hash)
 
-# Push a fake sensor reading
-def push_sensor_data():
-    for _ in range(20):  # Push 20 fake entries
+# Push fake sensor readings; the submitter keeps up to `window` of them in flight
+def push_sensor_data(submitter, count=20, interval=0):
+    for i in range(count):
         temp = random.randint(2200, 2700)     # e.g., 22.00°C to 27.00°C
         humid = random.randint(4000, 6000)    # e.g., 40.00% to 60.00%
         vib = random.randint(0, 500)
@@ -55,9 +54,7 @@ def push_sensor_data():
         acc_y = random.randint(-100, 100)
         acc_z = 9800 + random.randint(-100, 100)
 
-        nonce = web3.eth.get_transaction_count(ACCOUNT_ADDRESS)
-
-        tx = contract.functions.submitSensorData(
+        tx_hash = submitter.submit(contract.functions.submitSensorData(
             shipment_id,
             temp,
             humid,
@@ -65,27 +62,36 @@ def push_sensor_data():
             acc_x,
             acc_y,
             acc_z
-        ).build_transaction({
-            'from': ACCOUNT_ADDRESS,
-            'nonce': nonce,
-            'gas': 300000,
-            'gasPrice': web3.eth.gas_price,
-        })
-
-        signed = web3.eth.account.sign_transaction(tx, PRIVATE_KEY)
-        tx_hash = web3.eth.send_raw_transaction(signed.raw_transaction)
+        ), label=f"sensor data #{i + 1}")
         print(f"📡 Pushed sensor data tx: {web3.to_hex(tx_hash)}")
-        web3.eth.wait_for_transaction_receipt(tx_hash)
 
-        time.sleep(1)  # Optional: slight delay to simulate streaming data
+        if interval:
+            time.sleep(interval)  # Optional: delay to simulate streaming data
 
 # 🚀 Run everything
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create a delivery and push fake sensor data")
+    parser.add_argument("--mode", choices=["pipelined", "serial"], default="pipelined",
+                        help="serial waits for each receipt before sending the next tx")
+    parser.add_argument("--window", type=int, default=TX_WINDOW, help="max transactions in flight when pipelined")
+    parser.add_argument("--entries", type=int, default=20, help="number of sensor readings to push")
+    parser.add_argument("--interval", type=float, default=0, help="seconds between readings")
+    args = parser.parse_args()
+
+    submitter = TxSubmitter(
+        web3,
+        PRIVATE_KEY,
+        window=1 if args.mode == "serial" else args.window,
+        on_receipt=print_receipt,
+    )
+    start = time.time()
     try:
         print("🚀 Creating delivery...")
-        create_delivery()
+        create_delivery(submitter)
     except Exception as e:
         print("⚠️ Likely already exists, skipping createDelivery():", e)
 
     print("📈 Pushing fake sensor data...")
-    push_sensor_data()
+    push_sensor_data(submitter, args.entries, args.interval)
+    submitter.wait()
+    print(f"⏱️ {args.entries + 1} transactions in {time.time() - start:.1f}s ({args.mode})")
@@ -0,0 +1,117 @@
+import os
+import json
+import asyncio
+import logging
+from functools import lru_cache
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from dotenv import load_dotenv
+from web3 import AsyncWeb3, Web3
+
+import telemetry
+from contract.rpc_pool import RpcPool, AsyncPooledHTTPProvider
+
+"""
+Shared async Web3 client.
+
+One `AsyncWeb3` per event loop, backed by a pooled keep-alive aiohttp session,
+so request handlers never block the loop on RPC I/O and never pay for a fresh
+connection, provider or ABI parse per call. Requests are routed over the
+`RPC_URLS` endpoints by a process-wide `RpcPool` (see rpc_pool). Contract
+objects are cached by (address, ABI file). Every JSON-RPC call, HTTP request,
+response byte and per-endpoint outcome is counted through `telemetry`.
+"""
+
+load_dotenv()
+
+# === CONFIG ===
+RPC_TIMEOUT = float(os.getenv("RPC_TIMEOUT", "30"))
+RPC_POOL_SIZE = int(os.getenv("RPC_POOL_SIZE", "100"))
+RPC_KEEPALIVE = float(os.getenv("RPC_KEEPALIVE", "30"))
+
+CONTRACT_DIR = os.path.dirname(__file__)
+TRACKER_ABI_PATH = os.getenv("ABI_PATH", os.path.join(CONTRACT_DIR, "CompanyShipmentTracker.json"))
+LOGISTICS_ABI_PATH = os.path.join(CONTRACT_DIR, "LogisticsDataStorage.json")
+
+log = logging.getLogger(__name__)
+
+_w3 = None
+_loop = None
+_session = None
+_init_lock = None
+_contracts = {}
+_pool = None
+
+
+class MeteredHTTPProvider(AsyncPooledHTTPProvider):
+    async def make_request(self, method, params):
+        telemetry.record_rpc_calls([method])
+        return await super().make_request(method, params)
+
+    async def make_batch_request(self, batch_requests):
+        telemetry.record_rpc_calls([method for method, _ in batch_requests])
+        return await super().make_batch_request(batch_requests)
+
+
+@lru_cache(maxsize=None)
+def load_abi(path):
+    with open(path) as f:
+        return json.load(f)["abi"]
+
+
+def get_pool():
+    """Process-wide RPC endpoint pool, shared by the async client and blocking writers."""
+    global _pool
+    if _pool is None:
+        _pool = RpcPool()
+        _pool.observers.append(telemetry.record_rpc_endpoint)
+    return _pool
+
+
+async def get_web3():
+    """Return the process-wide AsyncWeb3 bound to the running loop."""
+    global _w3, _loop, _session, _init_lock
+    loop = asyncio.get_running_loop()
+    if _w3 is not None and _loop is loop:
+        return _w3
+
+    if _init_lock is None or _loop is not loop:
+        _init_lock = asyncio.Lock()
+        _loop = loop
+        _w3 = None
+    async with _init_lock:
+        if _w3 is None:
+            _session = ClientSession(
+                raise_for_status=True,
+                connector=TCPConnector(limit=RPC_POOL_SIZE, keepalive_timeout=RPC_KEEPALIVE),
+                timeout=ClientTimeout(total=RPC_TIMEOUT),
+                trace_configs=[telemetry.rpc_trace_config()],
+            )
+            _contracts.clear()
+            _w3 = AsyncWeb3(MeteredHTTPProvider(get_pool(), _session))
+            names = ", ".join(e.name for e in get_pool().endpoints)
+            log.info(f"Async Web3 session opened for {names} (pool={RPC_POOL_SIZE})")
+    return _w3
+
+
+async def get_contract(address, abi_path):
+    w3 = await get_web3()
+    key = (address.lower(), abi_path)
+    if key not in _contracts:
+        _contracts[key] = w3.eth.contract(address=Web3.to_checksum_address(address), abi=load_abi(abi_path))
+    return _contracts[key]
+
+
+async def get_tracker_contract():
+    return await get_contract(os.getenv("CONTRACT_ADDRESS"), TRACKER_ABI_PATH)
+
+
+async def get_logistics_contract():
+    return await get_contract(os.getenv("LOGISTICS_CONTRACT_ADDRESS"), LOGISTICS_ABI_PATH)
+
+
+async def close():
+    global _w3, _loop, _session, _init_lock
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _w3 = _loop = _session = _init_lock = None
+    _contracts.clear()
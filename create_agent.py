@@ -1,7 +1,6 @@
 
-from coinbase_agentkit_openai_agents_sdk import get_openai_agents_sdk_tools
 from agents.agent import Agent
-from prepare_agentkit import prepare_agentkit
+from agents.model_settings import ModelSettings
 
 """
 Agent Framework Integration
@@ -21,6 +20,11 @@ This file bridges your AgentKit configuration with your chosen AI framework
    - Set up memory and conversation management
 
 The create_agent() function returns a configured agent ready for use in your application.
+
+4. Agent Profiles:
+   - AGENT_PROFILES holds one lean agent per purpose; create_profile_agent(name) builds it
+   - Only the on-chain actor carries the AgentKit tools and wallet instructions, so
+     classification, summarization and advice calls send neither the tool schemas nor them
 """
 
 # Shared agent instructions
@@ -36,21 +40,61 @@ AGENT_INSTRUCTIONS = (
     "responses. Refrain from restating your tools' descriptions unless it is explicitly requested."
 )
 
-def create_agent():
-    """Initialize the agent with tools from AgentKit."""
-    # Get AgentKit instance
-    agentkit = prepare_agentkit()
-
-    
-    # Get OpenAI Agents SDK tools
-    tools = get_openai_agents_sdk_tools(agentkit)
-
-    # Create Agent using the OpenAI Agents SDK
-    agent = Agent(
-        name="CDP Agent",
-        instructions=AGENT_INSTRUCTIONS,
-        tools=tools
+CLASSIFIER_INSTRUCTIONS = (
+    "You label requests for a shipping quality assistant. Reply with only the label or labels the "
+    "prompt asks for, spelled exactly as given, and no other text."
+)
+
+SUMMARIZER_INSTRUCTIONS = (
+    "You are Vector, a shipping quality assistant. Answer from the data in the prompt only, "
+    "briefly and in plain language."
+)
+
+ADVISOR_INSTRUCTIONS = (
+    "You are Vector, a shipping quality assistant. Give short, friendly, practical advice on shipping "
+    "and logistics. You have no wallet and cannot act onchain."
+)
+
+
+class AgentProfile:
+    """Instructions, tools and model settings of one kind of agent call."""
+
+    def __init__(self, name, instructions, onchain_tools=False, model_settings=None):
+        self.name = name
+        self.instructions = instructions
+        self.onchain_tools = onchain_tools
+        self.model_settings = model_settings or ModelSettings()
+
+
+AGENT_PROFILES = {
+    # Intent and metric labels: no tools, deterministic, a handful of output tokens.
+    "classifier": AgentProfile("Vector Classifier", CLASSIFIER_INSTRUCTIONS,
+                               model_settings=ModelSettings(temperature=0, max_tokens=20)),
+    # Summaries and recommendations over data already in the prompt.
+    "summarizer": AgentProfile("Vector Summarizer", SUMMARIZER_INSTRUCTIONS),
+    # General shipping advice and small talk: no tools, nothing onchain.
+    "advisor": AgentProfile("Vector Advisor", ADVISOR_INSTRUCTIONS),
+    # Requests that act on the wallet or onchain: the full AgentKit agent.
+    "onchain": AgentProfile("CDP Agent", AGENT_INSTRUCTIONS, onchain_tools=True),
+}
+
+
+def create_profile_agent(name):
+    """Build the agent for AGENT_PROFILES[name]; AgentKit is only loaded for on-chain profiles."""
+    profile = AGENT_PROFILES[name]
+    tools = []
+    if profile.onchain_tools:
+        from coinbase_agentkit_openai_agents_sdk import get_openai_agents_sdk_tools
+        from prepare_agentkit import prepare_agentkit
+        tools = get_openai_agents_sdk_tools(prepare_agentkit())
+    return Agent(
+        name=profile.name,
+        instructions=profile.instructions,
+        tools=tools,
+        model_settings=profile.model_settings,
     )
 
-    return agent, {}  # Return empty config to match Langchain interface
-     
\ No newline at end of file
+
+def create_agent():
+    """Initialize the agent with tools from AgentKit."""
+    return create_profile_agent("onchain"), {}  # Return empty config to match Langchain interface
@@ -0,0 +1,590 @@
+import os
+import mmap
+import json
+import time
+import fcntl
+import asyncio
+import logging
+import sqlite3
+import threading
+
+import numpy as np
+
+import telemetry
+from contract import leaderboard, shipment_aggregates, single_flight
+from contract.sensor_columns import FIELDS, DTYPES, ShipmentColumns
+from contract.query_logistics_data import query_logistics_data, seed_logistics_data
+from contract.web3_client import get_web3, get_logistics_contract, get_tracker_contract
+
+"""
+Shared data tier for several workers on one node.
+
+Every uvicorn / gunicorn worker used to follow the chain on its own: each one
+polled the company and sensor events, re-read the sensor histories and kept
+its own copy of the results, so RPC load and memory grew with the worker
+count. Now the workers elect one refresher through an exclusive `flock` on
+`DATA_TIER_DB.lock` (released by the kernel if the process dies, so another
+worker takes over within `DATA_TIER_TAIL_INTERVAL`). The refresher alone
+follows the chain and every `DATA_TIER_INTERVAL` re-reads the sensor histories
+and writes what changed into the SQLite file `DATA_TIER_DB`:
+
+    shipment_columns  where each shipment's sensor columns are in the column file
+    companies         the leaderboard ranking, unconfirmed entries included
+    shipment_stats    `ShipmentAggregates.to_dict()` of each shipment
+    live_points       new readings for the live feed, kept `DATA_TIER_LIVE_RETENTION`
+
+The sensor columns themselves go to an append-only column file next to it
+(`DATA_TIER_DB.columns-<generation>`, raw typed arrays, 8-byte aligned). Every
+worker maps it read-only and serves the histories as NumPy views of the
+mapping, so all workers share one copy in the page cache. A rewritten shipment
+is appended; once more than half of the file is dead, the refresher writes the
+live columns to the next generation and deletes the one before the previous.
+
+The SQLite file is in WAL mode, so the other workers read it while the
+refresher writes, without RPC calls (concurrent readers of one snapshot share
+a single read). They forward new live points to their own WebSocket subscribers. The
+refresher answers from the same refresh (its leaderboard and aggregates stay
+in memory), so RPC load follows time, not traffic or workers. A restarted
+refresher seeds its sensor histories from the file, so only readings added
+since then are read from the chain. If its chain followers die, it resigns and
+the election starts over.
+
+`DATA_TIER=off` keeps the old behaviour: every worker follows the chain itself.
+"""
+
+# === CONFIG ===
+DATA_TIER = os.getenv("DATA_TIER", "shared")  # "shared" or "off"
+DATA_TIER_DB = os.getenv("DATA_TIER_DB", os.path.join(os.path.dirname(__file__), "data_tier.db"))
+DATA_TIER_INTERVAL = float(os.getenv("DATA_TIER_INTERVAL", "5"))
+DATA_TIER_TAIL_INTERVAL = float(os.getenv("DATA_TIER_TAIL_INTERVAL", "1"))
+DATA_TIER_WAIT = float(os.getenv("DATA_TIER_WAIT", "30"))  # how long a reader waits for the first snapshot
+DATA_TIER_LIVE_RETENTION = float(os.getenv("DATA_TIER_LIVE_RETENTION", "300"))
+DATA_TIER_MMAP_SIZE = int(os.getenv("DATA_TIER_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+log = logging.getLogger(__name__)
+
+_tier = None
+
+
+def column_layout(readings):
+    """Offset of each field's column in a shipment's record of the column file, and the record size."""
+    offsets, size = {}, 0
+    for name in FIELDS:
+        offsets[name] = size
+        size += -(-readings * np.dtype(DTYPES[name]).itemsize // 8) * 8
+    return offsets, size
+
+
+class TierStore:
+    """The shared SQLite file. Only the elected refresher writes it."""
+
+    schema = (
+        "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+        "DROP TABLE IF EXISTS shipments",  # sensor columns as blobs, before the column file
+        "CREATE TABLE IF NOT EXISTS shipment_columns ("
+        " shipment_id BLOB PRIMARY KEY,"
+        " position INTEGER NOT NULL,"
+        " readings INTEGER NOT NULL,"
+        " generation INTEGER NOT NULL,"
+        " offset INTEGER NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS companies ("
+        " rank INTEGER PRIMARY KEY,"
+        " name TEXT,"
+        " deliveries INTEGER NOT NULL,"
+        " successes INTEGER NOT NULL,"
+        " feedback_total INTEGER NOT NULL,"
+        " delivery_time_total INTEGER NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS shipment_stats (shipment_id BLOB PRIMARY KEY, stats TEXT NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS live_points ("
+        " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " shipment_id BLOB NOT NULL,"
+        " points TEXT NOT NULL,"
+        " created REAL NOT NULL)",
+    )
+
+    def __init__(self, path=DATA_TIER_DB, mmap_size=DATA_TIER_MMAP_SIZE):
+        """Blocks while another worker initializes the file: open it from a thread, not the event loop."""
+        self.path = path
+        self.lock = threading.Lock()
+        self.mapped = (None, None)  # (generation, mmap) of the column file, grown on demand
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        # Workers start together: one at a time switches a new file to WAL (which
+        # fails rather than waits while another connection holds it) and creates the tables.
+        with open(path + ".init", "a") as guard:
+            fcntl.flock(guard, fcntl.LOCK_EX)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            with self.conn:
+                for ddl in self.schema:
+                    self.conn.execute(ddl)
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+
+    def columns_path(self, generation):
+        return f"{self.path}.columns-{generation}"
+
+    def append_columns(self, generation, shipments):
+        """Append the columns of `shipments` (`(id, position, ShipmentColumns)`) to the column file.
+
+        Returns the offset of each record and the file size; the data is on disk before the rows
+        pointing at it are committed.
+        """
+        if not shipments:
+            try:
+                return [], os.path.getsize(self.columns_path(generation))
+            except FileNotFoundError:
+                return [], 0
+        offsets = []
+        with open(self.columns_path(generation), "ab") as f:
+            offset = f.tell()
+            for _, _, columns in shipments:
+                offsets.append(offset)
+                for name in FIELDS:
+                    column = np.ascontiguousarray(columns[name], dtype=DTYPES[name])
+                    f.write(memoryview(column).cast("B"))
+                    f.write(bytes(-column.nbytes % 8))
+                offset += column_layout(len(columns))[1]
+            f.flush()
+            os.fdatasync(f.fileno())
+        return offsets, offset
+
+    def remove_columns(self, generation):
+        try:
+            os.remove(self.columns_path(generation))
+        except FileNotFoundError:
+            pass
+
+    def meta(self):
+        with self.lock:
+            rows = self.conn.execute("SELECT key, value FROM meta").fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def write(
+        self, meta, generation, shipments=(), positions=(), removed=(), companies=None, stats=(), points=(),
+        reset=False,
+    ):
+        """
+        Apply one refresh in a single transaction: `shipments` are `(id, position,
+        ShipmentColumns)` to (re)write, appended to column file `generation`,
+        `positions` `(position, id)` of unchanged ones that moved, `companies` the
+        whole ranking (None: unchanged), `stats` `(id, dict or None)` and `points`
+        `(id, points)` for the live feed.
+        """
+        now = time.time()
+        offsets, size = self.append_columns(generation, shipments)
+        meta = {**meta, "columns_bytes": size}
+        with self.lock, self.conn:
+            if reset:
+                for table in ("shipment_columns", "companies", "shipment_stats"):
+                    self.conn.execute(f"DELETE FROM {table}")
+            self.conn.executemany("DELETE FROM shipment_columns WHERE shipment_id = ?", [(sid,) for sid in removed])
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO shipment_columns (shipment_id, position, readings, generation, offset) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (sid, position, len(columns), generation, offset)
+                    for (sid, position, columns), offset in zip(shipments, offsets)
+                ],
+            )
+            self.conn.executemany("UPDATE shipment_columns SET position = ? WHERE shipment_id = ?", positions)
+            if companies is not None:
+                self.conn.execute("DELETE FROM companies")
+                self.conn.executemany(
+                    "INSERT INTO companies (rank, name, deliveries, successes, feedback_total, delivery_time_total) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(rank, *row) for rank, row in enumerate(companies)],
+                )
+            self.conn.executemany(
+                "DELETE FROM shipment_stats WHERE shipment_id = ?", [(sid,) for sid, value in stats if value is None]
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO shipment_stats (shipment_id, stats) VALUES (?, ?)",
+                [(sid, json.dumps(value)) for sid, value in stats if value is not None],
+            )
+            self.conn.executemany(
+                "INSERT INTO live_points (shipment_id, points, created) VALUES (?, ?, ?)",
+                [(sid, json.dumps(batch), now) for sid, batch in points],
+            )
+            self.conn.execute("DELETE FROM live_points WHERE created < ?", (now - DATA_TIER_LIVE_RETENTION,))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value)) for key, value in meta.items()],
+            )
+
+    def _mapping(self, generation, end):
+        """A read-only map of column file `generation` covering at least `end` bytes."""
+        with self.lock:
+            mapped_generation, mapped = self.mapped
+            if mapped_generation != generation or len(mapped) < end:
+                # Arrays over the previous map keep it alive until they are gone.
+                with open(self.columns_path(generation), "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self.mapped = (generation, mapped)
+            return mapped
+
+    def read_shipments(self):
+        """`ShipmentColumns` of every stored shipment, in position order, as views of the shared column file."""
+        try:
+            return self._read_shipments()
+        except FileNotFoundError:
+            # The refresher started a new generation and removed this one between our query and the map.
+            return self._read_shipments()
+
+    def _read_shipments(self):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT shipment_id, readings, generation, offset FROM shipment_columns ORDER BY position"
+            ).fetchall()
+        shipments = []
+        for shipment_id, readings, generation, offset in rows:
+            layout, size = column_layout(readings)
+            buffer = self._mapping(generation, offset + size) if size else b""
+            shipments.append(ShipmentColumns(
+                bytes(shipment_id).hex(),
+                {
+                    name: np.frombuffer(buffer, dtype=DTYPES[name], count=readings, offset=offset + layout[name])
+                    for name in FIELDS
+                },
+            ))
+        return shipments
+
+    def read_companies(self, n):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT name, deliveries, successes, feedback_total, delivery_time_total "
+                "FROM companies ORDER BY rank LIMIT ?",
+                (n,),
+            ).fetchall()
+
+    def read_stats(self, shipment_id):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT stats FROM shipment_stats WHERE shipment_id = ?", (shipment_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def last_point(self):
+        with self.lock:
+            return self.conn.execute("SELECT COALESCE(MAX(seq), 0) FROM live_points").fetchone()[0]
+
+    def read_points(self, after):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT seq, shipment_id, points FROM live_points WHERE seq > ? ORDER BY seq", (after,)
+            ).fetchall()
+        return [(seq, bytes(sid), json.loads(points)) for seq, sid, points in rows]
+
+
+class DataTier:
+    """This worker's side of the shared tier: refresher while elected, reader otherwise."""
+
+    def __init__(self, path=DATA_TIER_DB, mode=DATA_TIER):
+        self.path = path
+        self.mode = mode
+        self.leading = mode == "off"
+        self._store = None
+        self._store_lock = threading.Lock()
+        self._lock_fd = None
+        self._reads = single_flight.SingleFlight()
+        # Refresher state: what the file holds, and what changed since the last write.
+        self.written = {}  # shipment id -> (position, ShipmentColumns) as last written
+        self.companies = None  # ranking rows as last written
+        self.tip = set()  # shipments with unconfirmed readings at the last write
+        self.touched = set()  # shipments with new readings since the last write
+        self.points = []  # (shipment id, points) for the next write
+        self.full = True  # next write rewrites every shipment's stats
+        self.data = None  # sensor columns of the last refresh, served to this worker's requests
+        self.version = 0
+        self.publishes = 0
+        self.publish_seconds = None
+        # Reader state
+        self.tail_seq = None
+
+    @property
+    def store(self):
+        """The `TierStore`; opening it blocks, so first use it from a thread (see `_in_store`)."""
+        with self._store_lock:
+            if self._store is None:
+                self._store = TierStore(self.path)
+            return self._store
+
+    async def _in_store(self, method, *args):
+        """Run `TierStore.method` on the store in a thread, opening the store there if needed."""
+        return await asyncio.to_thread(lambda: method(self.store, *args))
+
+    # --- election ---
+
+    def _try_lead(self):
+        fd = os.open(self.path + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode())
+        self._lock_fd = fd
+        return True
+
+    def _resign(self):
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)  # drops the flock
+            self._lock_fd = None
+            log.info(f"Worker {os.getpid()} stopped refreshing the shared data tier")
+        self.leading = False
+        telemetry.DATA_TIER_LEADER.set(0)
+
+    async def _follow_chain(self, listeners):
+        """Follow the companies and the sensor readings; if one follower dies, stop the other and raise."""
+        followers = [
+            asyncio.ensure_future(leaderboard.follow()),
+            asyncio.ensure_future(shipment_aggregates.follow(listeners=listeners)),
+        ]
+        try:
+            await asyncio.gather(*followers)
+        finally:
+            for follower in followers:
+                follower.cancel()
+            await asyncio.gather(*followers, return_exceptions=True)
+
+    async def run(self, listeners=()):
+        """
+        Background task. While elected, follow the chain and write a snapshot
+        every `DATA_TIER_INTERVAL`; otherwise hand the live points the refresher
+        wrote to `listeners` and stand for election every `DATA_TIER_TAIL_INTERVAL`.
+        If the refresher's chain followers die, it resigns so a healthy worker can take over.
+        """
+        listeners = list(listeners)
+        if self.mode == "off":
+            while True:
+                try:
+                    await self._follow_chain(listeners)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    log.exception("Following the chain failed, restarting")
+                await asyncio.sleep(DATA_TIER_INTERVAL)
+        follower = None
+        try:
+            while True:
+                if follower is not None and follower.done():
+                    error = follower.exception() if not follower.cancelled() else None
+                    log.error(f"Shared data tier refresher lost its chain followers: {error!r}")
+                    follower = None
+                    self._resign()
+                    self.data = None
+                    self.written, self.companies, self.full = {}, None, True
+                    # Give the other workers a chance at the lock before standing again.
+                    await asyncio.sleep(DATA_TIER_TAIL_INTERVAL)
+                if follower is None and self._try_lead():
+                    log.info(f"Worker {os.getpid()} elected shared data tier refresher")
+                    self.leading = True
+                    telemetry.DATA_TIER_LEADER.set(1)
+                    await self._seed()
+                    follower = asyncio.ensure_future(self._follow_chain([*listeners, self._stage_points]))
+                try:
+                    if self.leading:
+                        await self.publish()
+                    else:
+                        await self.tail(listeners)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    log.exception("Shared data tier refresh failed" if self.leading else "Shared data tier tail failed")
+                await asyncio.sleep(DATA_TIER_INTERVAL if self.leading else DATA_TIER_TAIL_INTERVAL)
+        finally:
+            if follower is not None:
+                follower.cancel()
+                await asyncio.gather(follower, return_exceptions=True)
+            self._resign()
+
+    # --- refresher ---
+
+    async def _seed(self):
+        """Pick up the sensor histories a previous refresher wrote, if they are for the same contract."""
+        try:
+            meta = await self._in_store(TierStore.meta)
+            self.version = meta.get("version", 0)
+            contract = await get_logistics_contract()
+            if meta.get("logistics") != contract.address:
+                return
+            shipments = await self._in_store(TierStore.read_shipments)
+            await seed_logistics_data(shipments)
+        except Exception:
+            log.exception("Could not seed sensor histories from the shared data tier")
+            return
+        self.written = {bytes.fromhex(s.shipment_id): (position, s) for position, s in enumerate(shipments)}
+        log.info(f"Seeded {len(shipments)} sensor histories from {self.path}")
+
+    def _stage_points(self, shipment_id, points):
+        """`ShipmentAggregator` listener: queue new readings for the next write."""
+        self.touched.add(shipment_id)
+        self.points.append((shipment_id, points))
+
+    async def publish(self):
+        """Refresh the chain data and write whatever changed since the last write."""
+        start = time.perf_counter()
+        web3 = await get_web3()
+        tracker = await get_tracker_contract()
+        logistics = await get_logistics_contract()
+        data = self.data = await query_logistics_data()
+        board = await leaderboard.get_leaderboard()
+        aggregator = await shipment_aggregates.get_aggregator()
+        block = await single_flight.head_block(web3)
+
+        stored = await self._in_store(TierStore.meta)
+        reset = stored.get("logistics") != logistics.address or stored.get("tracker") != tracker.address
+        if reset:
+            self.written, self.companies, self.full = {}, None, True
+
+        current, shipments, positions = {}, [], []
+        for position, columns in enumerate(data):
+            shipment_id = bytes.fromhex(columns.shipment_id)
+            current[shipment_id] = (position, columns)
+            known = self.written.get(shipment_id)
+            if known is None or known[1] is not columns:
+                shipments.append((shipment_id, position, columns))
+            elif known[0] != position:
+                positions.append((position, shipment_id))
+        removed = [shipment_id for shipment_id in self.written if shipment_id not in current]
+
+        # Rewritten shipments are appended to the column file; once most of it is dead, start the next one.
+        generation = stored.get("columns", 0)
+        live = sum(column_layout(len(columns))[1] for _, columns in current.values())
+        if reset or stored.get("columns_bytes", 0) > 2 * live:
+            generation += 1
+            shipments = [(shipment_id, position, columns) for shipment_id, (position, columns) in current.items()]
+            positions = []
+
+        companies = [
+            (s.name, s.deliveries, s.successes, s.feedback_total, s.delivery_time_total)
+            for s in board.top(len(board.stats) + len(board.tip_stats))
+        ]
+        changed_companies = companies if companies != self.companies else None
+
+        tip = set(aggregator.tip)
+        touched, self.touched = self.touched, set()
+        points, self.points = self.points, []
+        ids = aggregator.shipment_ids() if self.full else touched | self.tip | tip
+        stats = [(shipment_id, aggregator.get(shipment_id)) for shipment_id in ids]
+
+        changed = bool(shipments or positions or removed or changed_companies is not None or stats or points)
+        version = self.version + 1 if changed or reset else self.version
+        meta = {
+            "version": version,
+            "block": block,
+            "refreshed_at": time.time(),
+            "leader": os.getpid(),
+            "logistics": logistics.address,
+            "tracker": tracker.address,
+            "shipments": len(current),
+            "companies": len(companies),
+            "columns": generation,
+        }
+        try:
+            await self._in_store(
+                TierStore.write, meta, generation, shipments, positions, removed, changed_companies, stats, points,
+                reset,
+            )
+        except Exception:
+            # Unknown what made it to disk: rewrite everything next time.
+            self.written, self.companies, self.full = {}, None, True
+            raise
+        if generation != stored.get("columns", 0):
+            # Readers of the previous generation finish from it; nothing points at the one before.
+            await self._in_store(TierStore.remove_columns, generation - 2)
+        self.written, self.companies, self.tip, self.full = current, companies, tip, False
+        self.version = version
+        self.publishes += 1
+        self.publish_seconds = time.perf_counter() - start
+        telemetry.DATA_TIER_PUBLISH_SECONDS.observe(self.publish_seconds)
+
+    # --- readers ---
+
+    async def tail(self, listeners):
+        """Hand the live points written since the last tail to `listeners`."""
+        if self.tail_seq is None:
+            self.tail_seq = await self._in_store(TierStore.last_point)
+            return
+        for seq, shipment_id, points in await self._in_store(TierStore.read_points, self.tail_seq):
+            for listener in listeners:
+                listener(shipment_id, points)
+            self.tail_seq = seq
+
+    async def _snapshot_version(self):
+        """Version of the current snapshot, waiting up to `DATA_TIER_WAIT` for the first one."""
+        deadline = time.monotonic() + DATA_TIER_WAIT
+        while True:
+            version = (await self._in_store(TierStore.meta)).get("version")
+            if version:
+                return version
+            if time.monotonic() >= deadline:
+                raise RuntimeError(f"❌ No shared data snapshot in {self.path} after {DATA_TIER_WAIT:.0f}s")
+            await asyncio.sleep(0.25)
+
+    async def shipments(self):
+        """`ShipmentColumns` of every shipment with readings, in creation order."""
+        if self.mode == "off" or (self.leading and self.data is None):
+            return await query_logistics_data()
+        if self.leading:
+            # The last refresh, like every other worker: RPC load does not follow traffic.
+            return self.data
+        version = await self._snapshot_version()
+        telemetry.DATA_TIER_READS.labels("shipments").inc()
+        with telemetry.span("tier.shipments"):
+            # Concurrent requests share one read of a snapshot; nothing is kept once they are done.
+            return await self._reads.do(
+                ("data_tier.shipments", version), lambda: self._in_store(TierStore.read_shipments)
+            )
+
+    async def top_companies(self, n=3):
+        """`to_dict()` of the best `n` companies of the leaderboard."""
+        if self.leading:
+            board = await leaderboard.get_leaderboard()
+            return [company.to_dict() for company in board.top(n)]
+        await self._snapshot_version()
+        telemetry.DATA_TIER_READS.labels("companies").inc()
+        rows = await self._in_store(TierStore.read_companies, n)
+        return [leaderboard.CompanyStats(*row).to_dict() for row in rows]
+
+    async def shipment_stats(self, shipment_id):
+        """Aggregates of one shipment (bytes32) as `ShipmentAggregates.to_dict()`, or None."""
+        if self.leading:
+            return (await shipment_aggregates.get_aggregator()).get(shipment_id)
+        await self._snapshot_version()
+        telemetry.DATA_TIER_READS.labels("shipment_stats").inc()
+        return await self._in_store(TierStore.read_stats, shipment_id)
+
+    def stats(self):
+        stats = {
+            "mode": self.mode,
+            "role": "off" if self.mode == "off" else "refresher" if self.leading else "reader",
+            "pid": os.getpid(),
+        }
+        if self.mode == "off":
+            return stats
+        meta = self.store.meta()
+        refreshed_at = meta.get("refreshed_at")
+        stats.update(
+            path=self.path,
+            leader=meta.get("leader"),
+            version=meta.get("version"),
+            block=meta.get("block"),
+            age_seconds=round(time.time() - refreshed_at, 3) if refreshed_at else None,
+            shipments=meta.get("shipments"),
+            companies=meta.get("companies"),
+        )
+        if self.leading:
+            stats.update(
+                publishes=self.publishes,
+                publish_ms=round(self.publish_seconds * 1000, 1) if self.publish_seconds is not None else None,
+            )
+        else:
+            stats.update(single_flight=self._reads.stats())
+        return stats
+
+
+def get_tier():
+    global _tier
+    if _tier is None:
+        _tier = DataTier()
+    return _tier
@@ -0,0 +1,243 @@
+import os
+import re
+import json
+import math
+import logging
+from collections import Counter, defaultdict
+
+"""
+Local intent classification.
+
+Picks one of the `/query` intents in-process, without an LLM round-trip:
+
+- `KeywordClassifier`: hand-written rules for unambiguous prompts
+  ("show me the temperature", "which company is most reliable").
+- `TfidfClassifier`: nearest-centroid TF-IDF model trained from a labeled
+  prompt file (one `{"intent": ..., "prompt": ...}` JSON object per line).
+- `HybridClassifier`: keyword rules first, TF-IDF when no rule is decisive.
+
+Every classifier returns `(intent, confidence)`; callers fall back to the LLM
+when the confidence is below `INTENT_CONFIDENCE`. Pick the implementation with
+`INTENT_CLASSIFIER` (`hybrid`, `keyword`, `tfidf` or `none`).
+
+Raw scores (a keyword match, a TF-IDF softmax) say nothing about how often
+the answer is right, so `create_classifier` calibrates them on held-out
+prompts (`INTENT_HOLDOUT_PATH`, same format; `"intent": null` marks prompts
+too ambiguous to answer locally, where any answer counts as wrong). The
+confidence is then the smoothed rate at which answers with that raw score
+were right, and `INTENT_CONFIDENCE` is the precision the local path must keep.
+"""
+
+INTENTS = ("advice", "find_shipment_company", "onchain", "shipment_data")
+
+# === CONFIG ===
+INTENT_CLASSIFIER = os.getenv("INTENT_CLASSIFIER", "hybrid")
+INTENT_CONFIDENCE = float(os.getenv("INTENT_CONFIDENCE", "0.9"))
+INTENT_PROMPTS_PATH = os.getenv(
+    "INTENT_PROMPTS_PATH", os.path.join(os.path.dirname(__file__), "intent_prompts.jsonl")
+)
+INTENT_HOLDOUT_PATH = os.getenv(
+    "INTENT_HOLDOUT_PATH", os.path.join(os.path.dirname(__file__), "intent_holdout.jsonl")
+)
+
+log = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def load_examples(path):
+    """`(intent, prompt)` pairs of a labeled prompt file; `intent` is None for ambiguous prompts."""
+    examples = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                examples.append((row["intent"], row["prompt"]))
+    return examples
+
+
+def tokenize(text):
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class Calibration:
+    """Maps a raw score to the rate at which answers with that score were right on held-out prompts.
+
+    An isotonic (pool-adjacent-violators) fit over `(score, correct)` pairs, with add-one smoothing so
+    a handful of lucky prompts never claims certainty.
+    """
+
+    def __init__(self, pairs):
+        by_score = defaultdict(lambda: [0, 0])
+        for score, correct in pairs:
+            by_score[score][0] += int(correct)
+            by_score[score][1] += 1
+        blocks = []  # [lowest score, right, total]
+        for score, (right, total) in sorted(by_score.items()):
+            blocks.append([score, right, total])
+            while len(blocks) > 1 and blocks[-2][1] * blocks[-1][2] >= blocks[-1][1] * blocks[-2][2]:
+                _, right, total = blocks.pop()
+                blocks[-1][1] += right
+                blocks[-1][2] += total
+        self.steps = []  # (lowest score, rate), rates non-decreasing
+        rate = 0.0
+        for low, right, total in blocks:
+            rate = max(rate, (right + 1) / (total + 2))
+            self.steps.append((low, rate))
+
+    def __call__(self, score):
+        rate = self.steps[0][1] if self.steps else 0.0
+        for low, step in self.steps:
+            if score < low:
+                break
+            rate = step
+        return rate
+
+    @classmethod
+    def fit(cls, classify, examples):
+        """Calibrate the raw `classify(prompt) -> (intent, score)` on labeled `examples`."""
+        pairs = []
+        for expected, prompt in examples:
+            intent, score = classify(prompt)
+            if intent is not None:
+                pairs.append((score, intent == expected))
+        return cls(pairs)
+
+
+class Calibrated:
+    """Mixin: `classify` reports calibrated confidences once `calibrate` has run."""
+
+    calibration = None
+
+    def calibrate(self, examples):
+        self.calibration = Calibration.fit(self.score, examples)
+        return self
+
+    def classify(self, prompt):
+        intent, score = self.score(prompt)
+        if intent is None or self.calibration is None:
+            return intent, score
+        return intent, self.calibration(score)
+
+
+class KeywordClassifier(Calibrated):
+    """Confident only when exactly one intent's rules match."""
+
+    RULES = {
+        "shipment_data": re.compile(
+            r"\b(temperature|temp|humid\w*|vibration\w*|sensor\w*|reading\w*|acceleration|accel\w*|"
+            r"chart|plot|graph|histogram|shock\w*|cold chain)\b"
+        ),
+        "find_shipment_company": re.compile(
+            r"\b(compan(y|ies)|carrier\w*|courier\w*|provider\w*|forwarder\w*|"
+            r"reliable|most reliable|success rate|feedback score|delivery score|rank\w*)\b"
+        ),
+        "onchain": re.compile(
+            r"\b(wallet\w*|faucet|eth|usdc|token\w*|nft\w*|swap|mint|onchain|on-chain|testnet|gas fee\w*)\b"
+        ),
+    }
+
+    def score(self, prompt):
+        text = prompt.lower()
+        matched = [intent for intent, rule in self.RULES.items() if rule.search(text)]
+        if len(matched) == 1:
+            return matched[0], 0.9
+        return None, 0.0
+
+
+class TfidfClassifier(Calibrated):
+    """Nearest-centroid classifier over TF-IDF vectors with cosine similarity."""
+
+    def __init__(self, examples, sharpness=10.0):
+        self.sharpness = sharpness
+        docs = [(intent, Counter(tokenize(prompt))) for intent, prompt in examples]
+        df = Counter()
+        for _, tf in docs:
+            df.update(tf.keys())
+        n = len(docs)
+        self.idf = {token: math.log((1 + n) / (1 + count)) + 1.0 for token, count in df.items()}
+
+        sums = defaultdict(Counter)
+        for intent, tf in docs:
+            for token, weight in self._vector(tf).items():
+                sums[intent][token] += weight
+        self.centroids = {intent: self._normalize(vec) for intent, vec in sums.items()}
+
+    @classmethod
+    def from_file(cls, path=INTENT_PROMPTS_PATH):
+        return cls(load_examples(path))
+
+    @staticmethod
+    def _normalize(vec):
+        norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+        return {k: v / norm for k, v in vec.items()}
+
+    def _vector(self, tf):
+        return self._normalize({t: c * self.idf[t] for t, c in tf.items() if t in self.idf})
+
+    def score(self, prompt):
+        """Nearest intent and its softmax share of the cosine similarities (uncalibrated)."""
+        vec = self._vector(Counter(tokenize(prompt)))
+        if not vec:
+            return None, 0.0
+        scores = {
+            intent: sum(w * centroid.get(t, 0.0) for t, w in vec.items())
+            for intent, centroid in self.centroids.items()
+        }
+        exp = {intent: math.exp(self.sharpness * s) for intent, s in scores.items()}
+        total = sum(exp.values())
+        intent = max(exp, key=exp.get)
+        return intent, exp[intent] / total
+
+
+class HybridClassifier:
+    def __init__(self, keyword=None, model=None):
+        self.keyword = keyword or KeywordClassifier()
+        self.model = model or TfidfClassifier.from_file()
+
+    def calibrate(self, examples):
+        self.keyword.calibrate(examples)
+        self.model.calibrate(examples)
+        return self
+
+    def classify(self, prompt):
+        intent, confidence = self.keyword.classify(prompt)
+        if intent is not None:
+            return intent, confidence
+        return self.model.classify(prompt)
+
+
+class NoopClassifier:
+    """Always defers to the LLM."""
+
+    def classify(self, prompt):
+        return None, 0.0
+
+    def calibrate(self, examples):
+        return self
+
+
+CLASSIFIERS = {
+    "hybrid": HybridClassifier,
+    "keyword": KeywordClassifier,
+    "tfidf": TfidfClassifier.from_file,
+    "none": NoopClassifier,
+}
+
+
+def create_classifier(name=INTENT_CLASSIFIER, holdout_path=INTENT_HOLDOUT_PATH):
+    try:
+        classifier = CLASSIFIERS[name]()
+    except Exception as e:
+        log.warning(f"Local intent classifier '{name}' unavailable ({e}), using the LLM only")
+        return NoopClassifier()
+    if holdout_path and os.path.exists(holdout_path):
+        classifier.calibrate(load_examples(holdout_path))
+    else:
+        log.warning(f"No held-out intent prompts at {holdout_path}: local intent scores are uncalibrated")
+    return classifier
@@ -0,0 +1,91 @@
+import os
+import asyncio
+
+import telemetry
+
+"""
+Fan-out of live sensor points to WebSocket subscribers.
+
+New readings come from the shared `ShipmentAggregator` poller (one upstream
+`eth_getLogs` loop per node, whatever the number of viewers; workers other
+than the elected refresher get them from the shared data tier) and are pushed
+into a bounded queue per subscriber. A subscriber that falls more than
+`LIVE_QUEUE_SIZE` points behind loses its oldest points (counted and reported
+to the client) rather than slowing the poller or growing memory, and whatever
+is queued is sent as one batch, so slow clients get fewer, larger messages.
+"""
+
+# === CONFIG ===
+LIVE_QUEUE_SIZE = int(os.getenv("LIVE_QUEUE_SIZE", "256"))
+LIVE_PING_SECONDS = float(os.getenv("LIVE_PING_SECONDS", "30"))
+
+
+class Subscriber:
+    def __init__(self, shipment_id, size=LIVE_QUEUE_SIZE):
+        self.shipment_id = shipment_id
+        self.queue = asyncio.Queue(maxsize=size)
+        self.dropped = 0
+
+    def offer(self, point):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            telemetry.LIVE_DROPPED_POINTS.inc()
+        self.queue.put_nowait(point)
+
+    async def batch(self, timeout=LIVE_PING_SECONDS):
+        """Every queued point (waiting up to `timeout` for the first), and the drop count since the last batch."""
+        try:
+            points = [await asyncio.wait_for(self.queue.get(), timeout)]
+        except asyncio.TimeoutError:
+            points = []
+        while not self.queue.empty():
+            points.append(self.queue.get_nowait())
+        dropped, self.dropped = self.dropped, 0
+        return points, dropped
+
+
+class LiveFeed:
+    def __init__(self, queue_size=LIVE_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.subscribers = {}  # shipment id -> set of Subscriber
+        self.published = 0
+
+    def subscribe(self, shipment_id):
+        subscriber = Subscriber(shipment_id, self.queue_size)
+        self.subscribers.setdefault(shipment_id, set()).add(subscriber)
+        telemetry.LIVE_SUBSCRIBERS.inc()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        subscribers = self.subscribers.get(subscriber.shipment_id)
+        if subscribers and subscriber in subscribers:
+            subscribers.discard(subscriber)
+            telemetry.LIVE_SUBSCRIBERS.dec()
+            if not subscribers:
+                del self.subscribers[subscriber.shipment_id]
+
+    def publish(self, shipment_id, points):
+        """`ShipmentAggregator` listener: copy new points to every subscriber of the shipment."""
+        for subscriber in self.subscribers.get(shipment_id, ()):
+            for point in points:
+                subscriber.offer(point)
+        self.published += len(points)
+
+    def stats(self):
+        return {
+            "shipments": len(self.subscribers),
+            "subscribers": sum(len(s) for s in self.subscribers.values()),
+            "published": self.published,
+            "queue_size": self.queue_size,
+        }
+
+
+_feed = None
+
+
+def get_feed():
+    global _feed
+    if _feed is None:
+        _feed = LiveFeed()
+    return _feed
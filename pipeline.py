@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import time
+
+"""
+Per-intent stage orchestration.
+
+A pipeline is a set of named async stages with declared dependencies. Every
+stage starts as soon as the stages it depends on have finished, so independent
+stages (e.g. an LLM summary and an LLM metric classifier) run concurrently and
+the pipeline takes as long as its slowest dependency chain.
+
+Each stage receives the results of its dependencies as keyword arguments and
+can have its own timeout. When a required stage fails, every other stage
+still running is cancelled and the error is raised. An optional stage that
+fails or times out yields its `default` instead.
+"""
+
+log = logging.getLogger(__name__)
+
+
+class StageError(RuntimeError):
+    def __init__(self, stage, error):
+        super().__init__(f"Stage '{stage}' failed: {error!r}")
+        self.stage = stage
+        self.error = error
+
+
+class Stage:
+    def __init__(self, name, fn, deps=(), timeout=None, required=True, default=None):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.timeout = timeout
+        self.required = required
+        self.default = default
+
+
+class Pipeline:
+    def __init__(self, stages):
+        self.stages = {stage.name: stage for stage in stages}
+        for stage in stages:
+            missing = [d for d in stage.deps if d not in self.stages]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stages {missing}")
+        self._check_acyclic()
+        self.durations = {}
+        self.errors = {}
+
+    def _check_acyclic(self):
+        done, visiting = set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle through stage '{name}'")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    async def _run_stage(self, stage, tasks):
+        inputs = {dep: await tasks[dep] for dep in stage.deps}
+        start = time.perf_counter()
+        try:
+            return await asyncio.wait_for(stage.fn(**inputs), timeout=stage.timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.errors[stage.name] = e
+            if stage.required:
+                raise StageError(stage.name, e) from e
+            log.warning(f"Optional stage '{stage.name}' failed ({e!r}), using default")
+            return stage.default
+        finally:
+            self.durations[stage.name] = time.perf_counter() - start
+
+    async def run(self):
+        """Run all stages and return `{stage name: result}`."""
+        tasks = {}
+        for name, stage in self.stages.items():
+            tasks[name] = asyncio.ensure_future(self._run_stage(stage, tasks))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        return {name: task.result() for name, task in tasks.items()}
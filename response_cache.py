@@ -0,0 +1,133 @@
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+"""
+LLM response cache.
+
+Entries are keyed by (stage, intent, normalized user prompt, data version).
+The data version is a digest of the on-chain data the prompt was built from,
+so a new shipment entry or sensor reading changes the key and stale answers
+are never served; prompts that do not depend on chain data use `STATIC`.
+
+Bounded by a TTL and an LRU size limit. With `RESPONSE_CACHE_PATH` set, the
+cache is loaded on startup and written back on `save()`.
+"""
+
+# === CONFIG ===
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH")
+
+STATIC = "static"
+
+log = logging.getLogger(__name__)
+
+_SPACES = re.compile(r"\s+")
+_TRAILING = re.compile(r"[\s?!.,;:]+$")
+
+
+def normalize_prompt(prompt):
+    return _TRAILING.sub("", _SPACES.sub(" ", prompt.strip().lower()))
+
+
+def data_version(*parts):
+    """Digest of the data a prompt is built from. Accepts str/bytes/buffers or JSON-able values."""
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode()
+        elif not isinstance(part, (bytes, bytearray, memoryview)):
+            part = json.dumps(part, sort_keys=True, default=str).encode()
+        h.update(part)
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, ttl=RESPONSE_CACHE_TTL, max_size=RESPONSE_CACHE_SIZE, path=RESPONSE_CACHE_PATH):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.path = path
+        self.entries = OrderedDict()  # key -> (expires_at, value)
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+        if path:
+            self.load()
+
+    @staticmethod
+    def key(stage, intent, prompt, version=STATIC):
+        return data_version(stage, intent, normalize_prompt(prompt), version)
+
+    def get(self, key):
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] <= now:
+                del self.entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.time() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                rows = json.load(f)
+        except Exception as e:
+            log.warning(f"Could not load response cache from {self.path}: {e}")
+            return
+        now = time.time()
+        with self.lock:
+            for key, expires_at, value in rows[-self.max_size:]:
+                if expires_at > now:
+                    self.entries[key] = (expires_at, value)
+        log.info(f"Loaded {len(self.entries)} cached responses from {self.path}")
+
+    def save(self):
+        if not self.path:
+            return
+        with self.lock:
+            rows = [[key, expires_at, value] for key, (expires_at, value) in self.entries.items()]
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(rows, f)
+        os.replace(tmp, self.path)
@@ -0,0 +1,219 @@
+import os
+import json
+import time
+import logging
+import contextvars
+from contextlib import contextmanager
+from aiohttp import TraceConfig
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+
+"""
+Request telemetry.
+
+`trace_request()` opens a per-request trace (carried in a context variable, so
+it follows the request into pipeline stages and RPC calls) and `span()` times
+one stage of it. Every span, RPC call, response byte and LLM token is both
+added to the current trace and exported as a Prometheus metric on `/metrics`.
+
+The trace is returned as the optional `timings` block of a response, and
+requests slower than `SLOW_REQUEST_SECONDS` are logged with their full stage
+breakdown.
+"""
+
+# === CONFIG ===
+SLOW_REQUEST_SECONDS = float(os.getenv("SLOW_REQUEST_SECONDS", "5"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+REQUEST_SECONDS = Histogram(
+    "query_request_seconds", "End-to-end request latency", ["endpoint", "intent"], buckets=LATENCY_BUCKETS
+)
+STAGE_SECONDS = Histogram("query_stage_seconds", "Latency of one request stage", ["stage"], buckets=LATENCY_BUCKETS)
+SLOW_REQUESTS = Counter("query_slow_requests_total", "Requests slower than SLOW_REQUEST_SECONDS", ["endpoint"])
+RPC_CALLS = Counter("rpc_calls_total", "JSON-RPC calls sent, by method", ["method"])
+RPC_HTTP_REQUESTS = Counter("rpc_http_requests_total", "HTTP requests sent to the RPC node")
+RPC_RESPONSE_BYTES = Counter("rpc_response_bytes_total", "Bytes received from the RPC node")
+RPC_ENDPOINT_EVENTS = Counter(
+    "rpc_endpoint_events_total",
+    "Requests per RPC endpoint by outcome (ok, error, abandoned) and routing (hedge, failover)",
+    ["endpoint", "event"],
+)
+RPC_ENDPOINT_SECONDS = Histogram(
+    "rpc_endpoint_seconds", "HTTP latency of one RPC endpoint", ["endpoint"], buckets=LATENCY_BUCKETS
+)
+SINGLE_FLIGHT_CALLS = Counter(
+    "chain_single_flight_calls_total",
+    "Coalesced chain reads, by operation and role (leader fetched, follower shared its result)",
+    ["operation", "role"],
+)
+LIVE_SUBSCRIBERS = Gauge("live_feed_subscribers", "Open live shipment WebSocket subscriptions")
+LIVE_DROPPED_POINTS = Counter("live_feed_dropped_points_total", "Live points dropped for slow subscribers")
+ADMISSION_IN_FLIGHT = Gauge("llm_admission_in_flight", "LLM runs holding an admission slot, by intent", ["intent"])
+ADMISSION_QUEUE_DEPTH = Gauge("llm_admission_queue_depth", "LLM runs waiting for an admission slot, by lane", ["lane"])
+ADMISSION_WAIT_SECONDS = Histogram(
+    "llm_admission_wait_seconds", "Time an LLM run waited for an admission slot", ["lane"], buckets=LATENCY_BUCKETS
+)
+ADMISSION_SHED = Counter(
+    "llm_admission_shed_total",
+    "LLM runs rejected by admission control, by lane and reason (queue_full, expected_wait, deadline)",
+    ["lane", "reason"],
+)
+DATA_TIER_LEADER = Gauge("data_tier_leader", "1 while this worker is the elected shared data tier refresher")
+DATA_TIER_PUBLISH_SECONDS = Histogram(
+    "data_tier_publish_seconds", "Time to refresh and write one shared data snapshot", buckets=LATENCY_BUCKETS
+)
+DATA_TIER_READS = Counter("data_tier_reads_total", "Reads served from the shared data tier, by kind", ["kind"])
+LLM_CALLS = Counter("llm_calls_total", "LLM runs, by stage and agent profile", ["stage", "profile"])
+LLM_TOKENS = Counter(
+    "llm_tokens_total", "LLM tokens, by stage, agent profile and direction", ["stage", "profile", "kind"]
+)
+LLM_CALL_TOKENS = Histogram(
+    "llm_call_tokens", "Tokens of one LLM run, by agent profile and direction", ["profile", "kind"],
+    buckets=(16, 64, 256, 512, 1024, 2048, 4096, 8192, 16384),
+)
+
+log = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar("request_trace", default=None)
+
+
+class RequestTrace:
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.intent = None
+        self.start = time.perf_counter()
+        self.elapsed = None
+        self.stages = {}  # stage -> seconds, summed over repeats
+        self.rpc = {"calls": 0, "http_requests": 0, "bytes": 0, "coalesced": 0}
+        self.llm = {"calls": 0, "input_tokens": 0, "output_tokens": 0, "profiles": {}}
+
+    def add_stage(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def to_dict(self):
+        elapsed = self.elapsed if self.elapsed is not None else time.perf_counter() - self.start
+        return {
+            "total_ms": round(elapsed * 1000, 2),
+            "stages": {name: round(seconds * 1000, 2) for name, seconds in self.stages.items()},
+            "rpc": dict(self.rpc),
+            "llm": {**self.llm, "profiles": {name: dict(v) for name, v in self.llm["profiles"].items()}},
+        }
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.start
+        REQUEST_SECONDS.labels(self.endpoint, self.intent or "unknown").observe(self.elapsed)
+        if self.elapsed >= SLOW_REQUEST_SECONDS:
+            SLOW_REQUESTS.labels(self.endpoint).inc()
+            log.warning(
+                f"Slow request {self.endpoint} intent={self.intent} took {self.elapsed:.2f}s: "
+                f"{json.dumps(self.to_dict())}"
+            )
+
+
+def current_trace():
+    return _current.get()
+
+
+@contextmanager
+def trace_request(endpoint):
+    trace = RequestTrace(endpoint)
+    previous = _current.get()
+    _current.set(trace)
+    try:
+        yield trace
+    finally:
+        # Not `reset(token)`: a streamed response's generator can start in the request task and finish in
+        # the response task, and a token only resets in the context that created it.
+        _current.set(previous)
+        trace.finish()
+
+
+@contextmanager
+def span(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.labels(name).observe(elapsed)
+        trace = _current.get()
+        if trace is not None:
+            trace.add_stage(name, elapsed)
+
+
+def record_rpc_calls(methods):
+    for method in methods:
+        RPC_CALLS.labels(method).inc()
+    trace = _current.get()
+    if trace is not None:
+        trace.rpc["calls"] += len(methods)
+
+
+def record_rpc_endpoint(endpoint, event, seconds):
+    """`RpcPool` observer."""
+    RPC_ENDPOINT_EVENTS.labels(endpoint.name, event).inc()
+    if event in ("ok", "error"):
+        RPC_ENDPOINT_SECONDS.labels(endpoint.name).observe(seconds)
+
+
+def record_single_flight(operation, role):
+    SINGLE_FLIGHT_CALLS.labels(operation, role).inc()
+    trace = _current.get()
+    if trace is not None and role == "follower":
+        trace.rpc["coalesced"] += 1
+
+
+def record_admission_wait(lane, seconds):
+    ADMISSION_WAIT_SECONDS.labels(lane).observe(seconds)
+    trace = _current.get()
+    if trace is not None:
+        trace.add_stage("admission.wait", seconds)
+
+
+def record_llm(stage, result, profile="default"):
+    """Count one agent run and the token usage of every model response it made."""
+    input_tokens = output_tokens = 0
+    for response in getattr(result, "raw_responses", None) or ():
+        usage = response.usage
+        input_tokens += usage.input_tokens or 0
+        output_tokens += usage.output_tokens or 0
+    LLM_CALLS.labels(stage, profile).inc()
+    LLM_TOKENS.labels(stage, profile, "input").inc(input_tokens)
+    LLM_TOKENS.labels(stage, profile, "output").inc(output_tokens)
+    LLM_CALL_TOKENS.labels(profile, "input").observe(input_tokens)
+    LLM_CALL_TOKENS.labels(profile, "output").observe(output_tokens)
+    trace = _current.get()
+    if trace is not None:
+        trace.llm["calls"] += 1
+        trace.llm["input_tokens"] += input_tokens
+        trace.llm["output_tokens"] += output_tokens
+        by_profile = trace.llm["profiles"].setdefault(profile, {"calls": 0, "input_tokens": 0, "output_tokens": 0})
+        by_profile["calls"] += 1
+        by_profile["input_tokens"] += input_tokens
+        by_profile["output_tokens"] += output_tokens
+
+
+async def _on_request_end(session, context, params):
+    RPC_HTTP_REQUESTS.inc()
+    trace = _current.get()
+    if trace is not None:
+        trace.rpc["http_requests"] += 1
+
+
+async def _on_response_chunk(session, context, params):
+    RPC_RESPONSE_BYTES.inc(len(params.chunk))
+    trace = _current.get()
+    if trace is not None:
+        trace.rpc["bytes"] += len(params.chunk)
+
+
+def rpc_trace_config():
+    """aiohttp hooks counting RPC HTTP requests and response bytes."""
+    config = TraceConfig()
+    config.on_request_end.append(_on_request_end)
+    config.on_response_chunk_received.append(_on_response_chunk)
+    return config
+
+
+def metrics_payload():
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,38 @@
+import os
+import sys
+import json
+
+import pytest
+from web3 import Web3, EthereumTesterProvider
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+"""
+Shared fixtures: an in-process eth-tester chain (py-evm, mines every
+transaction at once) with the repository's contract artifacts deployed.
+"""
+
+
+@pytest.fixture
+def chain():
+    return Web3(EthereumTesterProvider())
+
+
+@pytest.fixture
+def private_key(chain):
+    return str(chain.provider.ethereum_tester.backend.account_keys[0])
+
+
+def deploy(web3, name):
+    """Deploy `contract/<name>.json` from the chain's first account."""
+    with open(os.path.join(ROOT, "contract", f"{name}.json")) as f:
+        artifact = json.load(f)
+    factory = web3.eth.contract(abi=artifact["abi"], bytecode=artifact["bytecode"])
+    receipt = web3.eth.wait_for_transaction_receipt(factory.constructor().transact({"from": web3.eth.accounts[0]}))
+    return web3.eth.contract(address=receipt.contractAddress, abi=artifact["abi"])
+
+
+@pytest.fixture
+def logistics(chain):
+    return deploy(chain, "LogisticsDataStorage")
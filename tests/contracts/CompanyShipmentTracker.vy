@@ -0,0 +1,94 @@
+# pragma version 0.4.0
+# Test double of contract/CompanyShipmentTracker.sol with the same ABI and
+# behaviour, so the paged readers are tested without solc. Arrays are bounded
+# (Vyper DynArrays), which the tests stay well within.
+
+struct ShipmentEntry:
+    deliveryTime: uint256
+    success: bool
+    feedbackScore: uint256
+    timestamp: uint256
+
+struct CompanyData:
+    name: String[64]
+    totalDeliveries: uint256
+    successfulDeliveries: uint256
+    unsuccessfulDeliveries: uint256
+    totalFeedbackScore: uint256
+    totalDeliveryTime: uint256
+    entries: DynArray[ShipmentEntry, 20]
+
+struct CompanySummary:
+    name: String[64]
+    totalDeliveries: uint256
+    successfulDeliveries: uint256
+    unsuccessfulDeliveries: uint256
+    totalFeedbackScore: uint256
+    totalDeliveryTime: uint256
+
+event CompanyEntryAdded:
+    name: indexed(String[64])
+    entry: ShipmentEntry
+
+companies: HashMap[String[64], CompanyData]
+companyNames: DynArray[String[64], 20]
+
+@external
+def addShipmentEntry(name: String[64], deliveryTime: uint256, success: bool, feedbackScore: uint256):
+    if self.companies[name].totalDeliveries == 0:
+        self.companies[name].name = name
+        self.companyNames.append(name)
+    entry: ShipmentEntry = ShipmentEntry(deliveryTime=deliveryTime, success=success, feedbackScore=feedbackScore, timestamp=block.timestamp)
+    self.companies[name].entries.append(entry)
+    self.companies[name].totalDeliveries += 1
+    if success:
+        self.companies[name].successfulDeliveries += 1
+    else:
+        self.companies[name].unsuccessfulDeliveries += 1
+    self.companies[name].totalFeedbackScore += feedbackScore
+    self.companies[name].totalDeliveryTime += deliveryTime
+    log CompanyEntryAdded(name, entry)
+
+@view
+@external
+def getCompanyMetrics(name: String[64]) -> (String[64], uint256, uint256, uint256, uint256, uint256, uint256):
+    c: CompanyData = self.companies[name]
+    if c.totalDeliveries == 0:
+        return "", 0, 0, 0, 0, 0, 0
+    avg: uint256 = c.totalDeliveryTime // c.totalDeliveries
+    penalty: uint256 = (avg + 1199) // 1200
+    score: uint256 = 0
+    if penalty < 100:
+        score = 100 - penalty
+    return c.name, c.totalDeliveries, c.successfulDeliveries * 10000 // c.totalDeliveries, c.totalFeedbackScore // c.totalDeliveries, score, c.successfulDeliveries, c.unsuccessfulDeliveries
+
+@view
+@external
+def getCompanyEntries(name: String[64]) -> DynArray[ShipmentEntry, 20]:
+    return self.companies[name].entries
+
+@view
+@external
+def getAllCompanies() -> DynArray[CompanyData, 20]:
+    out: DynArray[CompanyData, 20] = []
+    for n: String[64] in self.companyNames:
+        out.append(self.companies[n])
+    return out
+
+@view
+@external
+def getCompanyCount() -> uint256:
+    return len(self.companyNames)
+
+@view
+@external
+def getCompanies(offset: uint256, limit: uint256) -> DynArray[CompanySummary, 20]:
+    total: uint256 = len(self.companyNames)
+    end: uint256 = offset
+    if offset < total:
+        end = total if limit > total - offset else offset + limit
+    page: DynArray[CompanySummary, 20] = []
+    for i: uint256 in range(offset, end, bound=20):
+        c: CompanyData = self.companies[self.companyNames[i]]
+        page.append(CompanySummary(name=c.name, totalDeliveries=c.totalDeliveries, successfulDeliveries=c.successfulDeliveries, unsuccessfulDeliveries=c.unsuccessfulDeliveries, totalFeedbackScore=c.totalFeedbackScore, totalDeliveryTime=c.totalDeliveryTime))
+    return page
@@ -0,0 +1,64 @@
+# pragma version 0.4.0
+# Test double of contract/LogisticsDataStorage.sol with the same ABI and
+# behaviour, so the paged readers are tested without solc. The paged
+# getDeliveryData overloads come from default arguments, which also add a
+# (shipmentId, offset) overload; histories are bounded (Vyper DynArrays).
+
+struct SensorData:
+    timestamp: uint256
+    temperature: int16
+    humidity: uint16
+    vibrations: uint16
+    accelX: int16
+    accelY: int16
+    accelZ: int16
+
+struct Delivery:
+    company: address
+    origin: String[64]
+    destination: String[64]
+    cargoType: String[64]
+    status: String[16]
+    createdAt: uint256
+
+event DeliveryCreated:
+    shipmentId: indexed(bytes32)
+    company: indexed(address)
+
+event DataSubmitted:
+    shipmentId: indexed(bytes32)
+    data: SensorData
+
+deliveries: public(HashMap[bytes32, Delivery])
+sensorData: HashMap[bytes32, DynArray[SensorData, 100]]
+
+@external
+def createDelivery(shipmentId: bytes32, origin: String[64], destination: String[64], cargoType: String[64]):
+    assert self.deliveries[shipmentId].company == empty(address), "Shipment already exists"
+    self.deliveries[shipmentId] = Delivery(company=msg.sender, origin=origin, destination=destination, cargoType=cargoType, status="Created", createdAt=block.timestamp)
+    log DeliveryCreated(shipmentId, msg.sender)
+
+@external
+def submitSensorData(shipmentId: bytes32, temperature: int16, humidity: uint16, vibrations: uint16, accelX: int16, accelY: int16, accelZ: int16):
+    assert self.deliveries[shipmentId].company != empty(address), "Unknown shipment"
+    d: SensorData = SensorData(timestamp=block.timestamp, temperature=temperature, humidity=humidity, vibrations=vibrations, accelX=accelX, accelY=accelY, accelZ=accelZ)
+    self.sensorData[shipmentId].append(d)
+    log DataSubmitted(shipmentId, d)
+
+@view
+@external
+def getDeliveryData(shipmentId: bytes32, offset: uint256 = 0, limit: uint256 = max_value(uint256)) -> DynArray[SensorData, 100]:
+    history: DynArray[SensorData, 100] = self.sensorData[shipmentId]
+    total: uint256 = len(history)
+    end: uint256 = offset
+    if offset < total:
+        end = total if limit > total - offset else offset + limit
+    page: DynArray[SensorData, 100] = []
+    for i: uint256 in range(offset, end, bound=100):
+        page.append(history[i])
+    return page
+
+@view
+@external
+def getDeliveryDataLength(shipmentId: bytes32) -> uint256:
+    return len(self.sensorData[shipmentId])
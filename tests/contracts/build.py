@@ -0,0 +1,32 @@
+"""
+Rebuild the compiled test doubles from their Vyper sources.
+
+Compiles `tests/contracts/<Name>.vy` and writes `tests/contracts/<Name>.json`
+(`abi` and `bytecode`), which the tests load, so they need no compiler:
+
+    pip install vyper==0.4.0
+    python tests/contracts/build.py
+"""
+
+import os
+import json
+
+CONTRACTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DOUBLES = ("CompanyShipmentTracker", "LogisticsDataStorage")
+
+
+def main():
+    import vyper
+
+    for name in DOUBLES:
+        with open(os.path.join(CONTRACTS_DIR, f"{name}.vy")) as f:
+            compiled = vyper.compile_code(f.read(), output_formats=["abi", "bytecode"])
+        path = os.path.join(CONTRACTS_DIR, f"{name}.json")
+        with open(path, "w") as f:
+            json.dump({"contractName": name, "abi": compiled["abi"], "bytecode": compiled["bytecode"]}, f, indent=2)
+            f.write("\n")
+        print(f"✅ {path}: {len(compiled['abi'])} ABI entries, vyper {vyper.__version__}")
+
+
+if __name__ == "__main__":
+    main()
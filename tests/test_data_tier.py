@@ -0,0 +1,101 @@
+import asyncio
+import mmap
+import os
+
+import numpy as np
+import pytest
+
+import data_tier
+from contract.sensor_columns import FIELDS, ShipmentColumns
+from data_tier import DataTier, TierStore
+
+
+def shipment(i, readings):
+    rows = [[1_700_000_000 + t, 2000 + t, 5000, t, -t, 0, 9800] for t in range(readings)]
+    return bytes([i]) * 32, ShipmentColumns.from_tuples(bytes([i] * 32).hex(), rows)
+
+
+def mapping(array):
+    return array.base.obj
+
+
+def write(store, generation, shipments, **kwargs):
+    store.write(
+        {"version": 1, "columns": generation}, generation,
+        [(sid, position, columns) for position, (sid, columns) in enumerate(shipments)], **kwargs,
+    )
+
+
+def test_readers_share_the_mapped_column_file(tmp_path):
+    path = str(tmp_path / "tier.db")
+    writer, reader = TierStore(path), TierStore(path)
+    shipments = [shipment(1, 5), shipment(2, 3)]
+    write(writer, 1, shipments)
+
+    first, second = reader.read_shipments(), reader.read_shipments()
+    assert [s.shipment_id for s in first] == [columns.shipment_id for _, columns in shipments]
+    for read, (_, columns) in zip(first, shipments):
+        for name in FIELDS:
+            np.testing.assert_array_equal(read[name], columns[name])
+            assert isinstance(mapping(read[name]), mmap.mmap)
+    # Both reads are views of one mapping: no copy per read.
+    assert mapping(first[0]["temperature"]) is mapping(second[0]["temperature"])
+
+    # A rewritten shipment is appended; the reader maps the grown file.
+    grown = shipment(2, 7)
+    writer.write({"version": 2}, 1, [(grown[0], 1, grown[1])])
+    read = reader.read_shipments()
+    assert len(read[1]) == 7
+    np.testing.assert_array_equal(read[1]["accelX"], grown[1]["accelX"])
+    assert len(first[1]) == 3  # views of the old mapping stay valid
+
+
+def test_new_generation_replaces_the_column_file(tmp_path):
+    path = str(tmp_path / "tier.db")
+    store = TierStore(path)
+    write(store, 1, [shipment(1, 4)])
+    old = store.read_shipments()
+    write(store, 2, [shipment(1, 4), shipment(3, 2)], reset=True)
+    store.remove_columns(0)
+
+    read = store.read_shipments()
+    assert [len(s) for s in read] == [4, 2]
+    assert store.meta()["columns_bytes"] == os.path.getsize(store.columns_path(2))
+    np.testing.assert_array_equal(old[0]["timestamp"], read[0]["timestamp"])
+
+
+@pytest.mark.asyncio
+async def test_refresher_resigns_when_its_chain_followers_die(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_tier, "DATA_TIER_INTERVAL", 0.01)
+    monkeypatch.setattr(data_tier, "DATA_TIER_TAIL_INTERVAL", 0.5)
+    path = str(tmp_path / "tier.db")
+    leader, standby = DataTier(path), DataTier(path)
+    followers = []
+
+    async def follow_chain(listeners):
+        followers.append(listeners)
+        raise ConnectionError("node unreachable")
+
+    async def nothing(*args):
+        pass
+
+    leader._follow_chain = follow_chain
+    leader._seed = leader.publish = leader.tail = nothing
+    task = asyncio.create_task(leader.run())
+    try:
+        while not followers:
+            await asyncio.sleep(0.01)
+        for _ in range(100):
+            if standby._try_lead():
+                break
+            await asyncio.sleep(0.01)
+        else:
+            pytest.fail("the refresher kept the lock after its followers died")
+        assert len(followers) == 1
+        assert not leader.leading
+        await asyncio.sleep(0.6)
+        assert not leader.leading  # the standby holds the lock now
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        standby._resign()
@@ -0,0 +1,99 @@
+import time
+
+import pytest
+from web3 import Web3
+
+from contract.ingest import ChainWriter, IngestGateway, PartialWriteError
+
+SHIPMENT = Web3.keccak(text="shipment-1")
+
+
+def readings(n):
+    return [
+        {"shipmentId": Web3.to_hex(SHIPMENT), "temperature": 2000 + i, "humidity": 5000, "vibrations": 10,
+         "accelX": 0, "accelY": 0, "accelZ": 980}
+        for i in range(n)
+    ]
+
+
+def temperatures(logistics):
+    return [row[1] for row in logistics.functions.getDeliveryData(SHIPMENT).call()]
+
+
+@pytest.fixture
+def writer(chain, private_key, logistics):
+    logistics.functions.createDelivery(SHIPMENT, "Berlin", "Paris", "Truck").transact({"from": chain.eth.accounts[0]})
+    writer = ChainWriter(chain, logistics, private_key)
+    writer.submitter.poll_interval = 0.01
+    return writer
+
+
+def gateway(submit, tmp_path, **kwargs):
+    return IngestGateway(submit, points_per_flush=5, raw_path=str(tmp_path / "raw.jsonl"), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_retries_only_the_unsent_writes(writer, logistics, tmp_path):
+    send = writer.submitter._send
+    calls = []
+
+    def flaky(tx):
+        calls.append(tx["nonce"])
+        if len(calls) == 3:
+            raise ConnectionError("node went away")
+        return send(tx)
+
+    writer.submitter._send = flaky
+    ingest = gateway(writer, tmp_path)
+    ingest.add(readings(5))
+
+    assert await ingest.flush(force=True) == 5
+    assert len(ingest.unsent) == 3 and ingest.written == 2
+    assert temperatures(logistics) == [2000, 2001]
+
+    assert await ingest.flush() == 3
+    assert ingest.unsent == [] and ingest.written == 5
+    assert temperatures(logistics) == [2000, 2001, 2002, 2003, 2004]
+
+
+@pytest.mark.asyncio
+async def test_flush_gives_up_waiting_for_receipts_without_resending(writer, logistics, tmp_path):
+    fetch = writer.submitter._fetch_receipts
+    writer.submitter._fetch_receipts = lambda hashes: [None] * len(hashes)
+    ingest = gateway(writer, tmp_path, flush_timeout=0.2)
+    ingest.add(readings(5))
+
+    start = time.monotonic()
+    await ingest.flush(force=True)
+    assert time.monotonic() - start < 5
+    assert ingest.unsent == [] and ingest.written == 5
+    assert not ingest.flush_lock.locked()
+
+    # The next write collects the receipts the timed-out one left pending.
+    writer.submitter._fetch_receipts = fetch
+    ingest.add(readings(1))
+    await ingest.flush(force=True)
+    assert not writer.submitter.pending
+    assert temperatures(logistics) == [2000, 2001, 2002, 2003, 2004, 2000]
+
+
+@pytest.mark.asyncio
+async def test_plain_submit_errors_requeue_everything(tmp_path):
+    attempts = []
+
+    def submit(writes, timeout):
+        attempts.append(len(writes))
+        if len(attempts) == 1:
+            raise RuntimeError("chain unreachable")
+
+    ingest = gateway(submit, tmp_path)
+    ingest.add(readings(5))
+    await ingest.flush(force=True)
+    assert len(ingest.unsent) == 5
+    await ingest.flush()
+    assert attempts == [5, 5] and ingest.unsent == []
+
+
+def test_partial_write_error_keeps_the_cause():
+    error = PartialWriteError(2, TimeoutError("slow"))
+    assert error.sent == 2 and isinstance(error.error, TimeoutError)
@@ -0,0 +1,159 @@
+import json
+import os
+
+import pytest
+from web3 import AsyncWeb3
+from web3.providers.eth_tester import AsyncEthereumTesterProvider
+
+from contract.build_artifacts import CONTRACT_DIR, CONTRACTS, SOLC_VERSION, compile_contract
+from contract.paged_views import DeliveryHistory, iter_companies
+
+"""
+The paged views on eth-tester, against the compiled Vyper test doubles in
+tests/contracts (always) and against the Solidity sources compiled with solc
+`SOLC_VERSION` (when py-solc-x can install it; skipped otherwise), plus the
+fallback readers against the committed artifacts, which predate the views.
+"""
+
+A, B = b"\xaa" * 32, b"\xbb" * 32
+DOUBLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "contracts")
+
+
+def load(directory, name):
+    with open(os.path.join(directory, f"{name}.json")) as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="module")
+def compiled():
+    pytest.importorskip("solcx")
+    try:
+        return {name: compile_contract(name) for name in CONTRACTS}
+    except Exception as e:
+        pytest.skip(f"solc {SOLC_VERSION} not available: {e}")
+
+
+@pytest.fixture(params=["doubles", "solc"])
+def artifacts(request):
+    if request.param == "doubles":
+        return {name: load(DOUBLES_DIR, name) for name in CONTRACTS}
+    return request.getfixturevalue("compiled")
+
+
+@pytest.fixture
+def web3():
+    return AsyncWeb3(AsyncEthereumTesterProvider())
+
+
+async def deploy(web3, artifact):
+    sender = (await web3.eth.accounts)[0]
+    factory = web3.eth.contract(abi=artifact["abi"], bytecode=artifact["bytecode"])
+    receipt = await web3.eth.wait_for_transaction_receipt(await factory.constructor().transact({"from": sender}))
+    return web3.eth.contract(address=receipt.contractAddress, abi=artifact["abi"])
+
+
+async def transact(web3, fn):
+    sender = (await web3.eth.accounts)[0]
+    await web3.eth.wait_for_transaction_receipt(await fn.transact({"from": sender}))
+
+
+async def submit(web3, logistics, shipment_id, temperature):
+    await transact(web3, logistics.functions.submitSensorData(shipment_id, temperature, 5000, 0, 0, 0, 9800))
+
+
+def test_artifacts_are_built_from_their_sources(compiled):
+    for name, artifact in compiled.items():
+        committed = load(CONTRACT_DIR, name)
+        assert committed["abi"] == artifact["abi"], f"run `python -m contract.build_artifacts {name}`"
+        assert committed["bytecode"] == artifact["bytecode"], f"run `python -m contract.build_artifacts {name}`"
+
+
+@pytest.mark.asyncio
+async def test_companies_are_read_a_page_at_a_time(artifacts, web3):
+    tracker = await deploy(web3, artifacts["CompanyShipmentTracker"])
+    for name, delivery_time, success, feedback in [
+        ("Acme", 3600, True, 9000), ("Acme", 7200, False, 5000), ("Bolt", 100, True, 10000),
+        ("Cargo", 60, True, 8000), ("Acme", 1, True, 1), ("Drift", 1200, False, 0), ("Cargo", 60, True, 6000),
+    ]:
+        await transact(web3, tracker.functions.addShipmentEntry(name, delivery_time, success, feedback))
+
+    assert await tracker.functions.getCompanyCount().call() == 4
+    assert [company async for company in iter_companies(tracker, page_size=3)] == [
+        ("Acme", 3, 2, 1, 14001, 10801),
+        ("Bolt", 1, 1, 0, 10000, 100),
+        ("Cargo", 2, 2, 0, 14000, 120),
+        ("Drift", 1, 0, 1, 0, 1200),
+    ]
+    assert [tuple(c[:6]) for c in await tracker.functions.getAllCompanies().call()] == [
+        tuple(c) for c in await tracker.functions.getCompanies(0, 10).call()
+    ]
+    assert await tracker.functions.getCompanies(4, 3).call() == []
+    assert len(await tracker.functions.getCompanies(3, 2**256 - 1).call()) == 1
+    assert await tracker.functions.getCompanyMetrics("Acme").call() == ["Acme", 3, 6666, 4667, 97, 2, 1]
+    assert await tracker.functions.getCompanyMetrics("Nobody").call() == ["", 0, 0, 0, 0, 0, 0]
+
+
+@pytest.mark.asyncio
+async def test_delivery_history_pages_in_new_readings_and_rereads_a_changed_tail(artifacts, web3):
+    logistics = await deploy(web3, artifacts["LogisticsDataStorage"])
+    tester = web3.provider.ethereum_tester
+    for shipment_id in (A, B):
+        await transact(web3, logistics.functions.createDelivery(shipment_id, "Rotterdam", "Basel", "pharma"))
+    for i in range(5):
+        await submit(web3, logistics, A, 2000 + i)
+    for i in range(3):
+        await submit(web3, logistics, B, 1000 + i)
+
+    async def on_chain(shipment_id):
+        return [tuple(row) for row in await logistics.functions.getDeliveryData(shipment_id).call()]
+
+    async def check(history):
+        data, failures = await history.read([A, B])
+        assert failures == {}
+        for shipment_id in (A, B):
+            columns = data[shipment_id]
+            assert [columns.raw_row(i) for i in range(len(columns))] == await on_chain(shipment_id)
+        return data
+
+    history = DeliveryHistory(web3, logistics, page_size=2)
+    first = await check(history)
+    assert len(first[A]) == 5 and len(first[B]) == 3
+    assert await logistics.functions.getDeliveryData(A, 5, 2).call() == []
+
+    snapshot = tester.take_snapshot()
+    await submit(web3, logistics, A, 2005)
+    second = await check(history)
+    assert len(second[A]) == 6
+    assert second[B] is first[B]  # unchanged: not read again
+
+    # A reorg replaces the last reading: the stored tail no longer matches, so A is read again.
+    tester.revert_to_snapshot(snapshot)
+    await submit(web3, logistics, A, -500)
+    await submit(web3, logistics, A, -501)
+    third = await check(history)
+    assert [third[A].raw_row(i)[1] for i in (-2, -1)] == [-500, -501]
+
+    # A reorg that shortens the history drops the readings that are gone.
+    tester.revert_to_snapshot(snapshot)
+    fourth = await check(history)
+    assert len(fourth[A]) == 5
+
+
+@pytest.mark.asyncio
+async def test_contracts_without_the_paged_views_are_read_whole(web3):
+    tracker = await deploy(web3, load(CONTRACT_DIR, "CompanyShipmentTracker"))
+    logistics = await deploy(web3, load(CONTRACT_DIR, "LogisticsDataStorage"))
+    for name in ("Acme", "Bolt", "Acme"):
+        await transact(web3, tracker.functions.addShipmentEntry(name, 600, True, 9000))
+    await transact(web3, logistics.functions.createDelivery(A, "Rotterdam", "Basel", "pharma"))
+    for i in range(3):
+        await submit(web3, logistics, A, 2000 + i)
+
+    assert [company async for company in iter_companies(tracker, page_size=1)] == [
+        ("Acme", 2, 2, 0, 18000, 1200),
+        ("Bolt", 1, 1, 0, 9000, 600),
+    ]
+    history = DeliveryHistory(web3, logistics, page_size=2)
+    data, failures = await history.read([A])
+    assert history.paged is False and failures == {}
+    assert [data[A].raw_row(i)[1] for i in range(3)] == [2000, 2001, 2002]
@@ -0,0 +1,123 @@
+import json
+import time
+import asyncio
+
+import pytest
+from aiohttp import ClientResponseError, ClientSession
+
+from bench.stub_node import StubNode, SyntheticChain
+from contract import rpc_pool
+from contract.rpc_pool import RpcPool
+
+BLOCK_NUMBER = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "eth_blockNumber", "params": []}).encode()
+SEND_RAW = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "eth_sendRawTransaction", "params": ["0x00"]}).encode()
+
+
+@pytest.fixture
+def nodes():
+    chain = SyntheticChain(shipments=2, readings=2, companies=1, entries=1)
+    started = [StubNode(chain).start() for _ in range(2)]
+    yield started
+    for node in started:
+        if node.thread.is_alive():
+            node.stop()
+
+
+@pytest.fixture
+def events():
+    return []
+
+
+def make_pool(nodes, events):
+    pool = RpcPool([node.url for node in nodes])
+    pool.observers.append(lambda endpoint, event, seconds: events.append((pool.endpoints.index(endpoint), event)))
+    return pool
+
+
+async def read(pool):
+    async with ClientSession() as session:
+        return json.loads(await pool.post(session, BLOCK_NUMBER))["result"]
+
+
+@pytest.mark.asyncio
+async def test_read_fails_over_to_the_healthy_node(nodes, events):
+    nodes[0].error_rate = 1.0
+    pool = make_pool(nodes, events)
+
+    assert await read(pool) == hex(nodes[1].chain.head)
+    assert events == [(0, "error"), (1, "failover"), (1, "ok")]
+    assert (nodes[0].requests, nodes[1].calls) == (1, 1)
+    assert pool.failovers == 1
+
+
+@pytest.mark.asyncio
+async def test_write_fails_over_only_when_the_connection_failed(nodes, events):
+    nodes[0].error_rate = 1.0
+    pool = make_pool(nodes, events)
+    async with ClientSession() as session:
+        with pytest.raises(ClientResponseError):
+            await pool.post(session, SEND_RAW, read=False)
+    assert nodes[1].requests == 0
+
+    nodes[0].stop()
+    async with ClientSession() as session:
+        await pool.post(session, SEND_RAW, read=False)
+    assert nodes[1].requests == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_read_is_hedged_and_the_loser_abandoned(nodes, events, monkeypatch):
+    monkeypatch.setattr(rpc_pool, "RPC_HEDGE_MAX_DELAY", 0.05)
+    nodes[0].latency = 1.0
+    pool = make_pool(nodes, events)
+
+    start = time.perf_counter()
+    assert await read(pool) == hex(nodes[1].chain.head)
+    assert time.perf_counter() - start < 0.5
+    assert pool.hedges == 1
+    assert (1, "hedge") in events and (1, "ok") in events and (0, "abandoned") in events
+    assert nodes[0].requests == 1 and nodes[1].requests == 1
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_half_opens_and_closes(nodes, events, monkeypatch):
+    monkeypatch.setattr(rpc_pool, "RPC_BREAKER_FAILURES", 2)
+    monkeypatch.setattr(rpc_pool, "RPC_BREAKER_COOLDOWN", 0.2)
+    nodes[0].error_rate = 1.0
+    nodes[1].latency = 0.05  # slower than the failing node, so it is probed first once half-open
+    pool = make_pool(nodes, events)
+    first = pool.endpoints[0]
+
+    for _ in range(2):
+        await read(pool)
+    assert first.stats()["circuit"] == "open"
+    for _ in range(3):
+        await read(pool)
+    assert nodes[0].requests == 2  # open: no traffic
+
+    await asyncio.sleep(0.25)
+    assert first.stats()["circuit"] == "half-open"
+    await read(pool)  # the probe fails: open again at once
+    assert nodes[0].requests == 3
+    assert first.stats()["circuit"] == "open"
+
+    nodes[0].error_rate = 0.0
+    await asyncio.sleep(0.25)
+    assert await read(pool) == hex(nodes[0].chain.head)  # the probe succeeds
+    assert nodes[0].requests == 4
+    assert first.stats()["circuit"] == "closed"
+
+
+@pytest.mark.asyncio
+async def test_every_breaker_open_fails_fast(nodes, events, monkeypatch):
+    monkeypatch.setattr(rpc_pool, "RPC_BREAKER_FAILURES", 1)
+    for node in nodes:
+        node.error_rate = 1.0
+    pool = make_pool(nodes, events)
+    with pytest.raises(ClientResponseError):
+        await read(pool)
+
+    requests = [node.requests for node in nodes]
+    with pytest.raises(rpc_pool.RpcUnavailableError):
+        await read(pool)
+    assert [node.requests for node in nodes] == requests
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from contract.sensor_columns import ShipmentColumns, series_arrays
+
+
+def fleet(shipments, readings, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        ShipmentColumns.from_tuples(
+            f"{i:064x}",
+            [[1_700_000_000 + 60 * t, int(rng.integers(-500, 3000)), 5000, int(rng.integers(0, 900)), 0, 0, 9800]
+             for t in range(readings)],
+        )
+        for i in range(shipments)
+    ]
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+@pytest.mark.parametrize("shipments, readings, max_points", [
+    (1000, 20, 500), (1000, 20, 100), (20, 50, 10), (4, 1000, 500), (3, 1000, 3),
+])
+def test_downsampled_series_never_exceed_max_points(method, shipments, readings, max_points):
+    data = fleet(shipments, readings)
+    for metric in ("temperature", "vibrations"):
+        ts, values = series_arrays(data, metric, max_points, method)
+        assert 0 < len(ts) <= max_points
+        assert len(values) == len(ts)
+
+
+def test_large_shares_are_downsampled_per_shipment():
+    data = fleet(4, 1000)
+    ts, _ = series_arrays(data, "temperature", 400)
+    assert len(ts) == 400
+    # Each shipment keeps its own first and last reading.
+    for s in data:
+        assert {s["timestamp"][0], s["timestamp"][-1]} <= set(ts.tolist())
+
+
+def test_short_series_are_returned_whole():
+    data = fleet(3, 10)
+    ts, values = series_arrays(data, "temperature", 500)
+    assert len(ts) == 30
+    expected = np.concatenate([s["temperature"] for s in data]).astype(np.float64)
+    np.testing.assert_array_equal(values, np.round(expected, 2))
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from web3 import AsyncWeb3, Web3
+from web3.providers.rpc import AsyncHTTPProvider
+
+from bench.stub_node import GENESIS_TIMESTAMP, LOGISTICS_ADDRESS, StubNode, SyntheticChain
+from contract.log_indexer import IndexStore
+from contract.shipment_aggregates import ShipmentAggregator
+from contract.web3_client import LOGISTICS_ABI_PATH, load_abi
+
+CONFIRMATIONS = 2
+
+
+@pytest.fixture
+def node():
+    node = StubNode(SyntheticChain(shipments=3, readings=5, companies=1, entries=1, reading_logs=True)).start()
+    yield node
+    node.stop()
+
+
+@pytest.fixture
+def aggregator(node, tmp_path):
+    web3 = AsyncWeb3(AsyncHTTPProvider(node.url))
+    contract = web3.eth.contract(address=Web3.to_checksum_address(LOGISTICS_ADDRESS), abi=load_abi(LOGISTICS_ABI_PATH))
+    aggregator = ShipmentAggregator(web3, contract, store=IndexStore(str(tmp_path / "index.db")), confirmations=CONFIRMATIONS)
+    published = []
+    aggregator.listeners.append(lambda shipment_id, points: published.append((shipment_id, points)))
+    return aggregator, published
+
+
+def reading(i):
+    return [GENESIS_TIMESTAMP + 10**6 + i, 2500, 5000, 100, 0, 0, 9800]
+
+
+@pytest.mark.asyncio
+async def test_first_sync_seeds_silently_then_publishes_new_readings(node, aggregator):
+    aggregator, published = aggregator
+    chain = node.chain
+    # One reading is still in the unconfirmed tip when the aggregator starts.
+    chain.mine_readings(0, [reading(0)])
+
+    await aggregator.refresh()
+    assert published == []
+    assert aggregator.get(bytes(chain.shipment_ids[0]))["count"] == 6
+    assert aggregator.get(bytes(chain.shipment_ids[1]))["count"] == 5
+
+    chain.mine_readings(1, [reading(1), reading(2)])
+    await aggregator.refresh()
+    assert [(sid, len(points)) for sid, points in published] == [(bytes(chain.shipment_ids[1]), 2)]
+    assert published[0][1][0]["temperature"] == 25.0
+
+    # Confirming tip readings (seeded or published) never publishes them again.
+    chain.mine_blocks(CONFIRMATIONS + 1)
+    await aggregator.refresh()
+    assert len(published) == 1
+    assert aggregator.aggregates[bytes(chain.shipment_ids[0])].count == 6
+    assert aggregator.aggregates[bytes(chain.shipment_ids[1])].count == 7
+
+
+def test_stub_serves_reading_logs_in_block_order(node):
+    chain = node.chain
+    block = chain.mine_readings(2, np.array([reading(3)]))
+    logs = chain.handle("eth_getLogs", [{"address": LOGISTICS_ADDRESS, "fromBlock": "0x1", "toBlock": hex(block)}])
+    assert len(logs) == 3 * (1 + 5) + 1
+    assert [int(entry["logIndex"], 16) for entry in logs[:6]] == list(range(6))
+    assert len(chain.readings_for(2)) == chain.reading_count(2) == 6
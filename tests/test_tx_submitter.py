@@ -0,0 +1,58 @@
+import pytest
+
+from contract.tx_submitter import TxSubmitter
+
+
+def create(logistics, i):
+    return logistics.functions.createDelivery(i.to_bytes(32, "big"), "Berlin", "Paris", "Truck")
+
+
+def test_failed_send_hands_its_nonce_back(chain, private_key, logistics):
+    submitter = TxSubmitter(chain, private_key, poll_interval=0.01)
+    start = submitter.nonces.nonce
+    send = submitter._send
+    calls = []
+
+    def flaky(tx):
+        calls.append(tx["nonce"])
+        if len(calls) == 2:
+            raise ValueError("insufficient funds for gas * price + value")
+        return send(tx)
+
+    submitter._send = flaky
+    submitter.submit(create(logistics, 1))
+    with pytest.raises(ValueError):
+        submitter.submit(create(logistics, 2))
+    submitter.submit(create(logistics, 3))
+
+    receipts = submitter.wait()
+    assert calls == [start, start + 1, start + 1]
+    assert [r["status"] for r in receipts] == [1, 1]
+    assert chain.eth.get_transaction_count(submitter.account.address) == start + 2
+
+
+def test_release_behind_later_nonces_resyncs_from_the_node(chain, private_key, logistics):
+    submitter = TxSubmitter(chain, private_key, poll_interval=0.01)
+    submitter.submit(create(logistics, 1))
+    mined = chain.eth.get_transaction_count(submitter.account.address)
+    first, second = submitter.nonces.next(), submitter.nonces.next()
+    assert (first, second) == (mined, mined + 1)
+
+    submitter.nonces.release(second)
+    assert submitter.nonces.next() == second
+    submitter.nonces.release(first)  # `second` is out again: back to the node's pending count
+    assert submitter.nonces.next() == mined
+
+
+def test_wait_raises_after_its_deadline_and_resumes(chain, private_key, logistics):
+    submitter = TxSubmitter(chain, private_key, poll_interval=0.01, timeout=0.1)
+    fetch = submitter._fetch_receipts
+    submitter._fetch_receipts = lambda hashes: [None] * len(hashes)
+    submitter.submit(create(logistics, 1))
+
+    with pytest.raises(TimeoutError):
+        submitter.wait()
+    assert len(submitter.pending) == 1
+
+    submitter._fetch_receipts = fetch
+    assert [r["status"] for r in submitter.wait()] == [1]
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from warmup import COLD, FAILED, READY, LazyResource, readiness, warm_up
+
+
+def flaky(failures):
+    calls = []
+
+    def factory():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise ConnectionError("node unreachable")
+        return "agent"
+
+    return factory, calls
+
+
+async def until(condition, timeout=2):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    pytest.fail("timed out")
+
+
+@pytest.mark.asyncio
+async def test_background_warm_up_retries_failed_builds_with_backoff():
+    factory, calls = flaky(failures=2)
+    agent = LazyResource("agent", factory, blocking=False)
+    task = asyncio.create_task(warm_up([agent], retry_min=0.01, retry_max=0.02))
+    try:
+        await until(lambda: agent.state == FAILED)
+        assert readiness([agent], mode="background")[0] is False
+        # No request ever reaches an unready worker; the warm-up task retries on its own.
+        await until(lambda: agent.state == READY)
+        assert len(calls) == 3
+        assert readiness([agent], mode="background")[0] is True
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_lazy_mode_is_ready_before_the_first_request():
+    factory, calls = flaky(failures=1)
+    agent = LazyResource("agent", factory, blocking=False)
+    assert readiness([agent], mode="lazy")[0] is True
+    assert readiness([agent], mode="background")[0] is False
+
+    task = asyncio.create_task(warm_up([agent], cold=False, retry_min=0.01, retry_max=0.02))
+    try:
+        await asyncio.sleep(0.05)
+        assert agent.state == COLD and calls == []  # lazy: nothing built without traffic
+
+        with pytest.raises(ConnectionError):
+            await agent.get()
+        assert readiness([agent], mode="lazy")[0] is False
+        await until(lambda: agent.state == READY)
+        assert readiness([agent], mode="lazy")[0] is True
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
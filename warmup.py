@@ -0,0 +1,139 @@
+import os
+import time
+import asyncio
+import inspect
+import logging
+
+"""
+Deferred construction of expensive app dependencies.
+
+A `LazyResource` builds its value (e.g. the AgentKit agent) on first use, or
+ahead of time from a background warm-up task, and records its state, build
+time and last error for the readiness probe. A failed build does not take
+the whole worker down: it is retried on the next use, and by the `warm_up`
+task with exponential backoff (`WARMUP_RETRY_MIN` doubling up to
+`WARMUP_RETRY_MAX` seconds), so a worker that readiness has taken out of
+rotation recovers without waiting for traffic.
+
+`BOOT_MODE` picks when resources are built:
+    eager       at import, like a plain module-level call (a failure aborts the boot)
+    background  from a startup task, without blocking the server (default)
+    lazy        on the first request that needs them (not yet built counts as ready)
+"""
+
+# === CONFIG ===
+BOOT_MODE = os.getenv("BOOT_MODE", "background")
+WARMUP_RETRY_MIN = float(os.getenv("WARMUP_RETRY_MIN", "1"))
+WARMUP_RETRY_MAX = float(os.getenv("WARMUP_RETRY_MAX", "60"))
+
+COLD, WARMING, READY, FAILED = "cold", "warming", "ready", "failed"
+
+log = logging.getLogger(__name__)
+
+
+class LazyResource:
+    def __init__(self, name, factory, required=True, blocking=True):
+        """`factory` is called with no arguments; sync factories run in a worker thread unless `blocking=False`."""
+        self.name = name
+        self.factory = factory
+        self.required = required
+        self.blocking = blocking
+        self.state = COLD
+        self.value = None
+        self.error = None
+        self.seconds = None
+        self._task = None
+
+    async def get(self):
+        if self.state == READY:
+            return self.value
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._build())
+        # Shielded so a cancelled request does not abort a build others are waiting on.
+        return await asyncio.shield(self._task)
+
+    def get_sync(self):
+        """Build in the calling thread; for `eager` boot before any loop exists."""
+        if self.state != READY:
+            self._start()
+            try:
+                self._done(self.factory())
+            except Exception as e:
+                self._failed(e)
+                raise
+        return self.value
+
+    async def _build(self):
+        self._start()
+        try:
+            if inspect.iscoroutinefunction(self.factory):
+                value = await self.factory()
+            elif self.blocking:
+                value = await asyncio.to_thread(self.factory)
+            else:
+                value = self.factory()
+        except Exception as e:
+            self._failed(e)
+            raise
+        self._done(value)
+        return value
+
+    def _start(self):
+        self.state = WARMING
+        self.error = None
+        self._started = time.perf_counter()
+
+    def _done(self, value):
+        self.value = value
+        self.seconds = time.perf_counter() - self._started
+        self.state = READY
+        log.info(f"Warmed up {self.name} in {self.seconds:.2f}s")
+
+    def _failed(self, error):
+        self.seconds = time.perf_counter() - self._started
+        self.state = FAILED
+        self.error = f"{type(error).__name__}: {error}"
+        log.error(f"Warm-up of {self.name} failed after {self.seconds:.2f}s: {self.error}")
+
+    def status(self):
+        return {
+            "state": self.state,
+            "required": self.required,
+            "seconds": round(self.seconds, 3) if self.seconds is not None else None,
+            "error": self.error,
+        }
+
+
+async def warm_up(resources, cold=True, retry_min=WARMUP_RETRY_MIN, retry_max=WARMUP_RETRY_MAX):
+    """
+    Build every resource concurrently (with `cold=False`, only the ones whose
+    build failed), then keep retrying failed builds with exponential backoff
+    until cancelled. Failures are recorded, not raised.
+    """
+    delay = retry_min
+    while True:
+        due = [resource for resource in resources if resource.state == FAILED or (cold and resource.state == COLD)]
+        cold = False
+        if due:
+            await asyncio.gather(*(resource.get() for resource in due), return_exceptions=True)
+        if any(resource.state == FAILED for resource in resources):
+            log.info(f"Retrying failed warm-ups in {delay:.0f}s")
+            await asyncio.sleep(delay)
+            delay = min(2 * delay, retry_max)
+        else:
+            delay = retry_min
+            await asyncio.sleep(retry_min)
+
+
+def readiness(resources, mode=BOOT_MODE):
+    """
+    `(ready, report)`: ready once every required resource is built. In `lazy`
+    mode a resource nobody asked for yet counts as ready, since only traffic builds it.
+    """
+    built = (READY, COLD) if mode == "lazy" else (READY,)
+    ready = all(resource.state in built for resource in resources if resource.required)
+    return ready, {
+        "ready": ready,
+        "mode": mode,
+        "resources": {resource.name: resource.status() for resource in resources},
+    }
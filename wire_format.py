@@ -0,0 +1,67 @@
+import orjson
+import msgpack
+import numpy as np
+
+"""
+Response encodings for /query.
+
+    json      the original shape: chart series as `[[timestamp-string, value], ...]`
+    columnar  JSON with one epoch-seconds `timestamps` array and one `values`
+              array per series, written straight from the NumPy columns
+    msgpack   MessagePack with each series as raw little-endian array bytes
+              (`dtype` gives the NumPy type string, float32 for scaled
+              metrics), so no per-point objects
+
+All JSON goes through orjson. The format comes from the `format` query flag,
+else from the first `Accept` media type listed in `ACCEPT` (q-values are not
+weighed), else `json`.
+"""
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "columnar": "application/vnd.vector.columnar+json",
+    "msgpack": "application/msgpack",
+}
+ACCEPT = {
+    "application/json": "json",
+    "application/vnd.vector.columnar+json": "columnar",
+    "application/msgpack": "msgpack",
+    "application/x-msgpack": "msgpack",
+}
+
+
+def negotiate(accept=None, flag=None):
+    """Response format from the `format` flag or the `Accept` header."""
+    if flag:
+        return flag
+    for part in (accept or "").split(","):
+        media = part.split(";", 1)[0].strip().lower()
+        if media in ACCEPT:
+            return ACCEPT[media]
+    return "json"
+
+
+def chart_series(ts, values, fmt):
+    """One chart series in the columnar or msgpack layout."""
+    if fmt == "msgpack":
+        ts = ts.astype("<i8")
+        # Sensor columns are float32 at the source, so float64 only adds bytes.
+        values = values.astype("<f4" if values.dtype.kind == "f" else values.dtype.newbyteorder("<"))
+        return {
+            "timestamps": ts.tobytes(),
+            "values": values.tobytes(),
+            "dtype": {"timestamps": ts.dtype.str, "values": values.dtype.str},
+        }
+    return {"timestamps": np.ascontiguousarray(ts), "values": np.ascontiguousarray(values)}
+
+
+def dumps(payload):
+    """Compact JSON bytes; NumPy arrays and scalars are written natively."""
+    return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def encode(payload, fmt="json"):
+    """`(body, media_type)` of `payload` in `fmt`."""
+    if fmt == "msgpack":
+        return msgpack.packb(payload, use_bin_type=True), MEDIA_TYPES[fmt]
+    return dumps(payload), MEDIA_TYPES[fmt]